@@ -0,0 +1,132 @@
+"""
+/unban lookup benchmark against a mocked guild with a large ban list.
+
+The mock guild answers `bans()` in pages of 1000 (Discord's maximum) and
+`fetch_ban()` for single IDs, sleeping --rtt seconds per request to stand in
+for the HTTP round trip. Compares:
+
+- full scan: fetch every page of bans, then compare each entry, as /unban
+  did before the index (for both IDs and names)
+- index by ID: BanIndex resolves an ID with a single fetch_ban request
+- index by name: the first name lookup loads the list once; later ones are
+  dict lookups kept current by ban/unban events
+
+    python -m bench.ban_lookup --bans 100000 --rtt 0.02
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import NamedTuple
+
+import discord
+
+from bench.common import format_seconds, latency_line
+from utils.ban_index import BanIndex
+
+USER_BASE = 200000000000000000
+BAN_PAGE = 1000
+
+
+class FakeUser(NamedTuple):
+    id: int
+    name: str
+
+    def __str__(self):
+        return self.name
+
+
+class BanEntry(NamedTuple):
+    user: FakeUser
+    reason: str
+
+
+class MockGuild:
+    """Just enough of discord.Guild for ban lookups, counting the requests made."""
+    def __init__(self, guild_id: int, bans: int, rtt: float):
+        self.id = guild_id
+        self.rtt = rtt
+        self.requests = 0
+        self.entries = [BanEntry(FakeUser(USER_BASE + i, f"raider{i}"), "Raid") for i in range(bans)]
+        self.by_id = {entry.user.id: entry for entry in self.entries}
+
+    async def _request(self):
+        self.requests += 1
+        await asyncio.sleep(self.rtt)
+
+    async def bans(self, limit=None):
+        for start in range(0, len(self.entries), BAN_PAGE):
+            await self._request()
+            for entry in self.entries[start:start + BAN_PAGE]:
+                yield entry
+
+    async def fetch_ban(self, user):
+        await self._request()
+        entry = self.by_id.get(user.id)
+        if entry is None:
+            raise discord.NotFound(FakeResponse(), "Unknown Ban")
+        return entry
+
+
+class FakeResponse:
+    status = 404
+    reason = "Not Found"
+
+
+async def full_scan(guild: MockGuild, identifier: str):
+    """The pre-index /unban: fetch the whole ban list, then search it, for every lookup."""
+    banned = [entry async for entry in guild.bans(limit=None)]
+    for entry in banned:
+        if identifier.isdigit() and entry.user.id == int(identifier):
+            return entry.user
+        if str(entry.user) == identifier:
+            return entry.user
+    return None
+
+
+async def timed(resolve, guild: MockGuild, identifiers):
+    samples = []
+    guild.requests = 0
+    for identifier in identifiers:
+        started = time.perf_counter()
+        user = await resolve(guild, identifier)
+        samples.append(time.perf_counter() - started)
+        assert user is not None, identifier
+    return samples, guild.requests / len(identifiers)
+
+
+async def run(options):
+    guild = MockGuild(1, options.bans, options.rtt)
+    rng = random.Random(1)
+    targets = [guild.entries[rng.randrange(options.bans)].user for _ in range(options.lookups)]
+    ids = [str(user.id) for user in targets]
+    names = [user.name for user in targets]
+    print(f"🔨 {options.bans:,} bans, {format_seconds(options.rtt)} per request, {options.lookups} lookups each")
+
+    index = BanIndex()
+    rows = [
+        ("Full scan by ID", *await timed(full_scan, guild, ids[:options.scans])),
+        ("Full scan by name", *await timed(full_scan, guild, names[:options.scans])),
+        ("Index by ID", *await timed(index.resolve, guild, ids)),
+    ]
+    guild.requests = 0
+    started = time.perf_counter()
+    await index.resolve(guild, names[0])
+    rows.append(("Index by name, first", [time.perf_counter() - started], guild.requests))
+    rows.append(("Index by name, later", *await timed(index.resolve, guild, names[1:])))
+
+    for label, samples, requests in rows:
+        print(f"   {label:<22} {latency_line(samples)} • {requests:g} requests per lookup")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /unban lookups on a mocked guild.")
+    parser.add_argument("--bans", type=int, default=100_000, help="Bans in the mocked guild (default: 100000)")
+    parser.add_argument("--rtt", type=float, default=0.02, help="Simulated seconds per API request (default: 0.02)")
+    parser.add_argument("--lookups", type=int, default=200, help="Index lookups to time (default: 200)")
+    parser.add_argument("--scans", type=int, default=5, help="Full-scan lookups to time, they're slow (default: 5)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
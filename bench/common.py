@@ -0,0 +1,56 @@
+"""
+Helpers shared by the benchmark scripts in this directory.
+
+Each script measures one subsystem in isolation, needs no token or network,
+and is run from the repository root, e.g. `python -m bench.warn_store`.
+"""
+import os
+import resource
+import tempfile
+import time
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f}ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def latency_line(samples) -> str:
+    """`p50 … • p99 … • max …` for a list of durations in seconds."""
+    samples = sorted(samples)
+    return (f"p50 {format_seconds(percentile(samples, 0.5))} • p99 {format_seconds(percentile(samples, 0.99))}"
+            f" • max {format_seconds(samples[-1] if samples else 0.0)}")
+
+
+def per_call(func, iterations: int) -> float:
+    """Average seconds per `func()` call over `iterations` calls."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def temp_path(name: str) -> str:
+    """A path for a scratch file (e.g. a database) that nothing else uses."""
+    return os.path.join(tempfile.mkdtemp(prefix="tesseract-bench-"), name)
@@ -0,0 +1,98 @@
+"""
+Cooldown engine benchmark: memory and check cost with 1M active buckets.
+
+Fills a CooldownManager with --buckets user buckets for one command, then
+times `check()` for new users (a bucket is created), for users with an
+existing bucket (allowed, and refused once their allowance is used up) and
+for a command with both a user and a guild limit. Finally times `prune()`
+with most and then all of the buckets idle, called slice after slice like
+the bot's prune task, and reports the longest single call. Memory is traced,
+so it covers exactly what the buckets hold.
+
+    python -m bench.cooldowns --buckets 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from bench.common import format_seconds
+from utils.cooldowns import PRUNE_SLICE, CooldownManager, Limit
+
+USER_BASE = 200000000000000000
+GUILD_BASE = 100000000000000000
+
+
+def command(name: str, limits):
+    return SimpleNamespace(qualified_name=name, extras={"cooldowns": limits}, callback=None)
+
+
+def timed_checks(manager: CooldownManager, interaction, user_ids) -> float:
+    started = time.perf_counter()
+    for user_id in user_ids:
+        interaction.user.id = user_id
+        manager.check(interaction)
+    return (time.perf_counter() - started) / len(user_ids)
+
+
+def timed_prune(manager: CooldownManager):
+    """Prunes until nothing is left to drop. Returns (removed, total seconds, longest call)."""
+    removed, total, longest = 0, 0.0, 0.0
+    while True:
+        started = time.perf_counter()
+        count = manager.prune()
+        elapsed = time.perf_counter() - started
+        removed, total, longest = removed + count, total + elapsed, max(longest, elapsed)
+        if count < PRUNE_SLICE:
+            return removed, total, longest
+
+
+def run(options):
+    clock = [0.0]
+    manager = CooldownManager(clock=lambda: clock[0])
+    meme = command("meme", [Limit(2, 10.0)])
+    interaction = SimpleNamespace(command=meme, user=SimpleNamespace(id=0), guild_id=GUILD_BASE, channel_id=1)
+    users = list(range(USER_BASE, USER_BASE + options.buckets))
+
+    tracemalloc.start()
+    traced = CooldownManager(clock=lambda: clock[0])
+    timed_checks(traced, interaction, users)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    # Tracing slows allocation down, so bucket creation is timed on a second, untraced fill
+    create = timed_checks(manager, interaction, users)
+
+    rng = random.Random(1)
+    existing = rng.sample(users, min(options.samples, len(users)))
+    allowed = timed_checks(manager, interaction, existing)  # Second use of two
+    rejected_before = manager.rejected
+    refused = timed_checks(manager, interaction, existing)  # Third use: refused
+    assert manager.rejected - rejected_before == len(existing)
+
+    interaction.command = command("warn", [Limit(5, 10.0), Limit(30, 10.0, "guild")])
+    two_limits = timed_checks(manager, interaction, existing)
+
+    # Most buckets idle (only the sampled users still have uses to recover), then all of them
+    clock[0] = 7.0
+    most, prune_most, slice_most = timed_prune(manager)
+    clock[0] = 1000.0
+    rest, prune_all, slice_all = timed_prune(manager)
+
+    print(f"⏳ {options.buckets:,} active buckets: {memory / 2**20:.0f}MB ({memory / options.buckets:.0f}B per bucket)")
+    print(f"   check(), new bucket: {format_seconds(create)} • existing, allowed: {format_seconds(allowed)}"
+          f" • refused: {format_seconds(refused)} • user + guild limits: {format_seconds(two_limits)}")
+    print(f"   prune(): {most:,} idle buckets in {format_seconds(prune_most)}, then {rest:,} in {format_seconds(prune_all)}"
+          f" • longest call {format_seconds(max(slice_most, slice_all))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cooldown engine at scale.")
+    parser.add_argument("--buckets", type=int, default=1_000_000, help="Active buckets (default: 1000000)")
+    parser.add_argument("--samples", type=int, default=100_000, help="Checks to time on existing buckets (default: 100000)")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Guild settings benchmark: GuildConfig reads across many guilds.
+
+Stores overrides for half of --guilds guilds in a scratch database (the rest
+use defaults), then times:
+
+- cold reads: the first `get()` per guild (one query loads all its overrides)
+- warm reads: `await get()` once the guild is cached (the hot path, e.g. prefixes)
+- `get_cached()`: the synchronous read that never touches the database
+
+and reports the traced memory of the cache with every guild loaded.
+
+    python -m bench.guild_config --guilds 10000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from bench.common import format_seconds, latency_line, temp_path
+from utils.database import Database
+from utils.guild_config import GuildConfig, Setting
+
+GUILD_BASE = 100000000000000000
+
+PREFIX = Setting("prefix", "str", ".", "Prefix for text commands")
+JOKES = Setting("jokes", "list", ["Why did the bot cross the road?"], "Jokes for /joke")
+MAX_JOINS = Setting("antiraid_max_joins", "int", 10, "Joins that trigger a lockdown", minimum=2, maximum=1000)
+
+
+async def run(options):
+    db = Database(temp_path("config.db"))
+    await db.open()
+    config = GuildConfig(db, max_guilds=options.guilds)
+    config.register(PREFIX, JOKES, MAX_JOINS)
+    await config.start()
+
+    guild_ids = [GUILD_BASE + i for i in range(options.guilds)]
+    rows = []
+    for guild_id in guild_ids[::2]:
+        rows.append((guild_id, PREFIX.key, PREFIX.encode("!")))
+        rows.append((guild_id, JOKES.key, JOKES.encode([f"Joke {n}" for n in range(20)])))
+        rows.append((guild_id, MAX_JOINS.key, MAX_JOINS.encode(25)))
+    await db.executemany("INSERT INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)", rows)
+
+    rng = random.Random(1)
+    order = guild_ids[:]
+    rng.shuffle(order)
+
+    tracemalloc.start()
+    cold = []
+    for guild_id in order:
+        started = time.perf_counter()
+        await config.get(guild_id, PREFIX)
+        cold.append(time.perf_counter() - started)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    reads = [rng.choice(guild_ids) for _ in range(options.reads)]
+    started = time.perf_counter()
+    for guild_id in reads:
+        await config.get(guild_id, PREFIX)
+    warm = (time.perf_counter() - started) / len(reads)
+    started = time.perf_counter()
+    for guild_id in reads:
+        config.get_cached(guild_id, PREFIX)
+    cached = (time.perf_counter() - started) / len(reads)
+    plain = {guild_id: "!" for guild_id in guild_ids}
+    dict_lookup = time.perf_counter()
+    for guild_id in reads:
+        plain.get(guild_id, ".")
+    dict_lookup = (time.perf_counter() - dict_lookup) / len(reads)
+
+    print(f"⚙️ {options.guilds:,} guilds, {len(rows):,} stored overrides")
+    print(f"   Cold read (first per guild): {latency_line(cold)}")
+    print(f"   Warm await get(): {format_seconds(warm)} • get_cached(): {format_seconds(cached)}"
+          f" • plain dict.get(): {format_seconds(dict_lookup)}")
+    print(f"   Cache with every guild loaded: {memory / 2**20:.1f}MB ({memory / options.guilds:.0f}B per guild)")
+    await db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-guild settings reads.")
+    parser.add_argument("--guilds", type=int, default=10000, help="Guilds (default: 10000)")
+    parser.add_argument("--reads", type=int, default=1_000_000, help="Warm reads to time (default: 1000000)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
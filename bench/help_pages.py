@@ -0,0 +1,82 @@
+"""
+/help micro-benchmark: serving the cached page catalog vs rebuilding it per call.
+
+Loads every cog from main.py (against a scratch database, no connection to
+Discord) and times what /help does to produce its first page:
+
+- rebuilt: what every call used to cost, walking the command tree and
+  building every embed and the navigation view again
+- cached: what a call costs now, reusing the catalog built at startup
+
+Both include serializing the embed and view into the request payload.
+
+    python -m bench.help_pages --iterations 5000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from bench.common import format_seconds, latency_line, temp_path
+
+# main() loads every cog in cogs/
+EXTENSIONS = sorted(f"cogs.{name[:-3]}" for name in os.listdir("cogs") if name.endswith(".py"))
+
+
+def sample(render, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(options):
+    os.environ["TESSERACT_DB"] = temp_path("help.db")
+    os.environ["TREE_HASH_PATH"] = temp_path(".tree_hash")
+    import main
+
+    bot, catalog = main.bot, main.help_catalog
+    await bot.db.open()
+    await bot.config.start()
+    for extension in EXTENSIONS:
+        await bot.load_extension(extension)
+    # /cat and /dog aren't exercised here; don't let the image pool go looking for the network
+    fun = bot.get_cog("Fun")
+    if fun is not None:
+        await fun.images.close()
+
+    def cached():
+        pages = catalog.get_pages()
+        pages[0].to_dict()
+        catalog.get_view(0).to_components()
+
+    def rebuilt():
+        catalog.invalidate()
+        cached()
+
+    cached()
+    pages = catalog.get_pages()
+    commands = sum(len(page.fields) for page in pages)
+    print(f"📘 {len(pages)} help pages, {commands} commands")
+    before = sample(rebuilt, options.iterations)
+    after = sample(cached, options.iterations)
+    print(f"   Rebuilt per call: {latency_line(before)}")
+    print(f"   Cached catalog:   {latency_line(after)}")
+    mean_before, mean_after = sum(before) / len(before), sum(after) / len(after)
+    print(f"   Mean {format_seconds(mean_before)} → {format_seconds(mean_after)} ({mean_before / mean_after:.0f}× faster)")
+
+    for extension in list(bot.extensions):
+        await bot.unload_extension(extension)
+    await bot.db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /help with and without the cached catalog.")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls to time for each variant (default: 2000)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Worker offload benchmark: heartbeat latency under CPU load.
+
+A probe task stands in for the gateway heartbeat: it wakes every --interval
+and records how late it was. Each mode runs for --seconds: idle for
+reference, then with a stream of CPU-bound jobs (purge's `search_many` over
+pages of long messages with a backreference pattern) run on the event loop,
+then the same jobs sent through `WorkerPools.run_cpu`.
+
+    python -m bench.loop_lag --seconds 5 --page 100 --processes 2
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from bench.common import format_seconds, latency_line
+from utils.purge import search_many
+from utils.workers import WorkerPools
+
+# A repeated word, which has to be tried from every position of every text
+PATTERN = r"\b(\w+)\s+\1\b"
+WORDS = ["raid", "ban", "meme", "cat", "dog", "warn", "mute", "purge", "help", "server"]
+
+
+def make_page(size: int, words: int, rng: random.Random):
+    return [" ".join(rng.choice(WORDS) + str(rng.randrange(1000)) for _ in range(words)) for _ in range(size)]
+
+
+async def heartbeat(interval: float, samples: list):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval))
+
+
+async def measure(options, page, run_job):
+    """Heartbeat lag samples and completed jobs while `run_job` (if any) runs in a loop."""
+    samples = []
+    jobs = 0
+    probe = asyncio.create_task(heartbeat(options.interval, samples))
+    deadline = time.monotonic() + options.seconds
+    try:
+        if run_job is None:
+            await asyncio.sleep(options.seconds)
+        else:
+            async def worker():
+                nonlocal jobs
+                while time.monotonic() < deadline:
+                    await run_job(page)
+                    jobs += 1
+            await asyncio.gather(*(worker() for _ in range(options.concurrency)))
+    finally:
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+    return samples, jobs
+
+
+async def run(options):
+    page = make_page(options.page, options.words, random.Random(1))
+    started = time.perf_counter()
+    search_many(PATTERN, 0, page)
+    job_cost = time.perf_counter() - started
+
+    async def inline(texts):
+        search_many(PATTERN, 0, texts)
+        await asyncio.sleep(0)  # Yield between jobs, as a cog's loop over pages would
+
+    workers = WorkerPools(processes=options.processes)
+    workers.start()
+    try:
+        # Spawned workers import their modules on first use; keep that out of the measurement
+        await asyncio.gather(*(workers.run_cpu(search_many, PATTERN, 0, page[:1]) for _ in range(options.processes)))
+
+        async def offloaded(texts):
+            await workers.run_cpu(search_many, PATTERN, 0, texts)
+
+        print(f"🫀 Heartbeat every {format_seconds(options.interval)} for {options.seconds:.0f}s per mode;"
+              f" one job = {options.page} messages, {format_seconds(job_cost)} of CPU")
+        for name, run_job in (("idle", None), ("inline", inline), ("offloaded", offloaded)):
+            samples, jobs = await measure(options, page, run_job)
+            print(f"   {name:<9}  lag {latency_line(samples)}  ({len(samples)} beats, {jobs} jobs)")
+    finally:
+        await workers.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark heartbeat latency under CPU load, with and without offload.")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each mode (default: 5)")
+    parser.add_argument("--interval", type=float, default=0.05, help="Heartbeat probe interval in seconds (default: 0.05)")
+    parser.add_argument("--page", type=int, default=100, help="Messages per job (default: 100)")
+    parser.add_argument("--words", type=int, default=200, help="Words per message (default: 200)")
+    parser.add_argument("--processes", type=int, default=2, help="Worker processes (default: 2)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Jobs in flight at once (default: 2)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
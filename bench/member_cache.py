@@ -0,0 +1,136 @@
+"""
+Member cache memory report: RSS under each MEMBER_CACHE mode.
+
+Builds a synthetic fixture of --guilds × --members members (1M by default)
+and feeds it through discord.py's own gateway parsers with each mode's
+client options, one mode per process: startup chunking (full mode only),
+then --joins recent joins per guild and the members a burst of commands
+would carry in its interactions. Reports RSS, cached members and how long
+the fixture took to load.
+
+    python -m bench.member_cache
+    python -m bench.member_cache --guilds 100 --members 10000 --modes full lean
+"""
+import argparse
+import asyncio
+import gc
+import json
+import subprocess
+import sys
+import time
+
+import discord
+from discord.state import ChunkRequest
+
+from bench.common import rss_mb
+from utils.member_cache import MODES, MemberCachePolicy
+
+GUILD_BASE = 100000000000000000
+USER_BASE = 200000000000000000
+OWNER_ID = 300000000000000000
+CHUNK_SIZE = 1000
+
+
+def member_payload(user_id: int, joined_at: str):
+    return {
+        "user": {"id": str(user_id), "username": f"user{user_id % 100000}", "discriminator": "0",
+                 "global_name": None, "avatar": None},
+        "roles": [], "joined_at": joined_at, "deaf": False, "mute": False, "flags": 0,
+    }
+
+
+def guild_payload(guild_id: int, members: int):
+    return {
+        "id": str(guild_id), "name": f"Bench {guild_id - GUILD_BASE}", "icon": None, "owner_id": str(OWNER_ID),
+        "member_count": members, "large": members >= 250,
+        "roles": [{
+            "id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0,
+            "color": 0, "hoist": False, "managed": False, "mentionable": False,
+        }],
+        "channels": [], "members": [], "threads": [], "emojis": [], "stickers": [], "features": [],
+    }
+
+
+async def load_fixture(mode: str, options) -> dict:
+    intents = discord.Intents.default()
+    intents.members = True
+    client_options = MemberCachePolicy(mode).client_options(intents)
+    client = discord.Client(intents=intents, **client_options)
+    state = client._connection
+    loop = asyncio.get_running_loop()
+    joined_at = discord.utils.utcnow().isoformat()
+
+    baseline = rss_mb()
+    started = time.perf_counter()
+    for index in range(options.guilds):
+        guild_id = GUILD_BASE + index
+        state._add_guild_from_data(guild_payload(guild_id, options.members))
+        user_ids = range(USER_BASE, USER_BASE + options.members)
+        # The startup chunking discord.py does for every guild when chunk_guilds_at_startup is set
+        if client_options["chunk_guilds_at_startup"]:
+            request = ChunkRequest(guild_id, 0, loop, state._get_guild, cache=True)
+            state._chunk_requests[request.nonce] = request
+            for chunk_index, start in enumerate(range(0, options.members, CHUNK_SIZE)):
+                state.parse_guild_members_chunk({
+                    "guild_id": str(guild_id), "nonce": request.nonce,
+                    "chunk_index": chunk_index, "chunk_count": -(-options.members // CHUNK_SIZE),
+                    "members": [member_payload(user_id, joined_at) for user_id in user_ids[start:start + CHUNK_SIZE]],
+                })
+        # Joins are cached whenever the `joined` member cache flag is set
+        for offset in range(options.joins):
+            data = member_payload(USER_BASE + options.members + offset, joined_at)
+            data["guild_id"] = str(guild_id)
+            state.parse_guild_member_add(data)
+    ready = time.perf_counter() - started
+    gc.collect()
+    ready_rss = rss_mb()
+
+    # Interactions carry their member; whether it stays is up to the cache flags
+    guild = state._get_guild(GUILD_BASE)
+    for user_id in range(USER_BASE, USER_BASE + options.commands):
+        discord.Member(data=member_payload(user_id, joined_at), guild=guild, state=state)
+    gc.collect()
+
+    return {
+        "mode": mode,
+        "cached": sum(len(guild.members) for guild in client.guilds),
+        "seconds": ready,
+        "rss_ready": ready_rss - baseline,
+        "rss_after": rss_mb() - baseline,
+    }
+
+
+def measure(mode: str, options) -> dict:
+    command = [
+        sys.executable, "-m", "bench.member_cache", "--only", mode,
+        "--guilds", str(options.guilds), "--members", str(options.members),
+        "--joins", str(options.joins), "--commands", str(options.commands),
+    ]
+    return json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the bot's memory under each member cache mode.")
+    parser.add_argument("--guilds", type=int, default=50, help="Guilds (default: 50)")
+    parser.add_argument("--members", type=int, default=20000, help="Members per guild (default: 20000)")
+    parser.add_argument("--joins", type=int, default=100, help="Recent joins per guild (default: 100)")
+    parser.add_argument("--commands", type=int, default=10000, help="Interaction members to parse (default: 10000)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to compare (default: all)")
+    # Runs one mode in this process and prints its result as JSON (used by the parent run)
+    parser.add_argument("--only", choices=MODES, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.only:
+        print(json.dumps(asyncio.run(load_fixture(options.only, options))))
+        return
+
+    print(f"👥 {options.guilds * options.members:,} members ({options.guilds} guilds × {options.members:,})")
+    print(f"   {'Mode':<6} {'Cached':>10} {'Load':>8} {'RSS ready':>10} {'RSS after':>10}")
+    for mode in options.modes:
+        result = measure(mode, options)
+        print(f"   {mode:<6} {result['cached']:>10,} {result['seconds']:>7.1f}s"
+              f" {result['rss_ready']:>8.0f}MB {result['rss_after']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+AutoMod filter benchmark: per-message cost of the spam and word checks.
+
+Feeds --messages synthetic messages from --users chatters in --guilds guilds
+through MessageFilter.check (and strike, for violations), with a --words
+banned-word list in every guild. Messages are 5-30 words of ordinary text;
+a small share contain a banned word or mass-mention, and a few spammers
+flood one guild. Simulated time advances at --rate messages per second, so
+rate limits behave as they would at that load.
+
+    python -m bench.message_filter --messages 500000 --rate 20000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from bench.common import latency_line
+from utils.message_filter import MessageFilter
+
+GUILD_BASE = 100000000000000000
+USER_BASE = 200000000000000000
+VOCABULARY = ("the a to and of you it is that in for on this with be have not are was just like what so "
+              "can do we get but all if my your they me at one out up no about know there how now good "
+              "game play time people think really make want going server channel discord voice today "
+              "yeah lol nice thanks anyone here help new update").split()
+
+
+def make_messages(options, banned):
+    rng = random.Random(1)
+    messages = []
+    for i in range(options.messages):
+        guild_id = GUILD_BASE + rng.randrange(options.guilds)
+        user_id = USER_BASE + rng.randrange(options.users)
+        roll = rng.random()
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(5, 30))]
+        if roll < 0.01:
+            words.insert(rng.randrange(len(words)), rng.choice(banned))
+        elif roll < 0.03:
+            # A handful of spammers flooding one guild with the same line
+            guild_id, user_id = GUILD_BASE, USER_BASE + rng.randrange(20)
+            words = ["same", "message", "again"]
+        mentions = 8 if roll > 0.995 else rng.choice((0, 0, 0, 1))
+        messages.append((guild_id, user_id, " ".join(words), mentions, i / options.rate))
+    return messages
+
+
+def run(options):
+    rng = random.Random(2)
+    banned = [f"badword{n}" for n in range(options.words)]
+    message_filter = MessageFilter()
+    for guild in range(options.guilds):
+        message_filter.set_words(GUILD_BASE + guild, rng.sample(banned, min(len(banned), options.words)))
+    messages = make_messages(options, banned)
+
+    violations = Counter()
+    samples = []
+    started = time.perf_counter()
+    for guild_id, user_id, content, mentions, now in messages:
+        checked = time.perf_counter()
+        violation = message_filter.check(guild_id, user_id, content, mentions, now)
+        if violation is not None:
+            message_filter.strike(guild_id, user_id, now)
+            violations[violation] += 1
+        samples.append(time.perf_counter() - checked)
+    elapsed = time.perf_counter() - started
+
+    per_message = elapsed / len(messages)
+    print(f"💬 {len(messages):,} messages from {options.users:,} users in {options.guilds:,} guilds,"
+          f" {options.words} banned words per guild")
+    print(f"   Per message: {latency_line(samples)}")
+    print(f"   {1 / per_message:,.0f} messages/s on one core ({1 / per_message / options.rate:.1f}× the simulated rate)")
+    print(f"   Violations: {', '.join(f'{kind} {count:,}' for kind, count in violations.most_common()) or 'none'}"
+          f" • {len(message_filter.users):,} users tracked")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AutoMod message filter.")
+    parser.add_argument("--messages", type=int, default=300_000, help="Messages to check (default: 300000)")
+    parser.add_argument("--rate", type=float, default=20000, help="Simulated messages per second (default: 20000)")
+    parser.add_argument("--guilds", type=int, default=1000, help="Guilds (default: 1000)")
+    parser.add_argument("--users", type=int, default=50000, help="Distinct chatters (default: 50000)")
+    parser.add_argument("--words", type=int, default=200, help="Banned words per guild (default: 200)")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Instrumentation overhead benchmark: what CommandMetrics adds to each command.
+
+Times the hooks every app command passes through: `start()` from the
+command tree's interaction_check, `responded()` from the HTTP trace of the
+interaction callback, and `finish()` on completion. Also times the trace's
+URL match (run for every REST request the bot makes) and rendering the
+Prometheus page that a scrape requests.
+
+    python -m bench.metrics_overhead --commands 1000000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from bench.common import format_seconds, per_call
+from utils.metrics import CALLBACK_PATH, CommandMetrics
+
+COMMAND_NAMES = ("ping", "roll", "coinflip", "8ball", "joke", "quote", "cat", "dog", "meme",
+                 "serverinfo", "userinfo", "avatar", "help", "botinfo", "warn")
+
+
+def run(options):
+    metrics = CommandMetrics()
+    rng = random.Random(1)
+    commands = [SimpleNamespace(qualified_name=name) for name in COMMAND_NAMES]
+    interactions = [SimpleNamespace(id=900000000000000000 + i, command=rng.choice(commands))
+                    for i in range(options.commands)]
+
+    started = time.perf_counter()
+    for interaction in interactions:
+        metrics.start(interaction)
+        metrics.responded(interaction.id)
+        metrics.finish(interaction)
+    hooks = (time.perf_counter() - started) / options.commands
+
+    path = "/api/v10/interactions/900000000000000123/aW50ZXJhY3Rpb24tdG9rZW4/callback"
+    url_match = per_call(lambda: CALLBACK_PATH.search(path), options.commands)
+    other_path = "/api/v10/channels/300000000000000000/messages"
+    url_miss = per_call(lambda: CALLBACK_PATH.search(other_path), options.commands)
+    render = per_call(metrics.render_prometheus, 200)
+
+    print(f"📈 {options.commands:,} commands over {len(COMMAND_NAMES)} command names")
+    print(f"   start + responded + finish: {format_seconds(hooks)} per command")
+    print(f"   Callback URL match: {format_seconds(url_match)} per callback, {format_seconds(url_miss)} per other request")
+    print(f"   Prometheus page ({len(metrics.render_prometheus()) / 1024:.0f}KB): {format_seconds(render)} per scrape")
+    print(f"   Per 1000 commands/s: {hooks * 1000 * 100:.3f}% of one core")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of command instrumentation.")
+    parser.add_argument("--commands", type=int, default=1_000_000, help="Commands to instrument (default: 1000000)")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
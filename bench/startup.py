@@ -0,0 +1,107 @@
+"""
+Startup benchmark: the phases main() runs before connecting to Discord.
+
+Against a scratch database (no connection to Discord), times over --rounds
+rounds:
+
+- database: opening the connection and creating the settings schema
+- cogs: loading every extension in INITIAL_EXTENSIONS concurrently, as main()
+  does, and one after another for comparison (each cog's cog_load included)
+- tree hash: hashing the command tree's sync payload, and the whole
+  `sync_if_changed()` check when the stored hash matches and the sync is skipped
+
+The first load also creates every cog's tables, so it is reported on its own.
+
+    python -m bench.startup --rounds 10
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from bench.common import format_seconds, latency_line, temp_path
+from utils.tree_sync import command_tree_hash, sync_if_changed
+
+
+async def load_extensions(bot, extensions, concurrent: bool) -> float:
+    started = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(bot.load_extension(extension) for extension in extensions))
+    else:
+        for extension in extensions:
+            await bot.load_extension(extension)
+    elapsed = time.perf_counter() - started
+    # /cat and /dog aren't exercised here; don't let the image pool go looking for the network
+    fun = bot.get_cog("Fun")
+    if fun is not None:
+        await fun.images.close()
+    return elapsed
+
+
+async def unload_extensions(bot):
+    for extension in list(bot.extensions):
+        await bot.unload_extension(extension)
+
+
+async def run(options):
+    os.environ["TESSERACT_DB"] = temp_path("startup.db")
+    os.environ["TREE_HASH_PATH"] = temp_path(".tree_hash")
+    import main
+
+    bot, extensions = main.bot, main.INITIAL_EXTENSIONS
+    database, concurrent, sequential = [], [], []
+
+    await bot.db.open()
+    await bot.config.start()
+    first_load = await load_extensions(bot, extensions, concurrent=True)
+    await unload_extensions(bot)
+    await bot.db.close()
+
+    for round_index in range(options.rounds):
+        started = time.perf_counter()
+        await bot.db.open()
+        await bot.config.start()
+        database.append(time.perf_counter() - started)
+        # Alternate which variant goes first, so neither always gets the warmer caches
+        for is_concurrent in (round_index % 2 == 0, round_index % 2 == 1):
+            samples = concurrent if is_concurrent else sequential
+            samples.append(await load_extensions(bot, extensions, is_concurrent))
+            await unload_extensions(bot)
+        await bot.db.close()
+
+    await bot.db.open()
+    await bot.config.start()
+    await load_extensions(bot, extensions, concurrent=True)
+    tree = bot.tree
+    with open(main.TREE_HASH_PATH, "w", encoding="utf-8") as f:
+        f.write(command_tree_hash(tree))
+    hashes, checks = [], []
+    for _ in range(options.rounds * 10):
+        started = time.perf_counter()
+        command_tree_hash(tree)
+        hashes.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        if await sync_if_changed(tree, main.TREE_HASH_PATH) is not None:
+            raise RuntimeError("The command tree changed between checks")
+        checks.append(time.perf_counter() - started)
+    commands = len(tree.get_commands())
+    await unload_extensions(bot)
+    await bot.db.close()
+
+    print(f"🚀 {len(extensions)} extensions, {commands} top-level commands, {options.rounds} rounds")
+    print(f"   Database:          {latency_line(database)}")
+    print(f"   First cog load:    {format_seconds(first_load)} (creates every table)")
+    print(f"   Cogs, concurrent:  {latency_line(concurrent)}")
+    print(f"   Cogs, sequential:  {latency_line(sequential)}")
+    print(f"   Tree hash:         {latency_line(hashes)}")
+    print(f"   Unchanged sync:    {latency_line(checks)} (skipped, no request)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the bot's startup phases without connecting to Discord.")
+    parser.add_argument("--rounds", type=int, default=5, help="Times to load every extension each way (default: 5)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
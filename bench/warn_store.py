@@ -0,0 +1,97 @@
+"""
+Warning store benchmark: /warn and lookup latency with a large warnings table.
+
+Fills a scratch database with --rows warnings (1M by default) spread over
+--guilds × --members members, then times WarningStore the way the Moderation
+cog uses it:
+
+- cold lookups: `get()` for members that aren't in the LRU cache (one indexed query)
+- warm lookups: `get()` again for the same members (cache hits)
+- warns: `add()` for random members, including the cache miss it may cause
+- flush: writing all those pending warnings in one batch
+
+    python -m bench.warn_store
+    python -m bench.warn_store --rows 200000 --samples 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from bench.common import format_seconds, latency_line, temp_path
+from utils.database import Database
+from utils.warning_store import WarningStore
+
+GUILD_BASE = 100000000000000000
+USER_BASE = 200000000000000000
+
+
+async def fill(db: Database, rows: int, guilds: int, members: int, chunk: int = 100000):
+    rng = random.Random(1)
+    now = time.time()
+    for start in range(0, rows, chunk):
+        batch = [
+            (GUILD_BASE + rng.randrange(guilds), USER_BASE + rng.randrange(members), None, "Spam", now - rng.random() * 86400 * 365)
+            for _ in range(min(chunk, rows - start))
+        ]
+        await db.executemany(
+            "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) VALUES (?, ?, ?, ?, ?)", batch
+        )
+
+
+async def timed(coroutine_factory, keys):
+    samples = []
+    for key in keys:
+        started = time.perf_counter()
+        await coroutine_factory(*key)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(options):
+    path = temp_path("warnings.db")
+    db = Database(path)
+    await db.open()
+    # No background flushes, so the flush below is measured on its own
+    store = WarningStore(db, flush_interval=3600.0)
+    await store.start()
+
+    started = time.perf_counter()
+    await fill(db, options.rows, options.guilds, options.members)
+    print(f"📦 {options.rows:,} warnings over {options.guilds * options.members:,} members"
+          f" written in {time.perf_counter() - started:.1f}s ({os.path.getsize(path) / 2**20:.0f}MB on disk)")
+
+    rng = random.Random(2)
+    sample = [(GUILD_BASE + rng.randrange(options.guilds), USER_BASE + rng.randrange(options.members))
+              for _ in range(options.samples)]
+    # Only the last cache_size members stay cached, so time the warm pass on those
+    warm = sample[-store.cache_size:]
+
+    cold = await timed(store.get, sample)
+    hot = await timed(store.get, warm)
+    store._cache.clear()
+    warns = await timed(lambda guild_id, user_id: store.add(guild_id, user_id, "Benchmark"), sample)
+    started = time.perf_counter()
+    await store.flush()
+    flush = time.perf_counter() - started
+
+    print(f"   Cold lookup  ({len(cold):,}): {latency_line(cold)}")
+    print(f"   Warm lookup  ({len(hot):,}): {latency_line(hot)}")
+    print(f"   Warn         ({len(warns):,}): {latency_line(warns)}")
+    print(f"   Flush of {len(sample):,} pending warnings: {format_seconds(flush)}")
+    await store.close()
+    await db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the warning store at scale.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Warnings in the table (default: 1000000)")
+    parser.add_argument("--guilds", type=int, default=100, help="Guilds the warnings are spread over (default: 100)")
+    parser.add_argument("--members", type=int, default=20000, help="Members per guild (default: 20000)")
+    parser.add_argument("--samples", type=int, default=5000, help="Lookups and warns to time (default: 5000)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import datetime
+import os
+
+from utils.antiraid import RaidDetector
+from utils.bulk_actions import BulkModerationEngine
+from utils.guild_config import Setting
+
+ANTIRAID_TIMEOUT_MINUTES = 60
+
+# Automatic lockdowns punish members, so each server has to turn them on
+ANTIRAID_ENABLED = Setting("antiraid", "bool", False, "Detect join raids and lock the server down automatically")
+ANTIRAID_MAX_JOINS = Setting(
+    "antiraid_max_joins", "int", 10, "Joins within 10 seconds that trigger an anti-raid lockdown",
+    minimum=2, maximum=1000
+)
+ANTIRAID_MAX_YOUNG_JOINS = Setting(
+    "antiraid_max_young_joins", "int", 5, "Joins from week-old accounts within 10 seconds that trigger a lockdown",
+    minimum=1, maximum=1000
+)
+# What to do with raiders once a lockdown trips (ANTIRAID_ACTION sets the default)
+ANTIRAID_ACTION = Setting(
+    "antiraid_action", "str", os.getenv("ANTIRAID_ACTION", "timeout").lower(),
+    "What an anti-raid lockdown does to raiders (timeout or kick)", choices=("timeout", "kick")
+)
+
+class AntiRaid(commands.Cog):
+    """
+    Automatic join-raid detection and lockdown.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.detector = RaidDetector()
+        self.engine = BulkModerationEngine()
+        bot.config.register(ANTIRAID_ENABLED, ANTIRAID_MAX_JOINS, ANTIRAID_MAX_YOUNG_JOINS, ANTIRAID_ACTION)
+
+    async def cog_load(self):
+        # Servers that turned anti-raid on before it became a setting keep it on
+        legacy = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'antiraid_guilds'"
+        if await self.bot.db.fetchone(legacy):
+            for (guild_id,) in await self.bot.db.fetchall("SELECT guild_id FROM antiraid_guilds"):
+                await self.bot.config.set(guild_id, ANTIRAID_ENABLED, True)
+            await self.bot.db.execute("DROP TABLE antiraid_guilds")
+
+    # --- Hot Reload ---
+    def export_state(self):
+        # Join windows and active lockdowns must survive a reload mid-raid
+        return {"detector": self.detector}
+
+    def import_state(self, state):
+        self.detector = state["detector"]
+
+    # --- Join Tracking ---
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        guild = member.guild
+        config = self.bot.config
+        if not await config.get(guild.id, ANTIRAID_ENABLED):
+            return
+        was_locked = self.detector.in_lockdown(guild.id)
+        tripped = self.detector.record_join(
+            guild.id, member.id, member.created_at.timestamp(),
+            max_joins=await config.get(guild.id, ANTIRAID_MAX_JOINS),
+            max_young_joins=await config.get(guild.id, ANTIRAID_MAX_YOUNG_JOINS)
+        )
+
+        if tripped:
+            # Act on everyone who joined in the window that tripped the detector
+            # Cached in the full and lean member cache modes; fetched otherwise
+            raiders = [await self.bot.member_cache.get_member(guild, member_id) for member_id in self.detector.raiders(guild.id)]
+            await self.lockdown(guild, [m for m in raiders if m is not None])
+        elif was_locked:
+            # During a lockdown every new join is treated as part of the raid
+            await self.lockdown(guild, [member], announce=False)
+
+    async def lockdown(self, guild: discord.Guild, members, announce: bool = True):
+        """Times out (or kicks) `members` and announces the lockdown in the system channel."""
+        reason = "Anti-raid lockdown"
+        until = discord.utils.utcnow() + datetime.timedelta(minutes=ANTIRAID_TIMEOUT_MINUTES)
+        action = "kick" if await self.bot.config.get(guild.id, ANTIRAID_ACTION) == "kick" else "timeout"
+        result = await self.engine.run(action, guild, members, reason, until=until)
+
+        # Automated actions belong in the case log like any moderator's
+        moderation = self.bot.get_cog("Moderation")
+        if moderation is not None:
+            case_action = "mute" if action == "timeout" else action
+            for member in result.succeeded:
+                moderation.case_log.record(guild.id, case_action, member.id, self.bot.user.id, "[Anti-raid] Raid lockdown")
+
+        channel = guild.system_channel
+        if announce and channel and channel.permissions_for(guild.me).send_messages:
+            joins, young, remaining = self.detector.status(guild.id)
+            try:
+                await channel.send(
+                    f"🚨 **Raid detected!** {joins} joins in the last {int(self.detector.window)}s "
+                    f"({young} from new accounts). Lockdown active for {int(remaining // 60)} minutes: "
+                    f"new members will be {'kicked' if action == 'kick' else 'timed out'} "
+                    f"({len(result.succeeded)} actioned so far). Use `/antiraid end` to lift it."
+                )
+            except discord.HTTPException:
+                pass # Announcing is best effort
+
+    # --- Error Handling ---
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Custom handler for errors occurring in slash commands within this cog."""
+        if isinstance(error, app_commands.MissingPermissions):
+            perms = ', '.join([p.replace('_', ' ').title() for p in error.missing_permissions])
+            await self.bot.responder.send(
+                interaction, f"❌ You lack the required permissions to use this command: **{perms}**.",
+                ephemeral=True
+            )
+        else:
+            await self.bot.responder.send(
+                interaction, f"❌ An unhandled error occurred: `{error}`",
+                ephemeral=True
+            )
+            print(f"Unhandled error in AntiRaid Cog: {error}") # Log error to console
+
+    # --- Commands ---
+    antiraid = app_commands.Group(name="antiraid", description="Inspect or lift the automatic raid lockdown.")
+
+    @antiraid.command(name="status", description="Shows the current join rate and lockdown state.")
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def status(self, interaction: discord.Interaction):
+        if not await self.bot.config.get(interaction.guild_id, ANTIRAID_ENABLED):
+            return await self.bot.responder.send(
+                interaction, "🔓 Anti-raid is off for this server. Turn it on with `/config set antiraid on`.",
+                ephemeral=True
+            )
+        joins, young, remaining = self.detector.status(interaction.guild_id)
+        state = f"🔒 Lockdown active ({int(remaining // 60)}m {int(remaining % 60)}s left)" if remaining else "🔓 No lockdown"
+        await self.bot.responder.send(
+            interaction, f"{state}\nJoins in the last {int(self.detector.window)}s: **{joins}** ({young} from new accounts)",
+            ephemeral=True
+        )
+
+    @antiraid.command(name="end", description="Lifts the raid lockdown.")
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def end(self, interaction: discord.Interaction):
+        self.detector.end_lockdown(interaction.guild_id)
+        await self.bot.responder.send(interaction, "🔓 Lockdown lifted.", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    """Adds the AntiRaid cog to the bot."""
+    await bot.add_cog(AntiRaid(bot))
@@ -0,0 +1,167 @@
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+import datetime
+
+from utils.guild_config import Setting
+from utils.message_filter import MessageFilter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS filter_words (
+    guild_id INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    PRIMARY KEY (guild_id, word)
+);
+"""
+
+# Deleting messages and warning their authors is opt-in per server
+AUTOMOD_ENABLED = Setting("automod", "bool", False, "Delete spam and filtered words, warning their authors")
+
+# Human-readable reasons for each kind of violation
+VIOLATION_REASONS = {
+    "word": "Using a filtered word",
+    "mentions": "Mass mentioning",
+    "rate": "Sending messages too quickly",
+    "duplicate": "Repeating the same message",
+}
+
+# Strikes (within the filter's strike window) before a warning becomes a mute
+MUTE_AFTER_STRIKES = 3
+MUTE_MINUTES = 10
+
+class AutoMod(commands.Cog):
+    """
+    Automatic spam, flood and filtered-word moderation.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.filter = MessageFilter()
+        # {guild_id: set(words)} mirror of the filter_words table
+        self.words = {}
+        bot.config.register(AUTOMOD_ENABLED)
+
+    async def cog_load(self):
+        await self.bot.db.executescript(SCHEMA)
+        for guild_id, word in await self.bot.db.fetchall("SELECT guild_id, word FROM filter_words"):
+            self.words.setdefault(guild_id, set()).add(word)
+        for guild_id, words in self.words.items():
+            self.filter.set_words(guild_id, words)
+        self.prune_state.start()
+
+    async def cog_unload(self):
+        self.prune_state.cancel()
+
+    # --- Hot Reload ---
+    def export_state(self):
+        # Rate buckets and strike history; the word lists are reloaded from the database anyway
+        return {"filter": self.filter}
+
+    def import_state(self, state):
+        self.filter = state["filter"]
+
+    @tasks.loop(minutes=5)
+    async def prune_state(self):
+        """Forgets users who have gone quiet, so memory follows active chatters only."""
+        self.filter.prune()
+
+    # --- Message Pipeline ---
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or not await self.bot.config.get(message.guild.id, AUTOMOD_ENABLED):
+            return
+        if message.author.bot or not isinstance(message.author, discord.Member):
+            return
+        # Moderators are exempt
+        if message.author.guild_permissions.manage_messages:
+            return
+
+        mentions = len(message.raw_mentions) + len(message.raw_role_mentions) + int(message.mention_everyone)
+        violation = self.filter.check(message.guild.id, message.author.id, message.content, mentions)
+        if violation is None:
+            return
+
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass # Already deleted
+        except discord.Forbidden:
+            return # Can't moderate this channel
+
+        strikes, escalate = self.filter.strike(message.guild.id, message.author.id)
+        if escalate:
+            await self.escalate(message.author, VIOLATION_REASONS[violation], strikes)
+
+    async def escalate(self, member: discord.Member, reason: str, strikes: int):
+        """Warns the member through the Moderation cog, muting them after repeated strikes."""
+        moderation = self.bot.get_cog("Moderation")
+        if moderation is None:
+            return
+        reason = f"[AutoMod] {reason}"
+        warning_count = await moderation.add_warning(member, reason, moderator=self.bot.user)
+        # The guild's escalation ladder applies to automatic warnings as well
+        escalated = await moderation.apply_escalation(member, warning_count)
+        # A ladder step already punished this warning; don't replace it with a shorter strike mute
+        if escalated is None and strikes >= MUTE_AFTER_STRIKES:
+            mute_until = discord.utils.utcnow() + datetime.timedelta(minutes=MUTE_MINUTES)
+            if member.timed_out_until is not None and member.timed_out_until >= mute_until:
+                return # Already timed out for longer
+            try:
+                await moderation.timeout_member(member, MUTE_MINUTES, reason)
+            except discord.Forbidden:
+                pass # The member is above the bot in the role hierarchy
+
+    # --- Error Handling ---
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Custom handler for errors occurring in slash commands within this cog."""
+        if isinstance(error, app_commands.MissingPermissions):
+            perms = ', '.join([p.replace('_', ' ').title() for p in error.missing_permissions])
+            await self.bot.responder.send(
+                interaction, f"❌ You lack the required permissions to use this command: **{perms}**.",
+                ephemeral=True
+            )
+        else:
+            await self.bot.responder.send(
+                interaction, f"❌ An unhandled error occurred: `{error}`",
+                ephemeral=True
+            )
+            print(f"Unhandled error in AutoMod Cog: {error}") # Log error to console
+
+    # --- Filter Word Commands ---
+    filter_group = app_commands.Group(name="filter", description="Manage this server's filtered words.")
+
+    @filter_group.command(name="add", description="Add a word or phrase to the filter.")
+    @app_commands.describe(word="The word or phrase to filter")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def filter_add(self, interaction: discord.Interaction, word: str):
+        word = word.strip().lower()
+        await self.bot.db.execute("INSERT OR IGNORE INTO filter_words (guild_id, word) VALUES (?, ?)", (interaction.guild_id, word))
+        words = self.words.setdefault(interaction.guild_id, set())
+        words.add(word)
+        self.filter.set_words(interaction.guild_id, words)
+        await self.bot.responder.send(interaction, f"✅ Added `{word}` to the filter.", ephemeral=True)
+
+    @filter_group.command(name="remove", description="Remove a word or phrase from the filter.")
+    @app_commands.describe(word="The word or phrase to remove")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def filter_remove(self, interaction: discord.Interaction, word: str):
+        word = word.strip().lower()
+        await self.bot.db.execute("DELETE FROM filter_words WHERE guild_id = ? AND word = ?", (interaction.guild_id, word))
+        words = self.words.setdefault(interaction.guild_id, set())
+        words.discard(word)
+        self.filter.set_words(interaction.guild_id, words)
+        await self.bot.responder.send(interaction, f"✅ Removed `{word}` from the filter.", ephemeral=True)
+
+    @filter_group.command(name="list", description="Show the filtered words.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def filter_list(self, interaction: discord.Interaction):
+        words = sorted(self.words.get(interaction.guild_id, ()))
+        listing = ", ".join(f"`{w}`" for w in words) or "No filtered words yet."
+        content = f"🔤 **Filtered words:** {listing}"
+        if not await self.bot.config.get(interaction.guild_id, AUTOMOD_ENABLED):
+            content = f"AutoMod is off for this server. Turn it on with `/config set automod on`.\n{content}"
+        await self.bot.responder.send(interaction, content[:2000], ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    """Adds the AutoMod cog to the bot."""
+    await bot.add_cog(AutoMod(bot))
@@ -0,0 +1,107 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.guild_config import GLOBAL, LIST_SEPARATOR
+
+
+class Config(commands.Cog):
+    """
+    Commands for viewing and changing the bot's per-server settings.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Custom handler for errors occurring in slash commands within this cog."""
+        if isinstance(error, app_commands.MissingPermissions):
+            perms = ', '.join([p.replace('_', ' ').title() for p in error.missing_permissions])
+            await self.bot.responder.send(
+                interaction, f"❌ You lack the required permissions to use this command: **{perms}**.",
+                ephemeral=True
+            )
+        else:
+            await self.bot.responder.send(
+                interaction, f"❌ An unhandled error occurred: `{error}`",
+                ephemeral=True
+            )
+            print(f"Unhandled error in Config Cog: {error}") # Log error to console
+
+    async def resolve(self, interaction: discord.Interaction, key: str):
+        """Looks up a setting and where it's stored, replying with an error (and returning None) if not allowed."""
+        setting = self.bot.config.settings.get(key)
+        if setting is None:
+            await self.bot.responder.send(interaction, f"❌ Unknown setting `{key}`.", ephemeral=True)
+            return None
+        if setting.scope == "global":
+            # Bot-wide settings affect every server, so only the owner may change them
+            if not await self.bot.is_owner(interaction.user):
+                await self.bot.responder.send(interaction, "❌ This setting is bot-wide and can only be changed by the bot owner.", ephemeral=True)
+                return None
+            return setting, GLOBAL
+        return setting, interaction.guild_id
+
+    async def key_autocomplete(self, interaction: discord.Interaction, current: str):
+        current = current.lower()
+        return [
+            app_commands.Choice(name=f"{key} — {setting.description}"[:100], value=key)
+            for key, setting in sorted(self.bot.config.settings.items())
+            if current in key
+        ][:25]
+
+    config_group = app_commands.Group(name="config", description="View or change this server's bot settings.", guild_only=True)
+
+    @config_group.command(name="show", description="Show the current settings.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def config_show(self, interaction: discord.Interaction):
+        config = self.bot.config
+        guild_overrides = await config.overrides(interaction.guild_id)
+        global_overrides = await config.overrides(GLOBAL)
+
+        embed = discord.Embed(title="⚙️ Settings", color=discord.Color.blurple())
+        for key, setting in sorted(config.settings.items()):
+            overrides = global_overrides if setting.scope == "global" else guild_overrides
+            value = overrides.get(key, setting.default)
+            origin = "default" if key not in overrides else "custom"
+            scope = " (bot-wide)" if setting.scope == "global" else ""
+            embed.add_field(
+                name=f"{key}{scope} • {origin}",
+                value=f"`{setting.format(value)}`"[:1024],
+                inline=False
+            )
+        embed.set_footer(text=f"Separate list entries with \"{LIST_SEPARATOR}\" when using /config set.")
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+    @config_group.command(name="set", description="Change a setting.")
+    @app_commands.describe(key="The setting to change", value=f"The new value (separate list entries with {LIST_SEPARATOR})")
+    @app_commands.autocomplete(key=key_autocomplete)
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def config_set(self, interaction: discord.Interaction, key: str, value: str):
+        resolved = await self.resolve(interaction, key)
+        if resolved is None:
+            return
+        setting, guild_id = resolved
+        try:
+            parsed = setting.parse(value)
+        except ValueError as e:
+            return await self.bot.responder.send(interaction, f"❌ Invalid value for `{key}`: {e}", ephemeral=True)
+
+        await self.bot.config.set(guild_id, setting, parsed)
+        await self.bot.responder.send(interaction, f"✅ `{key}` is now `{setting.format(parsed)}`"[:2000], ephemeral=True)
+
+    @config_group.command(name="reset", description="Reset a setting to its default.")
+    @app_commands.describe(key="The setting to reset")
+    @app_commands.autocomplete(key=key_autocomplete)
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def config_reset(self, interaction: discord.Interaction, key: str):
+        resolved = await self.resolve(interaction, key)
+        if resolved is None:
+            return
+        setting, guild_id = resolved
+        await self.bot.config.reset(guild_id, setting)
+        await self.bot.responder.send(interaction, f"✅ `{key}` was reset to its default.", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    """Adds the Config cog to the bot."""
+    await bot.add_cog(Config(bot))
@@ -1,7 +1,30 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import datetime
+import re
+import time
+from typing import Literal
+
+from utils.ban_index import BanIndex
+from utils.bulk_actions import BulkModerationEngine
+from utils.case_log import CaseLog
+from utils.cooldowns import cooldown
+from utils.escalation import EscalationPolicy, EscalationStep
+from utils.jobs import JobScheduler, RetryLater
+from utils.purge import PurgeFilter, stream_purge
+from utils.responder import response_policy
+from utils.scheduler import HeapScheduler
+from utils.warning_store import WarningStore
+
+# Only expiries due within this window are held in the scheduler's heap; later
+# ones stay in the database until a refresh pulls them in.
+EXPIRY_HORIZON = 2 * 3600
+
+# Discord timeouts are capped at 28 days; longer mutes use a role instead
+MAX_TIMEOUT_MINUTES = 40320
+MAX_MUTE_MINUTES = 366 * 24 * 60
+MUTED_ROLE_NAME = "Muted"
 
 class Moderation(commands.Cog):
     """
@@ -9,9 +32,84 @@ class Moderation(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Dictionary to store warnings: {guild_id: {user_id: [warning_reason_1, warning_reason_2, ...]}}
-        # Note: For production, this should use a database (e.g., SQLite, PostgreSQL).
-        self.warnings = {}
+        # Persistent warning storage (SQLite), shared through the bot's database connection
+        self.warning_store = WarningStore(bot.db)
+        # Per-guild ban lookups for /unban, kept current from ban/unban events
+        self.ban_index = BanIndex()
+        # Rate-limited worker queue for the /bulk commands
+        self.bulk_engine = BulkModerationEngine()
+        # Per-guild "N warnings -> action" ladders and warning lifetimes
+        self.escalation = EscalationPolicy(bot.db)
+        # One timer task that serves every pending warning expiry from a heap
+        self.expiry_scheduler = HeapScheduler(self.expire_warnings)
+        # (guild_id, user_id, expires_at) already in the heap, so refreshes don't duplicate them
+        self._scheduled_expiries = set()
+        # Durable jobs that undo temporary bans and role-based mutes
+        self.jobs = JobScheduler(
+            bot.db, {"unban": self.end_temp_ban, "unmute": self.end_role_mute}, owns=self.owns_guild
+        )
+        # Append-only record of every moderation action, written in batches
+        self.case_log = CaseLog(bot.db)
+
+    async def cog_load(self):
+        # The old warnings.json file is imported into the database the first time this runs
+        await self.warning_store.start(legacy_json="warnings.json")
+        await self.case_log.start()
+        await self.escalation.start()
+        self.expiry_scheduler.start()
+        self.refresh_expiries.start()
+        # Jobs that came due while the bot was offline run as soon as it's ready
+        await self.jobs.start()
+
+    async def cog_unload(self):
+        self.refresh_expiries.cancel()
+        await self.expiry_scheduler.close()
+        await self.jobs.close()
+        # Write out any warnings and cases still waiting for the next batch
+        await self.warning_store.close()
+        await self.case_log.close()
+
+    # --- Hot Reload ---
+    def export_state(self):
+        # Everything else is persisted and reloaded; the ban lists would otherwise be refetched
+        return {"ban_index": self.ban_index}
+
+    def import_state(self, state):
+        self.ban_index = state["ban_index"]
+
+    # --- Warning Expiry ---
+    @tasks.loop(seconds=EXPIRY_HORIZON / 2)
+    async def refresh_expiries(self):
+        """Moves expiries that fall inside the horizon from the database into the scheduler."""
+        for guild_id, user_id, expires_at in await self.warning_store.upcoming_expiries(time.time() + EXPIRY_HORIZON):
+            self.schedule_expiry(guild_id, user_id, expires_at)
+
+    def schedule_expiry(self, guild_id: int, user_id: int, expires_at: float):
+        key = (guild_id, user_id, expires_at)
+        if key not in self._scheduled_expiries:
+            self._scheduled_expiries.add(key)
+            self.expiry_scheduler.schedule(expires_at, key)
+
+    async def expire_warnings(self, due):
+        """Scheduler handler: deletes a batch of expired warnings in one statement."""
+        self._scheduled_expiries.difference_update(due)
+        await self.warning_store.expire({(guild_id, user_id) for guild_id, user_id, _ in due})
+
+    # --- Ban Index Updates ---
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        self.ban_index.on_ban(guild.id, user)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self.ban_index.on_unban(guild.id, user.id)
+        # A manual unban makes a pending temp-ban expiry pointless
+        await self.jobs.cancel("unban", guild.id, user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.ban_index.forget(guild.id)
+
 
     # --- Error Handling ---
     async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
@@ -19,14 +117,14 @@ class Moderation(commands.Cog):
         if isinstance(error, app_commands.MissingPermissions):
             # Format the required permissions nicely
             perms = ', '.join([p.replace('_', ' ').title() for p in error.missing_permissions])
-            await interaction.response.send_message(
-                f"❌ You lack the required permissions to use this command: **{perms}**.",
+            await self.bot.responder.send(
+                interaction, f"❌ You lack the required permissions to use this command: **{perms}**.",
                 ephemeral=True
             )
         else:
             # For all other unhandled errors
-            await interaction.response.send_message(
-                f"❌ An unhandled error occurred: `{error}`",
+            await self.bot.responder.send(
+                interaction, f"❌ An unhandled error occurred: `{error}`",
                 ephemeral=True
             )
             print(f"Unhandled error in Moderation Cog: {error}") # Log error to console
@@ -34,16 +132,18 @@ class Moderation(commands.Cog):
 
     # --- Kick Command ---
     @app_commands.command(name="kick", description="Kick a member from the server.")
+    @response_policy(ephemeral=False)
     @app_commands.describe(member="The member to kick", reason="The reason for the kick")
     @app_commands.checks.has_permissions(kick_members=True)
     async def kick(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason specified"):
         if member == interaction.user:
-            return await interaction.response.send_message("❌ You can't kick yourself!", ephemeral=True)
+            return await self.bot.responder.send(interaction, "❌ You can't kick yourself!", ephemeral=True)
         if member.top_role >= interaction.user.top_role and interaction.guild.owner_id != interaction.user.id:
-            return await interaction.response.send_message("❌ You cannot kick a member with an equal or higher role.", ephemeral=True)
+            return await self.bot.responder.send(interaction, "❌ You cannot kick a member with an equal or higher role.", ephemeral=True)
 
         try:
             await member.kick(reason=reason)
+            self.case_log.record(interaction.guild_id, "kick", member.id, interaction.user.id, reason)
             embed = discord.Embed(
                 description=f"✅ Kicked {member.mention}", 
                 color=discord.Color.red()
@@ -51,21 +151,32 @@ class Moderation(commands.Cog):
             embed.set_author(name="Member Kicked", icon_url=member.display_avatar.url)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Reason", value=reason, inline=True)
-            await interaction.response.send_message(embed=embed)
+            await self.bot.responder.send(interaction, embed=embed)
         except discord.Forbidden:
-            await interaction.response.send_message(f"❌ I do not have permission to kick {member.mention}.", ephemeral=True)
+            await self.bot.responder.send(interaction, f"❌ I do not have permission to kick {member.mention}.", ephemeral=True)
 
 
     # --- Ban Command ---
-    @app_commands.command(name="ban", description="Ban a member from the server.")
-    @app_commands.describe(member="The member to ban", reason="The reason for the ban")
+    @app_commands.command(name="ban", description="Ban a member from the server, optionally for a limited time.")
+    @response_policy(ephemeral=False)
+    @app_commands.describe(
+        member="The member to ban",
+        reason="The reason for the ban",
+        duration_hours="Lift the ban automatically after this many hours (permanent if omitted)"
+    )
     @app_commands.checks.has_permissions(ban_members=True)
-    async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason specified"):
+    async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason specified",
+                  duration_hours: app_commands.Range[int, 1, 8784] = None):
         if member == interaction.user:
-            return await interaction.response.send_message("❌ You can't ban yourself!", ephemeral=True)
+            return await self.bot.responder.send(interaction, "❌ You can't ban yourself!", ephemeral=True)
         
         try:
             await member.ban(reason=reason)
+            if duration_hours:
+                await self.jobs.add("unban", interaction.guild_id, member.id, time.time() + duration_hours * 3600)
+                self.case_log.record(interaction.guild_id, "tempban", member.id, interaction.user.id, f"{reason} ({duration_hours}h)")
+            else:
+                self.case_log.record(interaction.guild_id, "ban", member.id, interaction.user.id, reason)
             embed = discord.Embed(
                 description=f"✅ Banned {member.mention}", 
                 color=discord.Color.dark_red()
@@ -73,9 +184,11 @@ class Moderation(commands.Cog):
             embed.set_author(name="Member Banned", icon_url=member.display_avatar.url)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Reason", value=reason, inline=True)
-            await interaction.response.send_message(embed=embed)
+            if duration_hours:
+                embed.add_field(name="Duration", value=f"{duration_hours} hours", inline=True)
+            await self.bot.responder.send(interaction, embed=embed)
         except discord.Forbidden:
-            await interaction.response.send_message(f"❌ I do not have permission to ban {member.mention}.", ephemeral=True)
+            await self.bot.responder.send(interaction, f"❌ I do not have permission to ban {member.mention}.", ephemeral=True)
 
 
     # --- Unban Command ---
@@ -83,39 +196,31 @@ class Moderation(commands.Cog):
     @app_commands.describe(user_identifier="User ID or Username#Discriminator of the user to unban")
     @app_commands.checks.has_permissions(ban_members=True)
     async def unban(self, interaction: discord.Interaction, user_identifier: str):
-        await interaction.response.defer(ephemeral=True) # Defer as fetching bans can take time
-
-        banned_users = await interaction.guild.bans()
-        user_to_unban = None
+        await self.bot.responder.defer(interaction, ephemeral=True) # Defer as fetching bans can take time
 
-        # Try to find by User ID
+        # IDs are a single fetch_ban call; names use the (lazily loaded) ban index
         try:
-            user_id = int(user_identifier)
-            for ban_entry in banned_users:
-                if ban_entry.user.id == user_id:
-                    user_to_unban = ban_entry.user
-                    break
-        except ValueError:
-            # Not a number, try to find by Name#Discriminator
-            for ban_entry in banned_users:
-                if str(ban_entry.user) == user_identifier:
-                    user_to_unban = ban_entry.user
-                    break
-        
+            user_to_unban = await self.ban_index.resolve(interaction.guild, user_identifier)
+        except discord.Forbidden:
+            return await self.bot.responder.send(interaction, "❌ I do not have permission to view the ban list.", ephemeral=True)
+
         if user_to_unban:
             try:
                 await interaction.guild.unban(user_to_unban)
-                await interaction.followup.send(f"✅ User **{str(user_to_unban)}** unbanned.")
+                self.ban_index.on_unban(interaction.guild_id, user_to_unban.id)
+                self.case_log.record(interaction.guild_id, "unban", user_to_unban.id, interaction.user.id)
+                await self.bot.responder.send(interaction, f"✅ User **{str(user_to_unban)}** unbanned.", ephemeral=True)
             except discord.Forbidden:
-                await interaction.followup.send("❌ I do not have permission to unban users.")
+                await self.bot.responder.send(interaction, "❌ I do not have permission to unban users.", ephemeral=True)
             except Exception as e:
-                await interaction.followup.send(f"❌ An error occurred during unban: `{e}`")
+                await self.bot.responder.send(interaction, f"❌ An error occurred during unban: `{e}`", ephemeral=True)
         else:
-            await interaction.followup.send(f"❌ User identifier **`{user_identifier}`** not found in the ban list.")
+            await self.bot.responder.send(interaction, f"❌ User identifier **`{user_identifier}`** not found in the ban list.", ephemeral=True)
 
 
     # --- Mute Command (Timeout) ---
-    @app_commands.command(name="mute", description="Mute a member for a certain duration (uses Discord Timeout).")
+    @app_commands.command(name="mute", description="Mute a member for a certain duration (Discord Timeout, or a role beyond 28 days).")
+    @response_policy(ephemeral=False)
     @app_commands.describe(
         member="Member to mute", 
         duration_minutes="Duration in minutes", 
@@ -124,14 +229,19 @@ class Moderation(commands.Cog):
     @app_commands.checks.has_permissions(moderate_members=True)
     async def mute(self, interaction: discord.Interaction, member: discord.Member, duration_minutes: int, reason: str = "No reason specified"):
         if duration_minutes <= 0:
-            return await interaction.response.send_message("❌ Duration must be a positive number of minutes.", ephemeral=True)
-        if duration_minutes > 40320: # 28 days is the max timeout
-            return await interaction.response.send_message("❌ Maximum mute duration is 28 days (40320 minutes).", ephemeral=True)
+            return await self.bot.responder.send(interaction, "❌ Duration must be a positive number of minutes.", ephemeral=True)
+        if duration_minutes > MAX_MUTE_MINUTES:
+            return await self.bot.responder.send(interaction, f"❌ Maximum mute duration is 366 days ({MAX_MUTE_MINUTES} minutes).", ephemeral=True)
 
         try:
-            mute_until = discord.utils.utcnow() + datetime.timedelta(minutes=duration_minutes)
-            await member.timeout(mute_until, reason=reason)
-            
+            if duration_minutes <= MAX_TIMEOUT_MINUTES:
+                await self.timeout_member(member, duration_minutes, reason)
+            else:
+                # Setting up the role's channel overwrites can take a while the first time
+                await self.bot.responder.defer(interaction)
+                await self.role_mute(member, duration_minutes, reason)
+            self.case_log.record(interaction.guild_id, "mute", member.id, interaction.user.id, f"{reason} ({duration_minutes}m)")
+
             embed = discord.Embed(
                 description=f"✅ Muted {member.mention}", 
                 color=discord.Color.orange()
@@ -139,77 +249,445 @@ class Moderation(commands.Cog):
             embed.set_author(name="Member Muted", icon_url=member.display_avatar.url)
             embed.add_field(name="Duration", value=f"{duration_minutes} minutes", inline=True)
             embed.add_field(name="Reason", value=reason, inline=True)
-            await interaction.response.send_message(embed=embed)
+            await self.bot.responder.send(interaction, embed=embed)
         except discord.Forbidden:
-            await interaction.response.send_message(f"❌ I do not have permission to mute {member.mention}.", ephemeral=True)
+            await self.bot.responder.send(interaction, f"❌ I do not have permission to mute {member.mention}.", ephemeral=True)
 
 
     # --- Unmute Command (Remove Timeout) ---
-    @app_commands.command(name="unmute", description="Unmute a member (removes Discord Timeout).")
+    @app_commands.command(name="unmute", description="Unmute a member (removes Discord Timeout or the Muted role).")
     @app_commands.describe(member="Member to unmute")
     @app_commands.checks.has_permissions(moderate_members=True)
     async def unmute(self, interaction: discord.Interaction, member: discord.Member):
         try:
-            if not member.timed_out:
-                return await interaction.response.send_message(f"❌ {member.mention} is not currently timed out.", ephemeral=True)
-                
-            await member.timeout(None) # Setting duration to None removes the timeout
-            await interaction.response.send_message(f"✅ {member.mention} unmuted.", ephemeral=True)
+            muted_role = discord.utils.get(member.roles, name=MUTED_ROLE_NAME)
+            if not member.timed_out and muted_role is None:
+                return await self.bot.responder.send(interaction, f"❌ {member.mention} is not currently muted.", ephemeral=True)
+
+            if member.timed_out:
+                await member.timeout(None) # Setting duration to None removes the timeout
+            if muted_role is not None:
+                await member.remove_roles(muted_role, reason=f"Unmuted by {interaction.user}")
+                await self.jobs.cancel("unmute", member.guild.id, member.id)
+            self.case_log.record(interaction.guild_id, "unmute", member.id, interaction.user.id)
+            await self.bot.responder.send(interaction, f"✅ {member.mention} unmuted.", ephemeral=True)
         except discord.Forbidden:
-            await interaction.response.send_message(f"❌ I do not have permission to unmute {member.mention}.", ephemeral=True)
+            await self.bot.responder.send(interaction, f"❌ I do not have permission to unmute {member.mention}.", ephemeral=True)
 
 
     # --- Clear Command ---
-    @app_commands.command(name="clear", description="Bulk delete a number of messages.")
-    @app_commands.describe(amount="Number of messages to delete (1-100)")
+    @app_commands.command(name="clear", description="Bulk delete messages, optionally filtered.")
+    @cooldown(1, 10.0, scope="channel")
+    @app_commands.describe(
+        amount="Number of matching messages to delete (1-10000)",
+        user="Only delete messages from this member",
+        pattern="Only delete messages matching this regular expression",
+        attachments="Only delete messages with attachments",
+        bots="Only delete messages sent by bots"
+    )
     @app_commands.checks.has_permissions(manage_messages=True)
-    async def clear(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, 100]):
-        # Clear command needs deferral because .purge() can take a little longer
-        await interaction.response.defer(ephemeral=True)
-        
+    async def clear(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, 10000],
+                    user: discord.Member = None, pattern: str = None, attachments: bool = False, bots: bool = False):
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE) if pattern else None
+        except re.error as e:
+            return await self.bot.responder.send(interaction, f"❌ Invalid pattern: `{e}`", ephemeral=True)
+
+        # Clear command needs deferral because purging can take a while
+        await self.bot.responder.defer(interaction, ephemeral=True)
+        status = await self.bot.responder.send(interaction, f"🧹 Deleting up to **{amount}** messages...", ephemeral=True, wait=True)
+
+        async def report(content):
+            # The status is a followup, whose token expires after 15 minutes; long purges
+            # (old messages go one per second) report the result in the channel instead
+            if self.bot.responder.token_valid(interaction):
+                await self.bot.responder.edit_message(status, content=content)
+            else:
+                await interaction.channel.send(
+                    f"{interaction.user.mention} {content}", allowed_mentions=discord.AllowedMentions(users=True)
+                )
+
+        async def progress(deleted, matched):
+            # Intermediate updates are simply dropped once the status can't be edited any more
+            if self.bot.responder.token_valid(interaction):
+                await self.bot.responder.edit_message(status, content=f"🧹 Deleted **{deleted}** of **{matched}** matching messages so far...")
+
+        # Filtered purges may have to look further back; cap how much history gets scanned
+        is_filtered = any((user, compiled, attachments, bots))
+        scan_limit = min(amount * 10, 100000) if is_filtered else amount
+
         try:
-            deleted = await interaction.channel.purge(limit=amount)
-            await interaction.followup.send(f"🧹 Successfully deleted **{len(deleted)}** messages.")
+            deleted = await stream_purge(
+                interaction.channel,
+                PurgeFilter(author=user, pattern=compiled, attachments=attachments, bots=bots, workers=self.bot.workers),
+                amount,
+                scan_limit=scan_limit,
+                progress=progress
+            )
         except discord.Forbidden:
-            await interaction.followup.send("❌ I do not have permission to delete messages in this channel.")
+            result = "❌ I do not have permission to delete messages in this channel."
         except Exception as e:
-            await interaction.followup.send(f"❌ An error occurred during clearing: `{e}`")
+            result = f"❌ An error occurred during clearing: `{e}`"
+        else:
+            # Recorded before reporting, so a failed status edit can't lose the case
+            self.case_log.record(
+                interaction.guild_id, "clear", user.id if user else None, interaction.user.id,
+                f"Deleted {deleted} messages in #{interaction.channel}"
+            )
+            result = f"🧹 Successfully deleted **{deleted}** messages."
+        try:
+            await report(result)
+        except discord.HTTPException as e:
+            print(f"⚠ Could not report the result of /clear in #{interaction.channel}: {e}")
+
+
+    # --- Bulk Commands (raid cleanup) ---
+    bulk = app_commands.Group(name="bulk", description="Kick, ban or mute many members at once.")
+
+    async def resolve_bulk_targets(self, interaction: discord.Interaction, members: str, role: discord.Role, joined_within_minutes: int, allow_absent: bool = False):
+        """Collects the targets of a bulk action, skipping anyone the moderator can't act on."""
+        guild = interaction.guild
+        targets = {}
+
+        # Mentions or raw IDs, separated by anything
+        for user_id in map(int, re.findall(r"\d{15,20}", members or "")):
+            member = await self.bot.member_cache.get_member(guild, user_id)
+            if member is None and allow_absent:
+                # Users who already left can still be banned by ID
+                member = discord.Object(id=user_id)
+            if member is not None:
+                targets[user_id] = member
+
+        # Role and join-time filters need the full member list, which lean cache modes load on demand
+        if role is not None or joined_within_minutes:
+            await self.bot.member_cache.ensure_chunked(guild)
 
-    
-    # --- Warn Command (using in-memory storage) ---
+        if role is not None:
+            targets.update((m.id, m) for m in role.members)
+
+        if joined_within_minutes:
+            since = discord.utils.utcnow() - datetime.timedelta(minutes=joined_within_minutes)
+            targets.update((m.id, m) for m in guild.members if m.joined_at and m.joined_at >= since)
+
+        is_owner = guild.owner_id == interaction.user.id
+        def allowed(target):
+            if target.id in (interaction.user.id, guild.owner_id, guild.me.id):
+                return False
+            if isinstance(target, discord.Member):
+                # Same hierarchy rules as the single-member commands, plus the bot's own role
+                if target.top_role >= guild.me.top_role:
+                    return False
+                if target.top_role >= interaction.user.top_role and not is_owner:
+                    return False
+            return True
+
+        return [t for t in targets.values() if allowed(t)]
+
+    async def run_bulk(self, interaction: discord.Interaction, action: str, targets, reason: str, until=None):
+        """Runs a bulk action, reporting progress by editing a single status message."""
+        if not targets:
+            return await self.bot.responder.send(interaction, "❌ No members matched (or all of them are above you or me in the role hierarchy).", ephemeral=True)
+
+        status = await self.bot.responder.send(interaction, f"⏳ Starting bulk {action} of **{len(targets)}** members...", ephemeral=True, wait=True)
+
+        async def progress(done, failed, total):
+            await self.bot.responder.edit_message(status, content=f"⏳ Bulk {action}: **{done + failed}/{total}** processed ({failed} failed)...")
+
+        try:
+            result = await self.bulk_engine.run(action, interaction.guild, targets, reason, until=until, progress=progress)
+        except discord.Forbidden:
+            return await self.bot.responder.edit_message(status, content=f"❌ I do not have permission to {action} members.")
+
+        case_action = "mute" if action == "timeout" else action
+        for user in result.succeeded:
+            self.case_log.record(interaction.guild_id, case_action, user.id, interaction.user.id, f"[Bulk] {reason}")
+        await self.bot.responder.edit_message(
+            status, content=f"✅ Bulk {action} finished: **{len(result.succeeded)}** succeeded, **{len(result.failed)}** failed."
+        )
+
+    @cooldown(1, 30.0, scope="guild")
+    @bulk.command(name="kick", description="Kick many members at once.")
+    @app_commands.describe(
+        members="Mentions or IDs of members to kick",
+        role="Kick everyone with this role",
+        joined_within_minutes="Kick everyone who joined in the last N minutes",
+        reason="The reason for the kick"
+    )
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def bulk_kick(self, interaction: discord.Interaction, members: str = None, role: discord.Role = None,
+                        joined_within_minutes: app_commands.Range[int, 1, 10080] = None, reason: str = "Bulk kick"):
+        await self.bot.responder.defer(interaction, ephemeral=True)
+        targets = await self.resolve_bulk_targets(interaction, members, role, joined_within_minutes)
+        await self.run_bulk(interaction, "kick", targets, reason)
+
+    @cooldown(1, 30.0, scope="guild")
+    @bulk.command(name="ban", description="Ban many members at once (uses Discord's bulk ban).")
+    @app_commands.describe(
+        members="Mentions or IDs of users to ban (they don't need to be in the server)",
+        role="Ban everyone with this role",
+        joined_within_minutes="Ban everyone who joined in the last N minutes",
+        reason="The reason for the ban"
+    )
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def bulk_ban(self, interaction: discord.Interaction, members: str = None, role: discord.Role = None,
+                       joined_within_minutes: app_commands.Range[int, 1, 10080] = None, reason: str = "Bulk ban"):
+        await self.bot.responder.defer(interaction, ephemeral=True)
+        targets = await self.resolve_bulk_targets(interaction, members, role, joined_within_minutes, allow_absent=True)
+        await self.run_bulk(interaction, "ban", targets, reason)
+
+    @cooldown(1, 30.0, scope="guild")
+    @bulk.command(name="mute", description="Mute many members at once (uses Discord Timeout).")
+    @app_commands.describe(
+        duration_minutes="Duration in minutes",
+        members="Mentions or IDs of members to mute",
+        role="Mute everyone with this role",
+        joined_within_minutes="Mute everyone who joined in the last N minutes",
+        reason="Reason for mute"
+    )
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def bulk_mute(self, interaction: discord.Interaction, duration_minutes: app_commands.Range[int, 1, 40320],
+                        members: str = None, role: discord.Role = None,
+                        joined_within_minutes: app_commands.Range[int, 1, 10080] = None, reason: str = "Bulk mute"):
+        await self.bot.responder.defer(interaction, ephemeral=True)
+        targets = await self.resolve_bulk_targets(interaction, members, role, joined_within_minutes)
+        until = discord.utils.utcnow() + datetime.timedelta(minutes=duration_minutes)
+        await self.run_bulk(interaction, "timeout", targets, reason, until=until)
+
+
+    # --- Warn Command (using the persistent warning store) ---
     @app_commands.command(name="warn", description="Issue a warning to a member.")
     @app_commands.describe(member="The member to warn", reason="The reason for the warning")
     @app_commands.checks.has_permissions(kick_members=True) # Usually mods/admins who can kick can warn
     async def warn(self, interaction: discord.Interaction, member: discord.Member, reason: str):
-        guild_id = interaction.guild_id
-        user_id = member.id
-        
-        # Initialize dictionary if not present
-        if guild_id not in self.warnings:
-            self.warnings[guild_id] = {}
-        if user_id not in self.warnings[guild_id]:
-            self.warnings[guild_id][user_id] = []
-
-        # Add the warning
-        self.warnings[guild_id][user_id].append(reason)
-        warning_count = len(self.warnings[guild_id][user_id])
+        warning_count = await self.add_warning(member, reason, moderator=interaction.user, notify=False)
         
         # Send confirmation
-        await interaction.response.send_message(
-            f"⚠️ **{member.display_name}** has been warned for: **{reason}**. "
+        await self.bot.responder.send(
+            interaction, f"⚠️ **{member.display_name}** has been warned for: **{reason}**. "
             f"Total warnings: **{warning_count}**.",
             ephemeral=True
         )
-        
+        await self.notify_warning(member, reason, warning_count)
+        # The DM goes out before any kick or ban, while the bot still shares a server with them
+        outcome = await self.apply_escalation(member, warning_count)
+        if outcome:
+            await self.bot.responder.send(interaction, f"📈 Escalation: {outcome}", ephemeral=True)
+
+    # --- Shared Actions (also used by automod) ---
+    async def add_warning(self, member: discord.Member, reason: str, moderator: discord.abc.User = None, notify: bool = True) -> int:
+        """Records a warning for `member` and returns their new warning count."""
+        now = time.time()
+        expires_at = self.escalation.expires_at(member.guild.id, now)
+        # Add the warning (served from the cache, written to disk in the next batch)
+        warning_count = await self.warning_store.add(
+            member.guild.id, member.id, reason,
+            moderator_id=moderator.id if moderator else None, expires_at=expires_at
+        )
+        self.case_log.record(member.guild.id, "warn", member.id, (moderator or self.bot.user).id, reason)
+        # Expiries beyond the horizon are picked up by the next refresh instead
+        if expires_at is not None and expires_at <= now + EXPIRY_HORIZON:
+            self.schedule_expiry(member.guild.id, member.id, expires_at)
+        if notify:
+            await self.notify_warning(member, reason, warning_count)
+        return warning_count
+
+    async def apply_escalation(self, member: discord.Member, warning_count: int):
+        """Applies the guild's ladder step for `warning_count`, if any. Returns a description of what happened."""
+        step = self.escalation.step_for(member.guild.id, warning_count)
+        if step is None:
+            return None
+        reason = f"Reached {warning_count} warnings"
+        try:
+            if step.action == "timeout":
+                await self.timeout_member(member, step.duration_minutes, reason)
+                outcome = f"**{member.display_name}** was timed out for {step.duration_minutes} minutes."
+            elif step.action == "kick":
+                await member.kick(reason=reason)
+                outcome = f"**{member.display_name}** was kicked."
+            else:
+                await member.ban(reason=reason)
+                outcome = f"**{member.display_name}** was banned."
+        except discord.Forbidden:
+            return f"Could not {step.action} **{member.display_name}** (missing permissions or role hierarchy)."
+        # Only actions that actually happened go in the case log
+        case_action = "mute" if step.action == "timeout" else step.action
+        self.case_log.record(member.guild.id, case_action, member.id, self.bot.user.id, f"[Escalation] {reason}")
+        return outcome
+
+    async def notify_warning(self, member: discord.Member, reason: str, warning_count: int):
         # Optionally DM the warned user
         try:
             await member.send(
-                f"You received a warning in **{interaction.guild.name}** for: **{reason}**."
+                f"You received a warning in **{member.guild.name}** for: **{reason}**."
                 f" This is your warning number **{warning_count}**."
             )
-        except:
+        except discord.HTTPException:
             pass # Ignore if DMs are closed
 
+    async def timeout_member(self, member: discord.Member, duration_minutes: int, reason: str):
+        """Times `member` out for `duration_minutes` (raises discord.Forbidden if not allowed)."""
+        mute_until = discord.utils.utcnow() + datetime.timedelta(minutes=duration_minutes)
+        await member.timeout(mute_until, reason=reason)
+
+    # --- Temporary Bans & Long Mutes ---
+    async def role_mute(self, member: discord.Member, duration_minutes: int, reason: str):
+        """Mutes `member` with the Muted role and schedules its removal (for mutes longer than a timeout allows)."""
+        role = await self.get_muted_role(member.guild)
+        await member.add_roles(role, reason=reason)
+        await self.jobs.add(
+            "unmute", member.guild.id, member.id, time.time() + duration_minutes * 60, {"role_id": role.id}
+        )
+
+    async def get_muted_role(self, guild: discord.Guild) -> discord.Role:
+        """Returns the guild's Muted role, creating it (and its channel overwrites) if needed."""
+        role = discord.utils.get(guild.roles, name=MUTED_ROLE_NAME)
+        if role is not None:
+            return role
+        role = await guild.create_role(name=MUTED_ROLE_NAME, reason="Role used for long mutes")
+        overwrite = discord.PermissionOverwrite(
+            send_messages=False, send_messages_in_threads=False, create_public_threads=False,
+            create_private_threads=False, add_reactions=False, speak=False
+        )
+        for channel in guild.channels:
+            try:
+                await channel.set_permissions(role, overwrite=overwrite, reason="Role used for long mutes")
+            except discord.Forbidden:
+                pass # Channels the bot can't manage keep their current permissions
+        return role
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """Whether `guild_id` is on this process's shards (always, unless running as a cluster worker)."""
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        if not shard_ids or not self.bot.shard_count:
+            return True
+        return (guild_id >> 22) % self.bot.shard_count in shard_ids
+
+    def job_guild(self, job) -> discord.Guild:
+        """The guild a job acts on; raises RetryLater (so the job waits) while it isn't available."""
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            # An outage or a restart looks the same as having left; keep retrying rather
+            # than drop the job, since an outage can outlast any number of attempts
+            raise RetryLater(f"Guild {job.guild_id} is not available")
+        return guild
+
+    async def end_temp_ban(self, job):
+        """Job handler: lifts an expired temporary ban."""
+        await self.bot.wait_until_ready()
+        guild = self.job_guild(job)
+        try:
+            await guild.unban(discord.Object(id=job.user_id), reason="Temporary ban expired")
+            self.case_log.record(guild.id, "unban", job.user_id, self.bot.user.id, "Temporary ban expired")
+        except (discord.NotFound, discord.Forbidden):
+            pass # Already unbanned, or the bot lost its permissions
+        self.ban_index.on_unban(guild.id, job.user_id)
+
+    async def end_role_mute(self, job):
+        """Job handler: removes the Muted role once a long mute is over."""
+        await self.bot.wait_until_ready()
+        guild = self.job_guild(job)
+        role = guild.get_role(job.data.get("role_id"))
+        if role is None:
+            return # The role was deleted, which unmuted everyone anyway
+        try:
+            member = await self.bot.member_cache.get_member(guild, job.user_id)
+            if member is None:
+                return # The member left, taking the role with them
+            await member.remove_roles(role, reason="Mute expired")
+            self.case_log.record(guild.id, "unmute", job.user_id, self.bot.user.id, "Mute expired")
+        except (discord.NotFound, discord.Forbidden):
+            pass # The member left (taking the role with them), or the bot lost its permissions
+
+
+    # --- Case Log ---
+    @app_commands.command(name="cases", description="Look up moderation cases by member or moderator.")
+    @app_commands.describe(
+        user="Show cases against this user",
+        moderator="Show cases handled by this moderator",
+        page="Page number (10 cases per page)"
+    )
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def cases(self, interaction: discord.Interaction, user: discord.User = None, moderator: discord.User = None,
+                    page: app_commands.Range[int, 1, 10000] = 1):
+        if user is None and moderator is None:
+            return await self.bot.responder.send(interaction, "❌ Give a `user`, a `moderator`, or both.", ephemeral=True)
+
+        per_page = 10
+        total, cases = await self.case_log.query(
+            interaction.guild_id,
+            target_id=user.id if user else None,
+            moderator_id=moderator.id if moderator else None,
+            limit=per_page,
+            offset=(page - 1) * per_page
+        )
+        pages = max(1, -(-total // per_page))
+        subject = " and ".join(
+            part for part in (f"against {user}" if user else None, f"by {moderator}" if moderator else None) if part
+        )
+        embed = discord.Embed(title=f"📁 Cases {subject}", color=discord.Color.blurple())
+        lines = []
+        for case in cases:
+            target = f"<@{case.target_id}>" if case.target_id else "—"
+            lines.append(
+                f"**#{case.id}** `{case.action}` {target} by <@{case.moderator_id}> "
+                f"<t:{int(case.created_at)}:R>" + (f"\n> {case.reason[:200]}" if case.reason else "")
+            )
+        embed.description = "\n".join(lines) or "No cases found."
+        embed.set_footer(text=f"Page {min(page, pages)}/{pages} • {total} cases")
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+    # --- Escalation Settings ---
+    escalation_group = app_commands.Group(name="escalation", description="Configure automatic actions for repeated warnings.")
+
+    @escalation_group.command(name="set", description="Set the action taken when a member reaches a number of warnings.")
+    @app_commands.describe(
+        warnings="Number of active warnings that triggers the action",
+        action="What to do to the member",
+        duration_minutes="Timeout length in minutes (timeouts only)"
+    )
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def escalation_set(self, interaction: discord.Interaction, warnings: app_commands.Range[int, 1, 100],
+                             action: Literal["timeout", "kick", "ban"],
+                             duration_minutes: app_commands.Range[int, 1, 40320] = 60):
+        step = EscalationStep(action, duration_minutes if action == "timeout" else None)
+        await self.escalation.set_step(interaction.guild_id, warnings, step)
+        await self.bot.responder.send(
+            interaction, f"✅ At **{warnings}** warnings: {self.describe_step(step)}.", ephemeral=True
+        )
+
+    @escalation_group.command(name="remove", description="Remove the action for a number of warnings.")
+    @app_commands.describe(warnings="The warning count to clear")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def escalation_remove(self, interaction: discord.Interaction, warnings: app_commands.Range[int, 1, 100]):
+        if await self.escalation.remove_step(interaction.guild_id, warnings):
+            await self.bot.responder.send(interaction, f"✅ Removed the action at **{warnings}** warnings.", ephemeral=True)
+        else:
+            await self.bot.responder.send(interaction, f"❌ There is no action at **{warnings}** warnings.", ephemeral=True)
+
+    @escalation_group.command(name="expiry", description="Set how many days warnings last (0 = never expire).")
+    @app_commands.describe(days="Days before a new warning expires")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def escalation_expiry(self, interaction: discord.Interaction, days: app_commands.Range[int, 0, 3650]):
+        await self.escalation.set_expiry(interaction.guild_id, days)
+        lifetime = f"**{days}** days" if days else "forever"
+        await self.bot.responder.send(interaction, f"✅ New warnings will last {lifetime}.", ephemeral=True)
+
+    @escalation_group.command(name="show", description="Show this server's escalation ladder.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def escalation_show(self, interaction: discord.Interaction):
+        ladder = self.escalation.ladder(interaction.guild_id)
+        lines = [f"**{count}** warnings → {self.describe_step(step)}" for count, step in sorted(ladder.items())]
+        lines = lines or ["No escalation steps. Add one with `/escalation set`."]
+        expiry = self.escalation.expires_at(interaction.guild_id, 0)
+        lines.append(f"Warnings expire after **{expiry / 86400:g}** days." if expiry else "Warnings never expire.")
+        await self.bot.responder.send(interaction, "📈 " + "\n".join(lines), ephemeral=True)
+
+    @staticmethod
+    def describe_step(step: EscalationStep) -> str:
+        if step.action == "timeout":
+            return f"timeout for {step.duration_minutes} minutes"
+        return step.action
+
 
 async def setup(bot: commands.Bot):
     """Adds the Moderation cog to the bot."""
@@ -0,0 +1,112 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+
+async def is_owner(interaction: discord.Interaction) -> bool:
+    """App-command check that only lets the bot owner through."""
+    return await interaction.client.is_owner(interaction.user)
+
+
+class Owner(commands.Cog):
+    """
+    Owner-only diagnostics and maintenance commands.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Custom handler for errors occurring in slash commands within this cog."""
+        if isinstance(error, app_commands.CheckFailure):
+            await self.bot.responder.send(interaction, "❌ This command is restricted to the bot owner.", ephemeral=True)
+        else:
+            # Answer anyway, or the command is left on its "thinking..." placeholder
+            await self.bot.responder.send(interaction, f"❌ An unhandled error occurred: `{error}`", ephemeral=True)
+            print(f"Unhandled error in Owner Cog: {error}") # Log error to console
+
+    # --- Stats Command ---
+    @app_commands.command(name="stats", description="Shows command latency, error and rate-limit statistics.")
+    @app_commands.check(is_owner)
+    @app_commands.default_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        metrics = self.bot.metrics
+        embed = discord.Embed(title="📈 Command Statistics", color=discord.Color.teal())
+
+        # Busiest commands first, with approximate (bucket-based) percentiles
+        busiest = sorted(metrics.latency.items(), key=lambda item: item[1].count, reverse=True)[:10]
+        lines = []
+        for name, histogram in busiest:
+            first_response = metrics.first_response.get(name)
+            ttfr = f" • first reply ≤{first_response.quantile(0.95) * 1000:g}ms" if first_response else ""
+            lines.append(
+                f"`/{name}` ×{histogram.count} • p50 ≤{histogram.quantile(0.5) * 1000:g}ms"
+                f" • p95 ≤{histogram.quantile(0.95) * 1000:g}ms{ttfr}"
+            )
+        embed.add_field(name="Latency", value="\n".join(lines) or "No commands recorded yet.", inline=False)
+
+        errors = [f"`/{name}` {error}: **{count}**" for (name, error), count in metrics.errors.most_common(10)]
+        embed.add_field(name="Errors", value="\n".join(errors) or "None 🎉", inline=False)
+
+        waits = metrics.ratelimit_waits
+        embed.add_field(
+            name="Rate Limits",
+            value=f"**{waits.count}** 429 responses, **{waits.sum:.1f}s** total wait",
+            inline=False
+        )
+
+        monitor = self.bot.loop_monitor
+        embed.add_field(
+            name="Event Loop",
+            value=f"lag p50 ≤{monitor.lag.quantile(0.5) * 1000:g}ms • p99 ≤{monitor.lag.quantile(0.99) * 1000:g}ms"
+                  f" • worst {monitor.worst * 1000:.0f}ms • blocked **{monitor.blocked}**×",
+            inline=False
+        )
+        workers = self.bot.workers
+        embed.add_field(
+            name="Workers",
+            value=f"CPU: **{workers.pending['cpu']}** pending, {workers.completed['cpu']} done"
+                  f" • I/O: **{workers.pending['io']}** pending, {workers.completed['io']} done",
+            inline=False
+        )
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+    # --- Reload Command ---
+    async def extension_autocomplete(self, interaction: discord.Interaction, current: str):
+        names = ["all"] + sorted(self.bot.extensions)
+        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name][:25]
+
+    @app_commands.command(name="reload", description="Reloads a cog (or all of them) without restarting the bot.")
+    @app_commands.describe(extension="The extension to reload, e.g. cogs.moderation")
+    @app_commands.autocomplete(extension=extension_autocomplete)
+    @app_commands.check(is_owner)
+    @app_commands.default_permissions(administrator=True)
+    async def reload(self, interaction: discord.Interaction, extension: str):
+        if extension != "all" and extension not in self.bot.extensions:
+            return await self.bot.responder.send(interaction, f"❌ `{extension}` is not loaded.", ephemeral=True)
+        await self.bot.responder.defer(interaction, ephemeral=True)
+
+        # Copy the list first: reloading changes bot.extensions while we iterate
+        extensions = sorted(self.bot.extensions) if extension == "all" else [extension]
+        results = [await self.bot.reloader.reload(name) for name in extensions]
+
+        embed = discord.Embed(title="♻️ Reload", color=discord.Color.teal())
+        for result in results:
+            phases = " • ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in result.timings.items())
+            if result.error is not None:
+                status = f"❌ Failed, kept the previous version: `{result.error}`"[:300]
+            elif result.synced is not None:
+                status = f"✅ Commands changed, synced {result.synced}"
+            else:
+                status = "✅ Commands unchanged, no sync needed"
+            handed_off = f"\nState kept: {', '.join(result.handed_off)}" if result.handed_off else ""
+            embed.add_field(
+                name=f"{result.extension} ({result.total * 1000:.0f}ms)",
+                value=f"{status}\n{phases}{handed_off}"[:1024],
+                inline=False
+            )
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    """Adds the Owner cog to the bot."""
+    await bot.add_cog(Owner(bot))
@@ -1,7 +1,45 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import datetime
+from typing import Literal
+
+from utils.cooldowns import cooldown
+from utils.embed_cache import EmbedCache
+from utils.guild_config import GLOBAL, Setting
+from utils.server_stats import ServerStats
+
+# Permissions requested by /invite (bot-wide, changeable by the owner with /config)
+INVITE_PERMISSIONS = Setting(
+    "invite_permissions", "permissions", discord.Permissions(administrator=True),
+    "Permissions requested by the /invite link", scope="global"
+)
+
+# How long a /userinfo embed is reused in the lean and none member cache modes
+MEMBER_EMBED_TTL = 60.0
+
+# /serverstats periods: (resolution, buckets)
+STATS_PERIODS = {
+    "hour": ("minute", 60),
+    "day": ("hour", 24),
+    "week": ("hour", 168),
+    "month": ("day", 30),
+    "quarter": ("day", 90),
+}
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values, width: int = 30) -> str:
+    """Draws values as a row of block characters, summing neighbours to fit `width`."""
+    if not values:
+        return ""
+    group = -(-len(values) // width)  # Ceiling division
+    sums = [sum(values[i:i + group]) for i in range(0, len(values), group)]
+    peak = max(sums)
+    if not peak:
+        return SPARK_BLOCKS[0] * len(sums)
+    return "".join(SPARK_BLOCKS[min(int(value / peak * len(SPARK_BLOCKS)), len(SPARK_BLOCKS) - 1)] for value in sums)
+
 
 class Utility(commands.Cog):
     """
@@ -9,24 +47,134 @@ class Utility(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        bot.config.register(INVITE_PERMISSIONS)
+        # Prebuilt /userinfo and /serverinfo embeds, dropped by the update listeners below. Without
+        # the full member cache, updates to uncached members never reach on_member_update, so
+        # member embeds also expire on their own
+        member_ttl = None if bot.member_cache.mode == "full" else MEMBER_EMBED_TTL
+        self.info_cache = EmbedCache(member_ttl=member_ttl)
+        # Member, message and command history for /serverstats, sampled by collect_stats
+        self.stats = ServerStats(bot.db)
+
+    async def cog_load(self):
+        await self.stats.start()
+        self.collect_stats.start()
+
+    async def cog_unload(self):
+        self.collect_stats.cancel()
+        await self.stats.close()
+
+    # --- Hot Reload ---
+    def export_state(self):
+        return {"info_cache": self.info_cache}
+
+    def import_state(self, state):
+        self.info_cache = state["info_cache"]
+
+    # --- Server Stats Collection ---
+    @tasks.loop(minutes=1)
+    async def collect_stats(self):
+        if not self.bot.is_ready():
+            return
+        await self.stats.sample(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is not None:
+            self.stats.count_message(message.guild.id)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        if interaction.guild_id is not None:
+            self.stats.count_command(interaction.guild_id)
+
+    # --- Info Cache Invalidation ---
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.info_cache.invalidate(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.info_cache.invalidate_guild(guild.id)
+        await self.stats.delete(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.info_cache.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.info_cache.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        # Only a change of channel type moves it between the text and voice counts
+        if before.type != after.type:
+            self.info_cache.invalidate(after.guild.id)
+
+    # Role changes can alter members' colors and role counts too, so they drop the whole guild
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.info_cache.invalidate_guild(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.info_cache.invalidate_guild(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.info_cache.invalidate_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.info_cache.invalidate(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        self.info_cache.invalidate(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.info_cache.invalidate(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        self.info_cache.invalidate_user(after.id)
 
     # --- Ping Command ---
     @app_commands.command(name="ping", description="Checks the bot's current latency.")
     async def ping(self, interaction: discord.Interaction):
         # Calculate latency in milliseconds and use the bot's internal latency attribute
         latency_ms = round(self.bot.latency * 1000)
-        await interaction.response.send_message(
-            f"🏓 **Pong!** Bot Latency: `{latency_ms}ms`", 
-            ephemeral=True
-        )
+        message = f"🏓 **Pong!** Bot Latency: `{latency_ms}ms`"
+
+        # When sharded, break the latency down by shard and point out the one serving this server
+        shards = self.bot.shard_metrics.snapshot()
+        if len(shards) > 1:
+            current = interaction.guild.shard_id if interaction.guild else 0
+            lines = [
+                f"{'➡️' if shard_id == current else '▫️'} Shard {shard_id}: `{shard_latency}ms`"
+                for shard_id, shard_latency, _, _ in shards
+            ]
+            message += "\n" + "\n".join(lines)
+
+        await self.bot.responder.send(interaction, message[:2000], ephemeral=True)
 
     # --- User Info Command ---
     @app_commands.command(name="userinfo", description="Shows detailed information about a user.")
+    @cooldown(2, 5.0)
     @app_commands.describe(user="The user to get info about (defaults to you)")
     async def userinfo(self, interaction: discord.Interaction, user: discord.Member = None):
         # If no user is specified, default to the command invoker
         user = user or interaction.user
-        
+
+        embed = self.info_cache.get(interaction.guild_id, user.id)
+        if embed is None:
+            embed = self.build_userinfo(user)
+            self.info_cache.put(interaction.guild_id, user.id, embed)
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+    def build_userinfo(self, user: discord.Member) -> discord.Embed:
         # Format dates for better readability
         created_at_str = discord.utils.format_dt(user.created_at, style='F') # Full date/time
         joined_at_str = discord.utils.format_dt(user.joined_at, style='F') if user.joined_at else "N/A"
@@ -43,14 +191,23 @@ class Utility(commands.Cog):
         embed.add_field(name="Status", value=str(user.status).title(), inline=True)
         embed.add_field(name="Bot?", value="Yes" if user.bot else "No", inline=True)
         embed.set_footer(text=f"ID: {user.id}")
-
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return embed
 
     # --- Server Info Command ---
     @app_commands.command(name="serverinfo", description="Shows detailed information about the server.")
+    @cooldown(2, 5.0)
     async def serverinfo(self, interaction: discord.Interaction):
         guild = interaction.guild
-        
+
+        embed = self.info_cache.get(guild.id)
+        if embed is None:
+            embed = self.build_serverinfo(guild)
+            self.info_cache.put(guild.id, None, embed)
+        # The member count changes constantly but is O(1) to read, so it's refreshed on every call
+        embed.set_field_at(3, name="Members", value=guild.member_count, inline=True)
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
+
+    def build_serverinfo(self, guild: discord.Guild) -> discord.Embed:
         # Format creation date
         created_at_str = discord.utils.format_dt(guild.created_at, style='F')
 
@@ -61,7 +218,8 @@ class Utility(commands.Cog):
         embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
         
         # First row of fields
-        embed.add_field(name="Owner", value=guild.owner.mention, inline=True)
+        # guild.owner is only set when the owner is in the member cache
+        embed.add_field(name="Owner", value=f"<@{guild.owner_id}>", inline=True)
         embed.add_field(name="Server ID", value=guild.id, inline=True)
         embed.add_field(name="Created On", value=created_at_str, inline=True)
         
@@ -69,8 +227,42 @@ class Utility(commands.Cog):
         embed.add_field(name="Members", value=guild.member_count, inline=True)
         embed.add_field(name="Channels", value=f"Text: {len(guild.text_channels)}\nVoice: {len(guild.voice_channels)}", inline=True)
         embed.add_field(name="Roles", value=len(guild.roles), inline=True)
+        return embed
+
+    # --- Server Stats Command ---
+    @app_commands.command(name="serverstats", description="Shows this server's activity over time.")
+    @cooldown(2, 10.0)
+    @app_commands.describe(period="How far back to look (defaults to the last day)")
+    @app_commands.guild_only()
+    async def serverstats(self, interaction: discord.Interaction,
+                          period: Literal["hour", "day", "week", "month", "quarter"] = "day"):
+        resolution, count = STATS_PERIODS[period]
+        rows = self.stats.history(interaction.guild_id, resolution, count)
+        if not any(messages or commands or members for _, members, messages, commands in rows):
+            return await self.bot.responder.send(
+                interaction, "📊 No activity recorded for this server yet. Stats are collected every minute.", ephemeral=True
+            )
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        messages = [row[2] for row in rows]
+        commands_used = [row[3] for row in rows]
+        members = [row[1] for row in rows if row[1] is not None]
+        busiest = max(rows, key=lambda row: row[2])
+
+        embed = discord.Embed(title=f"📊 Server Stats: past {period}", color=discord.Color.blurple())
+        embed.add_field(name="Messages", value=f"**{sum(messages):,}**", inline=True)
+        embed.add_field(name="Commands", value=f"**{sum(commands_used):,}**", inline=True)
+        if members:
+            change = members[-1] - members[0]
+            embed.add_field(name="Members", value=f"**{members[-1]:,}** ({change:+,})", inline=True)
+        activity = f"`{sparkline(messages)}`"
+        if busiest[2]:
+            activity += f"\nBusiest: **{busiest[2]:,}** at <t:{busiest[0]}:f>"
+        embed.add_field(name=f"Messages per {resolution}", value=activity, inline=False)
+        embed.set_footer(
+            text=f"History for this server: {self.stats.memory_usage(interaction.guild_id) / 1024:.1f} KB • "
+                 f"all servers: {self.stats.memory_usage() / 2 ** 20:.1f} MB ({len(self.stats.guilds)} servers)"
+        )
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
 
     # --- Avatar Command ---
     @app_commands.command(name="avatar", description="Displays a user's full-size avatar.")
@@ -86,15 +278,15 @@ class Utility(commands.Cog):
         embed.set_footer(text=f"Requested by {interaction.user.name}")
         
         # Add a link to the image
-        await interaction.response.send_message(
-            embed=embed, 
+        await self.bot.responder.send(
+            interaction, embed=embed, 
             ephemeral=True
         )
 
     # --- Bot Info Command ---
     @app_commands.command(name="botinfo", description="Shows information and statistics about the bot.")
     async def botinfo(self, interaction: discord.Interaction):
-        total_members = sum(g.member_count for g in self.bot.guilds)
+        total_members = self.bot.member_counter.total
         
         embed = discord.Embed(title=f"🤖 Bot Info: {self.bot.user.name}", color=discord.Color.green())
         embed.set_thumbnail(url=self.bot.user.display_avatar.url)
@@ -107,22 +299,31 @@ class Utility(commands.Cog):
         # Developer/Uptime
         embed.add_field(name="Discord.py Version", value=f"v{discord.__version__}", inline=True)
         embed.add_field(name="Bot ID", value=self.bot.user.id, inline=True)
-        
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        # Per-shard latency and event throughput (only shown when sharded)
+        shards = self.bot.shard_metrics.snapshot()
+        if len(shards) > 1:
+            lines = [
+                f"Shard {shard_id}: {shard_latency}ms • {rate:.1f} events/s"
+                for shard_id, shard_latency, rate, _ in shards
+            ]
+            # Embed field values are limited to 1024 characters
+            embed.add_field(name=f"Shards ({len(shards)})", value="\n".join(lines)[:1024], inline=False)
+
+        await self.bot.responder.send(interaction, embed=embed, ephemeral=True)
 
     # --- Invite Command ---
     @app_commands.command(name="invite", description="Generates a link to invite the bot to your server.")
     async def invite(self, interaction: discord.Interaction):
-        # This creates a generic invite link with permissions you grant the bot
-        # NOTE: Replace the placeholder below with your actual invite link if you use one with specific permissions/scopes.
+        # The requested permissions are the invite_permissions setting (administrator by default)
         invite_url = discord.utils.oauth_url(
             self.bot.user.id,
-            permissions=discord.Permissions(administrator=True), # Example: request administrator
+            permissions=await self.bot.config.get(GLOBAL, INVITE_PERMISSIONS),
             scopes=("bot", "applications.commands")
         )
         
-        await interaction.response.send_message(
-            f"🔗 [**Click here to invite the bot!**]({invite_url})", 
+        await self.bot.responder.send(
+            interaction, f"🔗 [**Click here to invite the bot!**]({invite_url})", 
             ephemeral=True
         )
 
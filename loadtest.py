@@ -0,0 +1,581 @@
+"""
+Offline load test: runs the real bot from main.py against a local fake Discord.
+
+A child process serves a stand-in for Discord's REST API and gateway (plus the
+image APIs used by /cat, /dog and /meme), and replays synthetic slash-command
+interactions at a fixed rate. The bot runs in this process exactly as it would
+in production, apart from pointing discord.py at the local endpoints, so the
+measured latency covers the gateway event, the command tree, the cog and the
+interaction callback request.
+
+    python loadtest.py --rate 200 --duration 30
+    python loadtest.py --member-cache lean --guilds 50 --members 20000 --json
+
+Reports time-to-first-response percentiles (overall and per command), event
+loop lag, and RSS. Exits non-zero if interactions went unanswered or p99 is
+above --max-p99-ms, so it can gate CI. Needs no token and no network.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+APPLICATION_ID = 900000000000000001
+BOT_ID = APPLICATION_ID
+OWNER_ID = 800000000000000001
+GUILD_BASE = 100000000000000000
+CHANNEL_BASE = 300000000000000000
+USER_BASE = 200000000000000000
+ALL_PERMISSIONS = str((1 << 53) - 1)
+
+# Command name -> relative weight in the replayed mix
+DEFAULT_MIX = {
+    "ping": 10, "roll": 10, "coinflip": 10, "8ball": 8, "joke": 8, "quote": 8,
+    "cat": 5, "dog": 5, "meme": 5, "serverinfo": 8, "userinfo": 8, "avatar": 5,
+    "help": 5, "botinfo": 3, "warn": 2,
+}
+
+
+def json_response(data) -> web.Response:
+    # discord.py only parses bodies whose Content-Type is exactly "application/json" (no charset)
+    return web.Response(body=json.dumps(data).encode(), headers={"Content-Type": "application/json"})
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def iso_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+
+
+# --- Fake Discord (runs in a child process) ---
+class FakeDiscord:
+    """Just enough of Discord's REST API and gateway for discord.py and the cogs."""
+    def __init__(self, port: int, options):
+        self.port = port
+        self.options = options
+        self.sequence = 0
+        self.sockets = []
+        # {interaction_id: (command, sent_at)} awaiting their first response
+        self.pending = {}
+        # [(command, seconds)] time from dispatch to the interaction callback
+        self.latencies = []
+        self.requests = 0
+        self.state = "idle"
+        self.next_id = 10 ** 17
+
+    # Payload builders
+    def snowflake(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def user(self, user_id: int):
+        return {
+            "id": str(user_id), "username": f"user{user_id % 100000}", "discriminator": "0",
+            "global_name": None, "avatar": None, "bot": user_id == BOT_ID,
+        }
+
+    def member(self, user_id: int, permissions: bool = False):
+        data = {
+            "user": self.user(user_id), "roles": [], "joined_at": iso_now(),
+            "deaf": False, "mute": False, "flags": 0, "communication_disabled_until": None,
+        }
+        if permissions:
+            data["permissions"] = ALL_PERMISSIONS
+        return data
+
+    def channel(self, guild_id: int, index: int = 0, kind: int = 0):
+        return {
+            "id": str(CHANNEL_BASE + guild_id % GUILD_BASE * 10 + index), "type": kind,
+            "guild_id": str(guild_id), "name": f"channel-{index}", "position": index,
+            "permission_overwrites": [], "nsfw": False, "parent_id": None,
+            "rate_limit_per_user": 0, "topic": None, "last_message_id": None,
+            "bitrate": 64000, "user_limit": 0, "rtc_region": None,
+        }
+
+    def guild(self, index: int):
+        guild_id = GUILD_BASE + index
+        return {
+            "id": str(guild_id), "name": f"Load Test {index}", "icon": None, "owner_id": str(OWNER_ID),
+            "member_count": self.options.members + 1, "large": self.options.members >= 250,
+            "roles": [{
+                "id": str(guild_id), "name": "@everyone", "permissions": ALL_PERMISSIONS, "position": 0,
+                "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0,
+            }],
+            "channels": [self.channel(guild_id, 0, 0), self.channel(guild_id, 1, 2)],
+            "members": [self.member(BOT_ID)], "threads": [], "emojis": [], "stickers": [],
+            "features": [], "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": [],
+            "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+            "mfa_level": 0, "premium_tier": 0, "nsfw_level": 0, "preferred_locale": "en-US",
+            "joined_at": iso_now(), "unavailable": False,
+        }
+
+    def message(self, channel_id, content: str = ""):
+        return {
+            "id": str(self.snowflake()), "channel_id": str(channel_id), "author": self.user(BOT_ID),
+            "content": content, "timestamp": iso_now(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": [], "pinned": False, "type": 0, "flags": 0, "components": [],
+        }
+
+    def interaction(self, command: str):
+        guild_index = random.randrange(self.options.guilds)
+        guild_id = GUILD_BASE + guild_index
+        invoker = USER_BASE + random.randrange(self.options.members)
+        data = {"id": str(self.snowflake()), "name": command, "type": 1, "options": []}
+
+        if command == "8ball":
+            data["options"] = [{"name": "question", "type": 3, "value": "Will this scale?"}]
+        elif command in ("userinfo", "avatar", "warn"):
+            target = USER_BASE + random.randrange(self.options.members)
+            option = "member" if command == "warn" else "user"
+            data["options"] = [{"name": option, "type": 6, "value": str(target)}]
+            if command == "warn":
+                data["options"].append({"name": "reason", "type": 3, "value": "Load test"})
+            member = self.member(target)
+            data["resolved"] = {"users": {str(target): member.pop("user")}, "members": {str(target): member}}
+
+        interaction_id = self.snowflake()
+        return interaction_id, {
+            "id": str(interaction_id), "application_id": str(APPLICATION_ID), "type": 2,
+            "token": f"token-{interaction_id}", "version": 1, "guild_id": str(guild_id),
+            "channel_id": self.channel(guild_id)["id"], "channel": self.channel(guild_id),
+            "member": self.member(invoker, permissions=True), "app_permissions": ALL_PERMISSIONS,
+            "locale": "en-US", "guild_locale": "en-US", "entitlements": [], "attachment_size_limit": 10 * 2 ** 20,
+            "authorizing_integration_owners": {"0": str(guild_id)}, "context": 0, "data": data,
+        }
+
+    # Gateway
+    async def dispatch(self, ws, event: str, data):
+        self.sequence += 1
+        await ws.send_str(json.dumps({"op": 0, "t": event, "s": self.sequence, "d": data}))
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"op": 10, "d": {"heartbeat_interval": 41250}}))
+        async for message in ws:
+            payload = json.loads(message.data)
+            op, data = payload.get("op"), payload.get("d")
+            if op == 1:
+                await ws.send_str(json.dumps({"op": 11}))
+            elif op == 2:
+                await self.dispatch(ws, "READY", {
+                    "v": 10, "user": self.user(BOT_ID), "session_id": "loadtest",
+                    "resume_gateway_url": f"ws://127.0.0.1:{self.port}/gateway",
+                    "guilds": [{"id": str(GUILD_BASE + i), "unavailable": True} for i in range(self.options.guilds)],
+                    "application": {"id": str(APPLICATION_ID), "flags": 0}, "shard": [0, 1],
+                })
+                for index in range(self.options.guilds):
+                    await self.dispatch(ws, "GUILD_CREATE", self.guild(index))
+                self.sockets.append(ws)
+            elif op == 8:
+                await self.send_member_chunks(ws, data)
+        if ws in self.sockets:
+            self.sockets.remove(ws)
+        return ws
+
+    async def send_member_chunks(self, ws, data):
+        """Answers a Request Guild Members (chunking) with the guild's synthetic members."""
+        guild_id = data["guild_id"]
+        user_ids = [BOT_ID] + [USER_BASE + n for n in range(self.options.members)]
+        chunks = [user_ids[i:i + 1000] for i in range(0, len(user_ids), 1000)]
+        for index, chunk in enumerate(chunks):
+            await self.dispatch(ws, "GUILD_MEMBERS_CHUNK", {
+                "guild_id": guild_id, "members": [self.member(user_id) for user_id in chunk],
+                "chunk_index": index, "chunk_count": len(chunks), "nonce": data.get("nonce"),
+            })
+
+    # REST
+    async def rest(self, request):
+        self.requests += 1
+        path = request.match_info["tail"]
+        method = request.method
+        parts = path.split("/")
+
+        if path == "users/@me":
+            return json_response(self.user(BOT_ID))
+        if path == "oauth2/applications/@me":
+            return json_response({
+                "id": str(APPLICATION_ID), "name": "Tesseract", "description": "", "icon": None,
+                "bot_public": True, "bot_require_code_grant": False, "verify_key": "",
+                "owner": self.user(OWNER_ID), "team": None, "flags": 0,
+            })
+        if path in ("gateway", "gateway/bot"):
+            return json_response({
+                "url": f"ws://127.0.0.1:{self.port}/gateway", "shards": 1,
+                "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1},
+            })
+        if parts[0] == "interactions" and parts[-1] == "callback":
+            entry = self.pending.pop(int(parts[1]), None)
+            if entry is not None:
+                command, sent_at = entry
+                self.latencies.append((command, time.perf_counter() - sent_at))
+            body = await request.json()
+            return json_response({
+                "interaction": {"id": parts[1], "type": 2},
+                "resource": {"type": body.get("type", 4)},
+            })
+        if parts[0] == "applications" and parts[-1] == "commands":
+            return json_response([])
+        if path == "users/@me/channels":
+            body = await request.json()
+            return json_response({
+                "id": str(self.snowflake()), "type": 1, "last_message_id": None,
+                "recipients": [self.user(int(body["recipient_id"]))],
+            })
+        if parts[0] == "guilds" and len(parts) == 4 and parts[2] == "members" and method == "PATCH":
+            return json_response(dict(self.member(int(parts[3])), guild_id=parts[1]))
+        if method == "POST" and (parts[-1] == "messages" or parts[0] == "webhooks"):
+            return json_response(self.message(parts[1] if parts[0] == "channels" else CHANNEL_BASE))
+        if method == "PATCH" and parts[0] == "webhooks":
+            return json_response(self.message(CHANNEL_BASE))
+        if method in ("PUT", "DELETE"):
+            return web.Response(status=204)
+        return json_response({})
+
+    async def images(self, request):
+        kind = request.match_info["kind"]
+        ids = [f"{kind}{random.randrange(10 ** 9)}" for _ in range(10)]
+        if kind == "cat":
+            return json_response([{"id": i} for i in ids])
+        if kind == "dog":
+            return json_response({"url": f"http://127.0.0.1:{self.port}/{ids[0]}.jpg"})
+        return json_response({"memes": [{"url": f"http://127.0.0.1:{self.port}/{i}.png", "nsfw": False} for i in ids]})
+
+    # Control
+    async def start_load(self, request):
+        if self.state == "idle":
+            self.state = "running"
+            asyncio.create_task(self.generate())
+        return json_response({"state": self.state})
+
+    async def status(self, request):
+        return json_response({"state": self.state, "ready": bool(self.sockets)})
+
+    async def results(self, request):
+        return json_response({
+            "latencies": self.latencies, "unanswered": len(self.pending), "requests": self.requests,
+        })
+
+    async def generate(self):
+        """Sends interactions at a fixed rate for the configured duration, then waits for stragglers."""
+        mix = self.options.mix
+        commands, weights = list(mix), list(mix.values())
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.options.rate
+        next_send = loop.time()
+        deadline = next_send + self.options.duration
+        while loop.time() < deadline and self.sockets:
+            command = random.choices(commands, weights)[0]
+            interaction_id, payload = self.interaction(command)
+            self.pending[interaction_id] = (command, time.perf_counter())
+            await self.dispatch(self.sockets[0], "INTERACTION_CREATE", payload)
+            next_send += interval
+            delay = next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        # Discord's own limit for the first response is 3 seconds
+        drain_deadline = loop.time() + 3
+        while self.pending and loop.time() < drain_deadline:
+            await asyncio.sleep(0.05)
+        self.state = "done"
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_get("/images/{kind}", self.images)
+        app.router.add_post("/_control/start", self.start_load)
+        app.router.add_get("/_control/status", self.status)
+        app.router.add_get("/_control/results", self.results)
+        app.router.add_route("*", "/api/v10/{tail:.*}", self.rest)
+        return app
+
+
+def run_fake_discord(port: int, options):
+    web.run_app(FakeDiscord(port, options).app(), host="127.0.0.1", port=port, print=None)
+
+
+# --- Bot side (this process) ---
+class LoopLagMonitor:
+    """Measures how late a short periodic sleep wakes up, i.e. how long the loop was blocked."""
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+
+def rss_mb() -> float:
+    """Current resident set size, from /proc (Linux)."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drive_bot(port: int, options):
+    import aiohttp
+    import yarl
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+
+    import main as tesseract
+    from cogs.fun import Fun
+    from utils.image_pool import cat_source, dog_source, meme_source
+
+    base = f"http://127.0.0.1:{port}"
+    Route.BASE = f"{base}/api/v10"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{port}/gateway")
+    bot = tesseract.bot
+
+    async with aiohttp.ClientSession() as control:
+        # Wait for the fake server to come up
+        for _ in range(100):
+            try:
+                async with control.get(f"{base}/_control/status"):
+                    break
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.05)
+
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        await bot.db.open()
+        await bot.config.start()
+        bot.workers.start()
+        bot_task = None
+        try:
+            for extension in tesseract.INITIAL_EXTENSIONS:
+                if extension != "cogs.fun":
+                    await bot.load_extension(extension)
+            # The Fun cog is added directly so its image pool uses the local image APIs
+            await bot.add_cog(Fun(bot, image_sources=[
+                cat_source(f"{base}/images/cat"), dog_source(f"{base}/images/dog"), meme_source(f"{base}/images/meme"),
+            ]))
+
+            bot_task = asyncio.create_task(bot.start("loadtest"))
+            ready_task = asyncio.create_task(bot.wait_until_ready())
+            await asyncio.wait((bot_task, ready_task), timeout=120, return_when=asyncio.FIRST_COMPLETED)
+            if bot_task.done():
+                # Surfaces whatever stopped the bot from connecting
+                ready_task.cancel()
+                bot_task.result()
+                raise RuntimeError("The bot stopped before becoming ready.")
+            if not ready_task.done():
+                raise RuntimeError("The bot did not become ready within 120 seconds.")
+            ready_seconds = time.perf_counter() - started
+            # Let on_ready (tree sync, help pages) and the first image refill finish
+            await asyncio.sleep(1)
+            rss_ready = rss_mb()
+
+            monitor = LoopLagMonitor()
+            monitor.start()
+            async with control.post(f"{base}/_control/start"):
+                pass
+            while True:
+                await asyncio.sleep(0.5)
+                async with control.get(f"{base}/_control/status") as response:
+                    if (await response.json())["state"] == "done":
+                        break
+            await monitor.stop()
+            rss_loaded = rss_mb()
+            cooldown_refusals = bot.tree.cooldowns.rejected
+            async with control.get(f"{base}/_control/results") as response:
+                results = await response.json()
+        finally:
+            await bot.close()
+            if bot_task is not None:
+                await asyncio.gather(bot_task, return_exceptions=True)
+            # Unloading flushes the cogs' batched writes before the database closes
+            for extension in list(bot.extensions):
+                await bot.unload_extension(extension)
+            await bot.remove_cog("Fun")
+            await bot.db.close()
+            await bot.workers.close()
+
+    return {
+        "member_cache": options.member_cache,
+        "guilds": options.guilds,
+        "members_per_guild": options.members,
+        "rate": options.rate,
+        "duration": options.duration,
+        "ready_seconds": ready_seconds,
+        "cooldown_refusals": cooldown_refusals,
+        "results": results,
+        "loop_lag": sorted(monitor.samples),
+        "rss_mb": {"before": rss_before, "ready": rss_ready, "after_load": rss_loaded, "peak": peak_rss_mb()},
+    }
+
+
+def summarize(run) -> dict:
+    latencies = run["results"]["latencies"]
+    overall = sorted(seconds for _, seconds in latencies)
+    by_command = {}
+    for command, seconds in latencies:
+        by_command.setdefault(command, []).append(seconds)
+
+    def stats(values):
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": (values[-1] if values else 0.0) * 1000,
+        }
+
+    lag = run["loop_lag"]
+    return {
+        "member_cache": run["member_cache"],
+        "guilds": run["guilds"],
+        "members_per_guild": run["members_per_guild"],
+        "rate": run["rate"],
+        "duration": run["duration"],
+        "ready_seconds": run["ready_seconds"],
+        "answered": len(overall),
+        "unanswered": run["results"]["unanswered"],
+        "rest_requests": run["results"]["requests"],
+        "cooldown_refusals": run["cooldown_refusals"],
+        "latency": stats(overall),
+        "commands": {command: stats(values) for command, values in sorted(by_command.items())},
+        "loop_lag": {
+            "p50_ms": percentile(lag, 0.50) * 1000,
+            "p99_ms": percentile(lag, 0.99) * 1000,
+            "max_ms": (lag[-1] if lag else 0.0) * 1000,
+        },
+        "rss_mb": run["rss_mb"],
+    }
+
+
+def print_report(summary):
+    latency = summary["latency"]
+    print(
+        f"\n📊 {summary['answered']} interactions answered, {summary['unanswered']} unanswered "
+        f"({summary['rate']}/s for {summary['duration']}s, {summary['guilds']} guilds × "
+        f"{summary['members_per_guild']} members, member cache: {summary['member_cache']})"
+    )
+    print(
+        f"   Ready after {summary['ready_seconds']:.2f}s, {summary['rest_requests']} REST requests served, "
+        f"{summary['cooldown_refusals']} refused by cooldowns"
+    )
+    print(
+        f"   First response: p50 {latency['p50_ms']:.1f}ms • p95 {latency['p95_ms']:.1f}ms • "
+        f"p99 {latency['p99_ms']:.1f}ms • max {latency['max_ms']:.1f}ms"
+    )
+    lag = summary["loop_lag"]
+    print(f"   Event loop lag: p50 {lag['p50_ms']:.1f}ms • p99 {lag['p99_ms']:.1f}ms • max {lag['max_ms']:.1f}ms")
+    rss = summary["rss_mb"]
+    print(
+        f"   RSS: {rss['before']:.0f}MB at start • {rss['ready']:.0f}MB when ready • "
+        f"{rss['after_load']:.0f}MB after load • {rss['peak']:.0f}MB peak"
+    )
+    print("\n   Command         count     p50      p95      p99")
+    for command, stats in summary["commands"].items():
+        print(
+            f"   /{command:<14}{stats['count']:>6}  {stats['p50_ms']:>6.1f}ms "
+            f"{stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms"
+        )
+
+
+def parse_mix(value: str):
+    """Parses "ping=5,warn=1" into a command mix."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unsupported command: {name.strip()}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the bot against a local fake Discord.")
+    parser.add_argument("--rate", type=float, default=100.0, help="Interactions per second (default: 100)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument("--guilds", type=int, default=10, help="Number of fake guilds (default: 10)")
+    parser.add_argument("--members", type=int, default=1000, help="Members per fake guild (default: 1000)")
+    parser.add_argument("--member-cache", choices=("full", "lean", "none"), default="full",
+                        help="MEMBER_CACHE mode for the bot (default: full)")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Command mix as name=weight pairs, e.g. ping=5,warn=1")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail if p99 first-response latency exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="tesseract-loadtest-")
+    # main.py reads its configuration at import time, so this has to happen first
+    os.environ.update(
+        DISCORD_BOT_TOKEN="loadtest",
+        TESSERACT_DB=os.path.join(workdir, "loadtest.db"),
+        TREE_HASH_PATH=os.path.join(workdir, "tree_hash"),
+        MEMBER_CACHE=options.member_cache,
+        SHARD_MODE="none",
+        METRICS_PORT="0",
+    )
+
+    port = free_port()
+    server = multiprocessing.Process(target=run_fake_discord, args=(port, options), daemon=True)
+    server.start()
+    try:
+        summary = summarize(asyncio.run(drive_bot(port, options)))
+    finally:
+        server.terminate()
+        server.join()
+
+    if options.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+    if summary["unanswered"]:
+        print(f"❌ {summary['unanswered']} interactions were never answered.", file=sys.stderr)
+        return 1
+    if options.max_p99_ms is not None and summary["latency"]["p99_ms"] > options.max_p99_ms:
+        print(f"❌ p99 latency {summary['latency']['p99_ms']:.1f}ms is above {options.max_p99_ms}ms.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,29 +4,171 @@ from discord import app_commands, ui
 import os
 import random
 import asyncio
+import subprocess
+import sys
+import time
+import zlib
 from dotenv import load_dotenv
 
+from utils.command_tree import TesseractTree
+from utils.cooldowns import PRUNE_SLICE, cooldown
+from utils.database import Database
+from utils.guild_config import GLOBAL, GuildConfig, Setting
+from utils.hot_reload import CogReloader
+from utils.loop_monitor import LoopLagMonitor
+from utils.member_cache import MemberCachePolicy
+from utils.member_counter import MemberCounter
+from utils.metrics import CommandMetrics, start_metrics_server
+from utils.responder import Responder
+from utils.shard_metrics import ShardMetrics
+from utils.tree_sync import sync_if_changed
+from utils.workers import WorkerPools
+
 # Load environment variables (like the bot token) from a .env file
 load_dotenv()
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")  # NOTE: Updated to a common env variable name
+DB_PATH = os.getenv("TESSERACT_DB", "tesseract.db")  # SQLite file for warnings and other persistent data
+
+# Sharding: "none" (single connection), "auto" (AutoShardedBot in one process)
+# or "cluster" (SHARD_COUNT shards split across SHARD_PROCESSES worker processes)
+SHARD_MODE = os.getenv("SHARD_MODE", "none").lower()
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None  # None lets Discord recommend a count (auto mode only)
+SHARD_PROCESSES = int(os.getenv("SHARD_PROCESSES", "1"))
+SHARD_IDS = os.getenv("SHARD_IDS")  # Set by the cluster launcher for each worker, e.g. "0-3"
+
+# Local Prometheus endpoint (http://METRICS_HOST:METRICS_PORT/metrics), disabled when unset.
+# In cluster mode worker N serves on METRICS_PORT + N.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Hash of the last globally synced command tree; the sync is skipped while it matches
+TREE_HASH_PATH = os.getenv("TREE_HASH_PATH", ".tree_hash")
+
+# Member cache: "full" (every member, chunked at startup), "lean" (recent joiners only,
+# guilds chunked on first need) or "none" (members fetched on demand)
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "full").lower()
+
+# Reload cogs automatically when their files change (development); /reload works either way
+RELOAD_WATCH = os.getenv("RELOAD_WATCH", "0") == "1"
+
+# Worker pools for heavy work kept off the event loop: processes for CPU-bound
+# jobs (0 runs them on threads instead) and threads for blocking I/O
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "8"))
+
+# Bot-level settings; cogs register their own
+PREFIX = Setting("prefix", "str", ".", "Prefix for text commands")
+STATUS_INTERVAL = Setting(
+    "status_interval", "int", 30, "Seconds between status changes", scope="global", minimum=10, maximum=3600
+)
+
+# Extensions (Cogs) loaded at startup
+INITIAL_EXTENSIONS = [
+    "cogs.moderation",
+    "cogs.utility",
+    "cogs.fun",
+    "cogs.owner",
+    "cogs.antiraid",
+    "cogs.automod",
+    "cogs.config"
+]
+
+# Startup timings by phase, in seconds (printed once the first on_ready finishes)
+startup_timings = {}
+
+
+def parse_shard_ids(value):
+    """Parses "0-3" or "0,1,2,3" into a list of shard IDs."""
+    if not value:
+        return None
+    if "-" in value:
+        first, last = value.split("-", 1)
+        return list(range(int(first), int(last) + 1))
+    return [int(shard_id) for shard_id in value.split(",")]
 
 # 1. Setup Intents
 intents = discord.Intents.default()
 intents.members = True          # Required for member-related events/data (e.g., getting member_count)
 intents.message_content = True  # Required for processing messages (if you use prefix commands or message content)
 
-bot = commands.Bot(command_prefix=".", intents=intents)
+BotBase = commands.AutoShardedBot if SHARD_MODE in ("auto", "cluster") else commands.Bot
+
+
+class TesseractBot(BotBase):
+    """Bot subclass that keeps the cached help pages in sync with the loaded cogs."""
+    async def setup_hook(self):
+        # Help buttons are routed by their custom_id, so they survive restarts
+        self.add_dynamic_items(HelpPageButton)
+
+    async def add_cog(self, cog, /, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        help_catalog.invalidate()
+
+    async def remove_cog(self, name, /, **kwargs):
+        removed = await super().remove_cog(name, **kwargs)
+        help_catalog.invalidate()
+        return removed
+
+
+member_cache = MemberCachePolicy(MEMBER_CACHE)
+
+shard_options = {}
+if BotBase is commands.AutoShardedBot:
+    shard_options = {"shard_count": SHARD_COUNT, "shard_ids": parse_shard_ids(SHARD_IDS)}
+
+async def get_prefix(bot, message):
+    """Per-guild prefix, served from the settings cache."""
+    return await bot.config.get(message.guild.id if message.guild else GLOBAL, PREFIX)
+
+# Created before the bot so its HTTP trace can be handed to discord.py's session
+metrics = CommandMetrics()
+
+bot = TesseractBot(
+    command_prefix=get_prefix,
+    intents=intents,
+    tree_cls=TesseractTree,
+    http_trace=metrics.trace_config(),
+    **member_cache.client_options(intents),
+    **shard_options
+)
+bot.member_cache = member_cache  # Lazy chunking and fetch_member fallbacks for the lean cache modes
+bot.metrics = metrics  # Command latency/error/rate-limit stats for /stats and the metrics endpoint
+bot.workers = WorkerPools(WORKER_PROCESSES, WORKER_THREADS)  # run_cpu()/run_io() for work that would block the loop
+bot.loop_monitor = LoopLagMonitor()  # Warns (with a stack) when something blocks the event loop
+bot.responder = Responder()  # Every interaction reply goes through here (deadline defers, queued followups, retries)
+bot.db = Database(DB_PATH)  # Shared by every cog that needs persistent storage
+bot.config = GuildConfig(bot.db)  # Per-guild settings; cogs register theirs and read them through here
+bot.config.register(PREFIX, STATUS_INTERVAL)
+bot.member_counter = MemberCounter()  # Running member total for the status loop and /botinfo
+bot.shard_metrics = ShardMetrics(bot)  # Per-shard latency and event throughput for /ping and /botinfo
+# In cluster mode only the worker holding shard 0 syncs the tree (as in on_ready)
+bot.reloader = CogReloader(bot, TREE_HASH_PATH, can_sync=0 in (parse_shard_ids(SHARD_IDS) or [0]))
+
+for listener in (
+    bot.member_counter.on_guild_join,
+    bot.member_counter.on_guild_remove,
+    bot.member_counter.on_member_join,
+    bot.member_counter.on_raw_member_remove,
+    bot.shard_metrics.on_message,
+    bot.shard_metrics.on_interaction,
+    bot.shard_metrics.on_member_join,
+    bot.shard_metrics.on_member_update,
+    bot.metrics.on_app_command_completion,
+    bot.responder.on_app_command_completion,
+    bot.config.on_guild_remove,
+):
+    bot.add_listener(listener)
 
 # 2. Status Loop
-@tasks.loop(seconds=30)
+@tasks.loop(seconds=STATUS_INTERVAL.default)
 async def change_status():
-    """Cycles the bot's status every 30 seconds."""
+    """Cycles the bot's status every `status_interval` seconds (30 by default)."""
     # Ensure bot.guilds is ready before accessing it (prevents rare startup errors)
     if not bot.is_ready():
         return
 
-    # Calculate total members to display in one of the statuses
-    total_users = sum(g.member_count for g in bot.guilds)
+    # Total members to display in one of the statuses (kept up to date by the member counter)
+    total_users = bot.member_counter.total
 
     activities = [
         (discord.ActivityType.watching, "for rule-breakers"),
@@ -41,98 +183,175 @@ async def change_status():
         activity=discord.Activity(type=activity_type, name=status_text)
     )
 
-# 3. Help Menu View (for navigation buttons)
-class HelpMenu(ui.View):
-    def __init__(self, embeds):
-        # Set a short timeout for the buttons
-        super().__init__(timeout=120) 
-        self.embeds = embeds
-        self.current = 0
-        self.message = None # To store the message object for on_timeout
-
-    # Store the message object once the view is sent
-    async def on_error(self, interaction: discord.Interaction, error: Exception, item: ui.Item) -> None:
-        if isinstance(error, discord.errors.NotFound) and "Unknown interaction" in str(error):
-            # This handles users clicking a button after the bot restarts or the timeout
-            await interaction.followup.send("This button interaction is no longer valid. Please run the `/help` command again.", ephemeral=True)
-        else:
-            print(f"An error occurred in HelpMenu view: {error}")
-            await super().on_error(interaction, error, item)
-
-    async def update_message(self, interaction: discord.Interaction):
-        """Edits the message to show the new page/embed."""
-        embed = self.embeds[self.current]
-        embed.set_footer(text=f"Page {self.current+1}/{len(self.embeds)}")
-        # Check if interaction has already been responded to (e.g., from a deferral, though not used here)
-        if interaction.response.is_done():
-            await interaction.edit_original_response(embed=embed, view=self)
-        else:
-            await interaction.response.edit_message(embed=embed, view=self)
+@tasks.loop(minutes=10)
+async def reconcile_member_count():
+    """Corrects any drift in the running member total with a full scan."""
+    if not bot.is_ready():
+        return
+    drift = bot.member_counter.reconcile(bot.guilds)
+    if drift:
+        print(f"🔢 Member count reconciled (drift: {drift:+}).")
 
-    @ui.button(label="◀️ Previous", style=discord.ButtonStyle.secondary)
-    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
-        self.current = (self.current - 1) % len(self.embeds)
-        await self.update_message(interaction)
 
-    @ui.button(label="▶️ Next", style=discord.ButtonStyle.secondary)
-    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
-        self.current = (self.current + 1) % len(self.embeds)
-        await self.update_message(interaction)
-        
-    async def on_timeout(self) -> None:
-        """Disables buttons when the view times out."""
-        if self.message:
-            for item in self.children:
-                item.disabled = True
-            await self.message.edit(view=self)
+def on_status_interval_change(guild_id, seconds):
+    change_status.change_interval(seconds=seconds)
+
+bot.config.subscribe(STATUS_INTERVAL, on_status_interval_change)
+
+@tasks.loop(seconds=15)
+async def sample_shard_metrics():
+    """Turns the per-shard event counters into events/second."""
+    bot.shard_metrics.sample()
+
+@tasks.loop(minutes=1)
+async def prune_cooldowns():
+    """Drops cooldown buckets that have refilled, so idle users cost no memory."""
+    # In slices, letting other work run in between when a lot of buckets went idle at once
+    while bot.tree.cooldowns.prune() == PRUNE_SLICE:
+        await asyncio.sleep(0)
+
+# 3. Help Menu Buttons (persistent, stateless navigation)
+class HelpPageButton(ui.DynamicItem[ui.Button], template=r"help:(?P<direction>prev|next):(?P<page>\d+):(?P<category>.*)"):
+    """
+    A help navigation button that carries its target page in its `custom_id`.
+
+    Nothing is stored per message: the button is registered once with
+    `bot.add_dynamic_items`, so it keeps working after a restart, and every
+    click is answered from the shared help catalog.
+    """
+    def __init__(self, direction: str, page: int, category: str):
+        label = "◀️ Previous" if direction == "prev" else "▶️ Next"
+        super().__init__(
+            ui.Button(
+                label=label,
+                style=discord.ButtonStyle.secondary,
+                # custom_id is limited to 100 characters, so long category names are cut
+                custom_id=f"help:{direction}:{page}:{category}"[:100],
+            )
+        )
+        self.page = page
+        self.category = category
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match["direction"], int(match["page"]), match["category"])
+
+    async def callback(self, interaction: discord.Interaction):
+        """Edits the message to show the target page."""
+        pages = help_catalog.get_pages()
+        if not pages:
+            return await bot.responder.send(interaction, "No commands loaded yet. Please run `/help` again in a moment.", ephemeral=True)
+
+        # Prefer the category name, since page numbers shift when cogs are loaded or unloaded
+        page = help_catalog.index_of(self.category)
+        if page is None:
+            page = self.page % len(pages)
+        await bot.responder.edit(interaction, embed=pages[page], view=help_catalog.get_view(page))
+
+
+# 4. Help Catalog and Command
+class HelpCatalog:
+    """
+    Builds the paginated help embeds once and serves them until the cog set changes.
+
+    The pages are rebuilt lazily after `invalidate()` (called whenever a cog is
+    added or removed) or eagerly right after the command tree syncs.
+    """
+    def __init__(self):
+        self.pages = None
+        self.categories = []
+        self.views = {}
+
+    def invalidate(self):
+        self.pages = None
+        self.categories = []
+        self.views = {}
+
+    def get_pages(self):
+        if self.pages is None:
+            self.pages = self.build()
+        return self.pages
+
+    def index_of(self, category: str):
+        try:
+            return self.categories.index(category)
+        except ValueError:
+            return None
+
+    def get_view(self, page: int):
+        """Returns the (shared) navigation view for a page."""
+        view = self.views.get(page)
+        if view is None:
+            pages = self.get_pages()
+            previous_page = (page - 1) % len(pages)
+            next_page = (page + 1) % len(pages)
+            view = ui.View(timeout=None)
+            view.add_item(HelpPageButton("prev", previous_page, self.categories[previous_page]))
+            view.add_item(HelpPageButton("next", next_page, self.categories[next_page]))
+            # A stopped view is only serialized when sent, never tracked per message,
+            # so there is no timeout task or view store entry for each open menu.
+            view.stop()
+            self.views[page] = view
+        return view
+
+    def build(self):
+        # Group commands by Cog name
+        categories = {}
+        for command in bot.tree.walk_commands():
+            # Groups are listed through their subcommands
+            if isinstance(command, app_commands.Group):
+                continue
+            # App commands expose their cog through `binding` (there is no `cog_name` attribute)
+            cog_name = command.binding.qualified_name if isinstance(command.binding, commands.Cog) else "Other"
+            # Skip the 'Help' command itself and commands that are hidden (if you use that)
+            if command.name == "help":
+                continue
+            categories.setdefault(cog_name, []).append(command)
+
+        # Create an embed for each category
+        embeds = []
+        self.categories = list(categories)
+        for cog, cmds in categories.items():
+            embed = discord.Embed(
+                title=f"📘 {cog} Commands",
+                description=f"List of available slash commands for {cog}.",
+                # A stable color per category instead of a new random one on every call
+                color=zlib.crc32(cog.encode()) & 0xFFFFFF
+            )
+            for cmd in cmds:
+                # Build the command string with options for clarity
+                cmd_args = [f"<{opt.name}>" for opt in cmd.parameters]
+                cmd_string = f"/{cmd.qualified_name} {' '.join(cmd_args)}"
+
+                # Use the full command string and description
+                embed.add_field(name=cmd_string, value=cmd.description or "No description provided.", inline=False)
+
+            if bot.user:
+                embed.set_thumbnail(url=bot.user.display_avatar.url)
+            embeds.append(embed)
+
+        # The footers never change, so they are set once here rather than per click
+        for index, embed in enumerate(embeds):
+            embed.set_footer(text=f"Page {index+1}/{len(embeds)}")
+        return embeds
+
+
+help_catalog = HelpCatalog()
 
 
-# 4. Help Command
 @bot.tree.command(name="help", description="Shows all available commands.")
+@cooldown(2, 10.0)
 async def help_command(interaction: discord.Interaction):
-    await interaction.response.defer(ephemeral=True, thinking=True) # Defer the response immediately
-
-    # Group commands by Cog name
-    categories = {}
-    for command in bot.tree.walk_commands():
-        cog_name = command.cog_name if command.cog_name else "Other"
-        # Skip the 'Help' command itself and commands that are hidden (if you use that)
-        if command.name == "help":
-            continue
-        categories.setdefault(cog_name, []).append(command)
-
-    # Create an embed for each category
-    embeds = []
-    for cog, cmds in categories.items():
-        embed = discord.Embed(
-            title=f"📘 {cog} Commands",
-            description=f"List of available slash commands for {cog}.",
-            color=random.randint(0, 0xFFFFFF)
-        )
-        for cmd in cmds:
-            # Build the command string with options for clarity
-            cmd_args = [f"<{opt.name}>" for opt in cmd.parameters]
-            cmd_string = f"/{cmd.name} {' '.join(cmd_args)}"
-            
-            # Use the full command string and description
-            embed.add_field(name=cmd_string, value=cmd.description or "No description provided.", inline=False)
-            
-        embed.set_thumbnail(url=bot.user.display_avatar.url)
-        embeds.append(embed)
+    # The pages are prebuilt, so there is no need to defer and "think" first
+    embeds = help_catalog.get_pages()
 
     # Fallback if no commands are found (shouldn't happen with Cogs loaded)
     if not embeds:
-        await interaction.followup.send("No commands loaded yet. Please wait for the bot to fully initialize.", ephemeral=True)
+        await bot.responder.send(interaction, "No commands loaded yet. Please wait for the bot to fully initialize.", ephemeral=True)
         return
 
-    # Send the first embed with the navigational view
-    view = HelpMenu(embeds)
-    embed = embeds[0]
-    embed.set_footer(text="Page 1/" + str(len(embeds)))
-    
-    # Use followup.send after deferral
-    message = await interaction.followup.send(embed=embed, view=view, ephemeral=True)
-    view.message = message # Pass the message object to the view for on_timeout
+    # Send the first embed with the navigational buttons
+    await bot.responder.send(interaction, embed=embeds[0], view=help_catalog.get_view(0), ephemeral=True)
 
 
 # 5. On Ready Event
@@ -141,30 +360,68 @@ async def on_ready():
     """Fires when the bot is ready and logged in."""
     print(f"✅ Logged in as {bot.user}")
     
+    # Seed the member counter from the guild cache, then keep it in sync from events
+    bot.member_counter.reconcile(bot.guilds)
+
     # Start the status loop
     if not change_status.is_running():
+        change_status.change_interval(seconds=await bot.config.get(GLOBAL, STATUS_INTERVAL))
         change_status.start()
+    if not reconcile_member_count.is_running():
+        reconcile_member_count.start()
+    if not sample_shard_metrics.is_running():
+        sample_shard_metrics.start()
+    if not prune_cooldowns.is_running():
+        prune_cooldowns.start()
+
+    # In cluster mode every worker runs this, but only the one holding shard 0 needs to sync
+    shard_ids = getattr(bot, "shard_ids", None)
+    if shard_ids and 0 not in shard_ids:
+        report_startup_timings()
+        return
         
-    # Sync Slash Commands
+    # Sync Slash Commands (skipped when the tree is unchanged since the last sync)
     try:
         # Note: You can optionally sync to a specific guild for faster testing:
         # synced = await bot.tree.sync(guild=discord.Object(id=YOUR_GUILD_ID))
-        synced = await bot.tree.sync() 
-        print(f"🔄 Synced {len(synced)} global commands.")
+        sync_started = time.perf_counter()
+        synced = await sync_if_changed(bot.tree, TREE_HASH_PATH)
+        if synced is None:
+            print("🔄 Command tree unchanged, skipping sync.")
+        else:
+            print(f"🔄 Synced {len(synced)} global commands.")
+        if "tree sync" not in startup_timings:
+            startup_timings["tree sync"] = time.perf_counter() - sync_started
+        # Build the help pages now so the first /help doesn't pay for it
+        help_catalog.invalidate()
+        help_catalog.get_pages()
     except Exception as e:
         print(f"⚠ Error syncing commands: {e}")
 
+    report_startup_timings()
+
+
+def report_startup_timings():
+    """Prints the startup phase breakdown once, after the first on_ready."""
+    if "connect to ready" in startup_timings or "started" not in startup_timings:
+        return
+    startup_timings["connect to ready"] = time.perf_counter() - startup_timings.pop("started")
+    total = sum(startup_timings.values())
+    phases = ", ".join(f"{phase}: {seconds * 1000:.0f}ms" for phase, seconds in startup_timings.items())
+    print(f"⏱ Startup took {total:.2f}s ({phases})")
+
 # 6. Main Function and Cog Loading
 async def main():
     """Loads Cogs and starts the bot."""
-    # List of extensions (Cogs) to load
-    initial_extensions = [
-        "cogs.moderation",
-        "cogs.utility",
-        "cogs.fun"
-    ]
-    
-    for extension in initial_extensions:
+    # Open the database before any cog tries to use it
+    phase_started = time.perf_counter()
+    await bot.db.open()
+    await bot.config.start()
+    startup_timings["database"] = time.perf_counter() - phase_started
+    bot.workers.start()
+    bot.loop_monitor.start()
+
+    async def load(extension):
         try:
             # The '.' prefix is used here because the cogs will be inside a 'cogs' folder
             await bot.load_extension(extension)
@@ -172,13 +429,72 @@ async def main():
         except Exception as e:
             print(f"❌ Failed to load Cog: {extension}. Error: {e}")
 
+    # Load the cogs concurrently, so one cog waiting on I/O in cog_load doesn't hold up the rest
+    phase_started = time.perf_counter()
+    await asyncio.gather(*(load(extension) for extension in INITIAL_EXTENSIONS))
+    startup_timings["cogs"] = time.perf_counter() - phase_started
+    if RELOAD_WATCH:
+        bot.reloader.watch()
+        print("👀 Watching cogs/ for changes.")
+
+    # Serve the Prometheus metrics locally if a port is configured
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await start_metrics_server(bot.metrics, METRICS_HOST, METRICS_PORT)
+        print(f"📈 Metrics available at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
     # Start the bot
-    await bot.start(TOKEN)
+    startup_timings["started"] = time.perf_counter()
+    try:
+        await bot.start(TOKEN)
+    finally:
+        await bot.reloader.stop()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        # Unloading the cogs flushes any batched writes before the database closes
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+        await bot.db.close()
+        await bot.loop_monitor.stop()
+        await bot.workers.close()
+
+
+def run_cluster():
+    """Splits SHARD_COUNT shards across SHARD_PROCESSES worker processes and waits for them."""
+    if not SHARD_COUNT:
+        raise SystemExit("SHARD_COUNT must be set when SHARD_MODE=cluster.")
+    if SHARD_PROCESSES < 1:
+        raise SystemExit("SHARD_PROCESSES must be at least 1.")
+
+    processes = min(SHARD_PROCESSES, SHARD_COUNT)
+    per_process, remainder = divmod(SHARD_COUNT, processes)
+    workers = []
+    first = 0
+    for index in range(processes):
+        # Spread any remainder over the first workers
+        last = first + per_process + (1 if index < remainder else 0) - 1
+        env = dict(os.environ, SHARD_IDS=f"{first}-{last}")
+        if METRICS_PORT:
+            # Each worker serves its own shards' metrics, so each needs its own port
+            env["METRICS_PORT"] = str(METRICS_PORT + index)
+        print(f"🚀 Starting worker {index} for shards {first}-{last} of {SHARD_COUNT}")
+        workers.append(subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env))
+        first = last + 1
+
+    try:
+        for worker in workers:
+            worker.wait()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
 
 
 if __name__ == "__main__":
     # Ensure you have a '.env' file with DISCORD_BOT_TOKEN="YOUR_TOKEN"
     try:
-        asyncio.run(main())
+        if SHARD_MODE == "cluster" and SHARD_IDS is None:
+            run_cluster()
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\nBot shutting down gracefully.")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import time
+from collections import OrderedDict, deque
+
+
+class SlidingWindowCounter:
+    """
+    Counts events over the last `window` seconds using a ring of fixed buckets.
+
+    Adding and reading are O(1) (amortized over at most `buckets` slots), and
+    memory is a fixed-size list no matter how many events come in.
+    """
+    __slots__ = ("bucket_width", "counts", "total", "_head", "_head_time")
+
+    def __init__(self, window: float = 10.0, buckets: int = 10):
+        self.bucket_width = window / buckets
+        self.counts = [0] * buckets
+        self.total = 0
+        self._head = 0
+        self._head_time = 0
+
+    def _advance(self, now: float):
+        tick = int(now / self.bucket_width)
+        steps = tick - self._head_time
+        if steps <= 0:
+            return
+        # Clear every bucket that slid out of the window (all of them after a long gap)
+        for _ in range(min(steps, len(self.counts))):
+            self._head = (self._head + 1) % len(self.counts)
+            self.total -= self.counts[self._head]
+            self.counts[self._head] = 0
+        self._head_time = tick
+
+    def add(self, now: float, amount: int = 1) -> int:
+        self._advance(now)
+        self.counts[self._head] += amount
+        self.total += amount
+        return self.total
+
+    def count(self, now: float) -> int:
+        self._advance(now)
+        return self.total
+
+
+class GuildJoinTracker:
+    """Join-rate state for a single guild."""
+    __slots__ = ("joins", "young_joins", "recent", "lockdown_until")
+
+    def __init__(self, window: float, recent_size: int):
+        self.joins = SlidingWindowCounter(window)
+        self.young_joins = SlidingWindowCounter(window)
+        # (member_id, joined_at) of the latest joins, so a lockdown can act on them
+        self.recent = deque(maxlen=recent_size)
+        self.lockdown_until = 0.0
+
+
+class RaidDetector:
+    """
+    Detects join raids from per-guild sliding-window join rates.
+
+    A raid trips when more than `max_joins` members join within `window`
+    seconds, or more than `max_young_joins` of them have accounts younger
+    than `young_account_age` seconds (either threshold can be overridden per
+    call, for per-guild settings). At most `max_guilds` trackers are kept
+    (least recently active guilds are dropped first), so memory stays bounded.
+    """
+    def __init__(self, max_joins: int = 10, max_young_joins: int = 5, window: float = 10.0,
+                 young_account_age: float = 7 * 86400, lockdown_duration: float = 600.0,
+                 max_guilds: int = 10000, recent_size: int = 200):
+        self.max_joins = max_joins
+        self.max_young_joins = max_young_joins
+        self.window = window
+        self.young_account_age = young_account_age
+        self.lockdown_duration = lockdown_duration
+        self.max_guilds = max_guilds
+        self.recent_size = recent_size
+        self.guilds = OrderedDict()
+
+    def _tracker(self, guild_id: int) -> GuildJoinTracker:
+        tracker = self.guilds.get(guild_id)
+        if tracker is None:
+            tracker = self.guilds[guild_id] = GuildJoinTracker(self.window, self.recent_size)
+            if len(self.guilds) > self.max_guilds:
+                self.guilds.popitem(last=False)
+        else:
+            self.guilds.move_to_end(guild_id)
+        return tracker
+
+    def record_join(self, guild_id: int, member_id: int, account_created: float, now: float = None,
+                    max_joins: int = None, max_young_joins: int = None) -> bool:
+        """
+        Records a join (timestamps are UNIX seconds). Returns True when this
+        join starts a new lockdown.
+        """
+        now = time.time() if now is None else now
+        tracker = self._tracker(guild_id)
+        tracker.recent.append((member_id, now))
+        joins = tracker.joins.add(now)
+        young = tracker.young_joins.count(now)
+        if now - account_created < self.young_account_age:
+            young = tracker.young_joins.add(now)
+
+        if self.in_lockdown(guild_id, now):
+            return False
+        max_joins = self.max_joins if max_joins is None else max_joins
+        max_young_joins = self.max_young_joins if max_young_joins is None else max_young_joins
+        if joins > max_joins or young > max_young_joins:
+            tracker.lockdown_until = now + self.lockdown_duration
+            return True
+        return False
+
+    def in_lockdown(self, guild_id: int, now: float = None) -> bool:
+        tracker = self.guilds.get(guild_id)
+        now = time.time() if now is None else now
+        return tracker is not None and tracker.lockdown_until > now
+
+    def raiders(self, guild_id: int, now: float = None):
+        """Returns the IDs of members who joined within the current window."""
+        tracker = self.guilds.get(guild_id)
+        if tracker is None:
+            return []
+        now = time.time() if now is None else now
+        return [member_id for member_id, joined in tracker.recent if now - joined <= self.window]
+
+    def end_lockdown(self, guild_id: int):
+        tracker = self.guilds.get(guild_id)
+        if tracker is not None:
+            tracker.lockdown_until = 0.0
+
+    def status(self, guild_id: int, now: float = None):
+        """Returns `(joins_in_window, young_joins_in_window, lockdown_seconds_left)`."""
+        tracker = self.guilds.get(guild_id)
+        if tracker is None:
+            return 0, 0, 0.0
+        now = time.time() if now is None else now
+        return tracker.joins.count(now), tracker.young_joins.count(now), max(0.0, tracker.lockdown_until - now)
@@ -0,0 +1,99 @@
+import asyncio
+
+import discord
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a `Name#Discriminator` (or plain username) for lookups."""
+    name = name.strip().lower()
+    # Migrated usernames have the discriminator "0", which str(user) leaves out
+    if name.endswith("#0"):
+        name = name[:-2]
+    return name
+
+
+class GuildBans:
+    """The ban list of a single guild, indexed by user ID and normalized name."""
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def add(self, user):
+        self.by_id[user.id] = user
+        self.by_name[normalize_name(str(user))] = user.id
+        self.by_name.setdefault(normalize_name(user.name), user.id)
+
+    def remove(self, user_id: int):
+        user = self.by_id.pop(user_id, None)
+        if user is None:
+            return
+        for key in (normalize_name(str(user)), normalize_name(user.name)):
+            if self.by_name.get(key) == user_id:
+                del self.by_name[key]
+
+
+class BanIndex:
+    """
+    Per-guild ban lookups that avoid paging the whole ban list on every /unban.
+
+    IDs are resolved with a single `fetch_ban` call. Names need the full list,
+    which is fetched lazily the first time a guild needs it and then kept
+    current from ban/unban gateway events.
+    """
+    def __init__(self):
+        # {guild_id: GuildBans}
+        self.guilds = {}
+
+    def _get(self, guild_id: int) -> GuildBans:
+        bans = self.guilds.get(guild_id)
+        if bans is None:
+            bans = self.guilds[guild_id] = GuildBans()
+        return bans
+
+    async def resolve(self, guild: discord.Guild, identifier: str):
+        """Returns the banned user matching an ID or `Name#Discriminator`, or None."""
+        bans = self._get(guild.id)
+        identifier = identifier.strip()
+
+        if identifier.isdigit():
+            user_id = int(identifier)
+            if user_id in bans.by_id:
+                return bans.by_id[user_id]
+            # The index may not be loaded (or complete) yet, so ask Discord directly
+            try:
+                entry = await guild.fetch_ban(discord.Object(id=user_id))
+            except discord.NotFound:
+                return None
+            if bans.loaded:
+                bans.add(entry.user)
+            return entry.user
+
+        await self._ensure_loaded(guild, bans)
+        user_id = bans.by_name.get(normalize_name(identifier))
+        return bans.by_id.get(user_id) if user_id is not None else None
+
+    async def _ensure_loaded(self, guild: discord.Guild, bans: GuildBans):
+        # The lock stops two concurrent lookups from both paging the full list
+        async with bans.lock:
+            if bans.loaded:
+                return
+            async for entry in guild.bans(limit=None):
+                bans.add(entry.user)
+            bans.loaded = True
+
+    # --- Gateway Updates ---
+    def on_ban(self, guild_id: int, user):
+        bans = self.guilds.get(guild_id)
+        # Guilds that were never loaded don't need updating, they'll be fetched in full later
+        if bans is not None and bans.loaded:
+            bans.add(user)
+
+    def on_unban(self, guild_id: int, user_id: int):
+        bans = self.guilds.get(guild_id)
+        if bans is not None:
+            bans.remove(user_id)
+
+    def forget(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
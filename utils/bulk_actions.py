@@ -0,0 +1,166 @@
+import asyncio
+import time
+from typing import NamedTuple
+
+import discord
+
+# Requests per second we allow ourselves per (action, guild) route. Discord doesn't
+# publish these buckets, so stay well under the point where 429s start.
+DEFAULT_ROUTE_RATES = {
+    "kick": 5.0,
+    "timeout": 5.0,
+    "ban": 5.0,
+    "bulk_ban": 1.0,
+}
+
+# Discord's bulk-ban endpoint accepts up to 200 users per request
+BULK_BAN_CHUNK = 200
+
+
+class BulkResult(NamedTuple):
+    succeeded: list
+    failed: list
+
+
+class RouteLimiter:
+    """A token bucket per route, so one busy route doesn't slow the others down."""
+    def __init__(self, rates=None):
+        self.rates = dict(DEFAULT_ROUTE_RATES, **(rates or {}))
+        # {route: [tokens, last_refill]}
+        self._buckets = {}
+        self._locks = {}
+
+    async def acquire(self, action: str, guild_id: int):
+        route = (action, guild_id)
+        rate = self.rates.get(action, 1.0)
+        lock = self._locks.setdefault(route, asyncio.Lock())
+        async with lock:
+            bucket = self._buckets.setdefault(route, [rate, time.monotonic()])
+            while True:
+                now = time.monotonic()
+                # Refill lazily based on how long it's been, capped at one second's worth
+                bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                if bucket[0] >= 1:
+                    bucket[0] -= 1
+                    return
+                await asyncio.sleep((1 - bucket[0]) / rate)
+
+
+class DiscordBackend:
+    """The real HTTP layer. Tests can pass any object with the same coroutines instead."""
+    async def kick(self, guild: discord.Guild, user, reason: str):
+        await guild.kick(user, reason=reason)
+
+    async def ban(self, guild: discord.Guild, user, reason: str):
+        await guild.ban(user, reason=reason, delete_message_seconds=0)
+
+    async def bulk_ban(self, guild: discord.Guild, users, reason: str):
+        result = await guild.bulk_ban(users, reason=reason, delete_message_seconds=0)
+        return result.banned, result.failed
+
+    async def timeout(self, guild: discord.Guild, member: discord.Member, until, reason: str):
+        await member.timeout(until, reason=reason)
+
+
+class BulkModerationEngine:
+    """
+    Runs a moderation action against many users through a small worker pool.
+
+    Every request waits on its route's token bucket first, so a mass action
+    never bursts into Discord's rate limits. Bans go through the bulk-ban
+    endpoint in chunks of 200, falling back to single bans if it's unavailable.
+    """
+    def __init__(self, backend=None, concurrency: int = 4, rates=None, progress_interval: float = 2.0):
+        self.backend = backend or DiscordBackend()
+        self.concurrency = concurrency
+        self.limiter = RouteLimiter(rates)
+        self.progress_interval = progress_interval
+
+    async def run(self, action: str, guild, users, reason: str, until=None, progress=None) -> BulkResult:
+        """
+        Applies `action` ("kick", "ban" or "timeout") to `users`.
+
+        `progress(done, failed, total)` is awaited at most every `progress_interval`
+        seconds while the job runs, and once more when it finishes.
+        """
+        users = list(users)
+        result = BulkResult([], [])
+        reporter = _ProgressReporter(progress, len(users), self.progress_interval)
+
+        if action == "ban":
+            remaining = await self._bulk_ban(guild, users, reason, result, reporter)
+        else:
+            remaining = users
+
+        if remaining:
+            queue = asyncio.Queue()
+            for user in remaining:
+                queue.put_nowait(user)
+            workers = [
+                asyncio.create_task(self._worker(queue, action, guild, reason, until, result, reporter))
+                for _ in range(min(self.concurrency, len(remaining)))
+            ]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        await reporter.report(result, force=True)
+        return result
+
+    async def _bulk_ban(self, guild, users, reason, result, reporter):
+        """Bans users in chunks through the bulk endpoint. Returns users left for single bans."""
+        for start in range(0, len(users), BULK_BAN_CHUNK):
+            chunk = users[start:start + BULK_BAN_CHUNK]
+            await self.limiter.acquire("bulk_ban", guild.id)
+            try:
+                banned, failed = await self.backend.bulk_ban(guild, chunk, reason)
+            except (discord.Forbidden, discord.NotFound):
+                raise
+            except discord.HTTPException:
+                # Not available for this guild (or it failed outright); ban the rest one by one
+                return users[start:]
+            banned_ids = {user.id for user in banned}
+            for user in chunk:
+                (result.succeeded if user.id in banned_ids else result.failed).append(user)
+            await reporter.report(result)
+        return []
+
+    async def _worker(self, queue, action, guild, reason, until, result, reporter):
+        while True:
+            user = await queue.get()
+            try:
+                await self.limiter.acquire(action, guild.id)
+                if action == "timeout":
+                    await self.backend.timeout(guild, user, until, reason)
+                else:
+                    await getattr(self.backend, action)(guild, user, reason)
+                result.succeeded.append(user)
+            except Exception:
+                # Any failure only counts against this user; the worker must keep draining the queue
+                result.failed.append(user)
+            finally:
+                queue.task_done()
+            await reporter.report(result)
+
+
+class _ProgressReporter:
+    """Throttles progress callbacks so a status message isn't edited on every user."""
+    def __init__(self, callback, total: int, interval: float):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self._last = 0.0
+
+    async def report(self, result: BulkResult, force: bool = False):
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        try:
+            await self.callback(len(result.succeeded), len(result.failed), self.total)
+        except discord.HTTPException:
+            pass # A failed status edit shouldn't stop the job
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import NamedTuple, Optional
+
+from utils.database import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    target_id INTEGER,
+    moderator_id INTEGER,
+    reason TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_target ON cases (guild_id, target_id, id);
+CREATE INDEX IF NOT EXISTS idx_cases_moderator ON cases (guild_id, moderator_id, id);
+"""
+
+COLUMNS = "guild_id, action, target_id, moderator_id, reason, created_at"
+
+
+class Case(NamedTuple):
+    guild_id: int
+    action: str
+    target_id: Optional[int]
+    moderator_id: Optional[int]
+    reason: Optional[str]
+    created_at: float
+    id: Optional[int] = None
+
+
+class CaseLog:
+    """
+    Append-only moderation case log with write-behind batching.
+
+    `record()` is synchronous and only appends to an in-memory buffer, so
+    logging never adds a database round trip to a command. The buffer is
+    written in one transaction every `flush_interval` seconds, or as soon as
+    `batch_size` entries are waiting, which lets a raid's thousands of bulk
+    actions land as a handful of inserts.
+    """
+    def __init__(self, db: Database, flush_interval: float = 1.0, batch_size: int = 1000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = []
+        self._flush_event = asyncio.Event()
+        self._flush_task = None
+
+    async def start(self):
+        await self.db.executescript(SCHEMA)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the background flusher and writes out anything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # --- Writes ---
+    def record(self, guild_id: int, action: str, target_id: int = None, moderator_id: int = None, reason: str = None):
+        """Queues a case for the next batch."""
+        self._pending.append(Case(guild_id, action, target_id, moderator_id, reason, time.time()))
+        if len(self._pending) >= self.batch_size:
+            self._flush_event.set()
+
+    async def flush(self):
+        """Writes all pending cases to the database in a single transaction."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self.db.executemany(
+                f"INSERT INTO cases ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                [case[:6] for case in batch]
+            )
+        except Exception:
+            # Put the batch back so the next flush retries it
+            self._pending = batch + self._pending
+            raise
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠ Error flushing moderation cases: {e}")
+
+    # --- Queries ---
+    async def query(self, guild_id: int, target_id: int = None, moderator_id: int = None,
+                    limit: int = 10, offset: int = 0):
+        """
+        Returns `(total, cases)` for a page of a guild's cases, newest first,
+        filtered by target and/or moderator.
+        """
+        # Recent cases may still be in the buffer
+        await self.flush()
+        where, params = ["guild_id = ?"], [guild_id]
+        if target_id is not None:
+            where.append("target_id = ?")
+            params.append(target_id)
+        if moderator_id is not None:
+            where.append("moderator_id = ?")
+            params.append(moderator_id)
+        where = " AND ".join(where)
+
+        total = (await self.db.fetchone(f"SELECT COUNT(*) FROM cases WHERE {where}", params))[0]
+        rows = await self.db.fetchall(
+            f"SELECT {COLUMNS}, id FROM cases WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return total, [Case(*row) for row in rows]
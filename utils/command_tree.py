@@ -0,0 +1,42 @@
+import discord
+from discord import app_commands
+
+from utils.cooldowns import CooldownManager
+
+
+class TesseractTree(app_commands.CommandTree):
+    """
+    The bot's app-command tree, with cross-cutting hooks for every cog.
+
+    Each slash command is stamped for the metrics collector, checked against
+    its cooldowns and armed with the responder's deadline before it runs, and
+    every error is counted before the default handling takes over.
+    """
+    def __init__(self, client, **kwargs):
+        super().__init__(client, **kwargs)
+        # Per-user/guild/channel limits for every command (see utils.cooldowns)
+        self.cooldowns = CooldownManager()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Autocomplete requests also pass through here; only time and limit real commands
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        self.client.metrics.start(interaction)
+
+        refused = self.cooldowns.check(interaction)
+        if refused is None:
+            self.client.responder.arm(interaction)
+            return True
+        limit, retry_after = refused
+        error = app_commands.CommandOnCooldown(app_commands.Cooldown(limit.rate, limit.per), retry_after)
+        self.client.metrics.finish(interaction, error)
+        where = {"user": "You're", "guild": "This server is", "channel": "This channel is"}[limit.scope]
+        await self.client.responder.send(
+            interaction, f"⏳ {where} using this command too quickly. Try again in {retry_after:.1f}s.", ephemeral=True
+        )
+        return False
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self.client.metrics.finish(interaction, error)
+        self.client.responder.release(interaction)
+        await super().on_error(interaction, error)
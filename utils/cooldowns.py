@@ -0,0 +1,184 @@
+import time
+from typing import NamedTuple
+
+import discord
+from discord import app_commands
+
+SCOPES = ("user", "guild", "channel")
+
+
+class Limit(NamedTuple):
+    """`rate` uses per `per` seconds, counted per user, guild or channel."""
+    rate: int
+    per: float
+    scope: str = "user"
+
+    def key(self, interaction: discord.Interaction) -> int:
+        if self.scope == "guild":
+            # DMs have no guild, so they're limited like a guild of one
+            return interaction.guild_id or interaction.user.id
+        if self.scope == "channel":
+            return interaction.channel_id or interaction.user.id
+        return interaction.user.id
+
+
+# Applied to every command that doesn't declare its own limits
+DEFAULT_LIMITS = (Limit(5, 10.0, "user"),)
+# Most buckets a single prune() call removes, so one call never holds the loop for long
+PRUNE_SLICE = 10000
+
+
+def cooldown(rate: int, per: float, scope: str = "user"):
+    """
+    Declares a limit for an app command. Stack it to combine limits, e.g. a
+    per-user limit plus a looser per-guild one. Works above or below
+    `@app_commands.command`.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Cooldown scope must be one of {', '.join(SCOPES)} (got {scope!r})")
+    limit = Limit(rate, per, scope)
+
+    def decorator(func):
+        if isinstance(func, (app_commands.Command, app_commands.ContextMenu)):
+            func.extras.setdefault("cooldowns", []).append(limit)
+        else:
+            if not hasattr(func, "__cooldowns__"):
+                func.__cooldowns__ = []
+            func.__cooldowns__.append(limit)
+        return func
+    return decorator
+
+
+class CooldownManager:
+    """
+    Shared cooldown state for every app command, checked by the command tree.
+
+    Each bucket is stored as a single float, its "theoretical arrival time"
+    (the GCRA form of a token bucket): the moment the bucket would be full
+    again if nobody used it. Refill is implicit in comparing that time with
+    the clock, so a check is one dict lookup and a few float operations, and
+    a bucket whose time has passed is indistinguishable from a missing one.
+    That makes eviction exact: `prune()` drops those buckets without changing
+    anyone's remaining allowance.
+
+    Buckets live in one dict per (command, limit), keyed by the user, guild
+    or channel ID, so the per-bucket cost is a dict slot plus a float. Each
+    dict is kept in the order its buckets were last charged, so the idle ones
+    collect at the front and pruning never has to look past them.
+    """
+    def __init__(self, default_limits=DEFAULT_LIMITS, clock=time.monotonic):
+        self.default_limits = tuple(default_limits)
+        self.clock = clock
+        # {(command_name, Limit): {scope_id: full_at}}
+        self._buckets = {}
+        # {(command_name, Limit): buckets pruned since the table was last compacted}
+        self._pruned = {}
+        # Limits set at runtime, overriding the command's own: {command_name: (Limit, ...)}
+        self.overrides = {}
+        self.rejected = 0
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self._buckets.values())
+
+    def limits_for(self, command) -> tuple:
+        name = command.qualified_name
+        limits = self.overrides.get(name)
+        if limits is None:
+            limits = command.extras.get("cooldowns") or getattr(command.callback, "__cooldowns__", None)
+        return tuple(limits) if limits is not None else self.default_limits
+
+    def set_limits(self, command_name: str, limits):
+        """Overrides a command's limits (an empty list disables them). None restores its own."""
+        if limits is None:
+            self.overrides.pop(command_name, None)
+        else:
+            self.overrides[command_name] = tuple(limits)
+        # Buckets for limits that no longer apply expire on the next prune
+
+    # --- Checks ---
+    def check(self, interaction: discord.Interaction):
+        """
+        Consumes one use from each of the command's buckets. Returns None if
+        allowed, or `(limit, retry_after)` for the limit that refused it, in
+        which case no bucket is charged.
+        """
+        command = interaction.command
+        if command is None:
+            return None
+        limits = self.limits_for(command)
+        if not limits:
+            return None
+
+        now = self.clock()
+        name = command.qualified_name
+        updates = []
+        refused = None
+        for limit in limits:
+            buckets = self._buckets.get((name, limit))
+            if buckets is None:
+                buckets = self._buckets[(name, limit)] = {}
+            key = limit.key(interaction)
+            interval = limit.per / limit.rate
+            full_at = max(buckets.get(key, now), now)
+            # The bucket holds `rate` uses; each one pushes full_at forward by one interval
+            retry_after = full_at + interval - now - limit.per
+            if retry_after > 0:
+                if refused is None or retry_after > refused[1]:
+                    refused = (limit, retry_after)
+            else:
+                updates.append((buckets, key, full_at + interval))
+
+        if refused is not None:
+            self.rejected += 1
+            return refused
+        for buckets, key, full_at in updates:
+            # Re-inserted rather than updated in place, to move the bucket to the back
+            buckets.pop(key, None)
+            buckets[key] = full_at
+        return None
+
+    def reset(self, command_name: str = None):
+        """Clears the buckets of one command (or of every command)."""
+        if command_name is None:
+            self._buckets.clear()
+            self._pruned.clear()
+            return
+        for name, limit in [key for key in self._buckets if key[0] == command_name]:
+            del self._buckets[(name, limit)]
+            self._pruned.pop((name, limit), None)
+
+    # --- Eviction ---
+    def prune(self, now: float = None, limit: int = PRUNE_SLICE) -> int:
+        """
+        Drops up to `limit` full (idle) buckets, oldest first. Returns how many;
+        a return value of `limit` means there may be more to drop.
+
+        Only the front of each table is looked at, up to its first bucket that
+        is still in use. Every bucket is charged at most `per` seconds ahead, so
+        an idle bucket stuck behind a busy one is dropped at most that much later.
+        """
+        now = self.clock() if now is None else now
+        removed = 0
+        for table_key in list(self._buckets):
+            buckets = self._buckets[table_key]
+            idle = []
+            for key, full_at in buckets.items():
+                if full_at > now or removed + len(idle) >= limit:
+                    break
+                idle.append(key)
+            for key in idle:
+                del buckets[key]
+            removed += len(idle)
+            if not buckets:
+                del self._buckets[table_key]
+                self._pruned.pop(table_key, None)
+            else:
+                # Deleted entries leave holes at the front that every later pass has to step over;
+                # once they outnumber the live buckets, copying the table is cheaper than keeping them
+                pruned = self._pruned[table_key] = self._pruned.get(table_key, 0) + len(idle)
+                if pruned > len(buckets):
+                    self._buckets[table_key] = dict(buckets)
+                    self._pruned[table_key] = 0
+            if removed >= limit:
+                break
+        return removed
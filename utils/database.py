@@ -0,0 +1,81 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Database:
+    """
+    A small async wrapper around a single SQLite connection.
+
+    Every query runs on one dedicated worker thread, so the connection is never
+    shared between threads and the event loop never blocks on disk I/O.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._executor = None
+
+    async def open(self):
+        """Opens the connection and switches the database to WAL mode."""
+        if self._conn is not None:
+            return
+        # A single worker keeps every statement on the thread that owns the connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = await self._run(self._connect)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run while a batch is being written, and NORMAL sync
+        # only fsyncs on checkpoints instead of on every commit.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def run(self, func, *args):
+        """Runs `func(connection, *args)` on the database thread."""
+        return await self._run(func, self._conn, *args)
+
+    async def executescript(self, script: str):
+        def _script(conn):
+            conn.executescript(script)
+            conn.commit()
+        await self.run(_script)
+
+    async def execute(self, sql: str, params=()):
+        """Executes a single statement and commits it. Returns the last row id."""
+        def _execute(conn):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+        return await self.run(_execute)
+
+    async def executemany(self, sql: str, rows):
+        """Executes a statement for every row inside one transaction."""
+        def _executemany(conn):
+            with conn:
+                conn.executemany(sql, rows)
+        await self.run(_executemany)
+
+    async def fetchall(self, sql: str, params=()):
+        def _fetchall(conn):
+            return conn.execute(sql, params).fetchall()
+        return await self.run(_fetchall)
+
+    async def fetchone(self, sql: str, params=()):
+        def _fetchone(conn):
+            return conn.execute(sql, params).fetchone()
+        return await self.run(_fetchone)
+
+    async def close(self):
+        """Closes the connection and shuts down the worker thread."""
+        if self._conn is None:
+            return
+        await self.run(lambda conn: conn.close())
+        self._conn = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+
+import discord
+
+
+class EmbedCache:
+    """
+    An LRU of prebuilt info embeds, keyed by `(guild_id, user_id)`.
+
+    `user_id` is None for guild-level embeds (/serverinfo). Secondary indexes
+    by guild and by user make invalidation proportional to the entries that
+    are actually affected, so an update event never scans the whole cache.
+
+    With `member_ttl`, member embeds also expire after that many seconds, for
+    when update events can't be relied on (uncached members get none).
+    """
+    def __init__(self, max_entries: int = 2048, member_ttl: float = None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.member_ttl = member_ttl
+        self.clock = clock
+        # {key: (embed, expires_at or None)}
+        self._entries = OrderedDict()
+        # {guild_id: set(keys)} and {user_id: set(keys)}
+        self._by_guild = {}
+        self._by_user = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, guild_id: int, user_id: int = None):
+        key = (guild_id, user_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            self._discard(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, guild_id: int, user_id: int, embed: discord.Embed):
+        key = (guild_id, user_id)
+        expires_at = None
+        if user_id is not None and self.member_ttl is not None:
+            expires_at = self.clock() + self.member_ttl
+        self._entries[key] = (embed, expires_at)
+        self._entries.move_to_end(key)
+        self._by_guild.setdefault(guild_id, set()).add(key)
+        if user_id is not None:
+            self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        if self._entries.pop(key, None) is None:
+            return
+        guild_id, user_id = key
+        for index, index_key in ((self._by_guild, guild_id), (self._by_user, user_id)):
+            keys = index.get(index_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[index_key]
+
+    # --- Invalidation ---
+    def invalidate(self, guild_id: int, user_id: int = None):
+        """Drops one entry (the guild's own embed when `user_id` is None)."""
+        self._discard((guild_id, user_id))
+
+    def invalidate_guild(self, guild_id: int):
+        """Drops every entry for a guild, including its members' embeds."""
+        for key in list(self._by_guild.get(guild_id, ())):
+            self._discard(key)
+
+    def invalidate_user(self, user_id: int):
+        """Drops a user's embeds in every guild (for account-wide changes like a new avatar)."""
+        for key in list(self._by_user.get(user_id, ())):
+            self._discard(key)
@@ -0,0 +1,117 @@
+from typing import NamedTuple, Optional
+
+from utils.database import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS escalation_steps (
+    guild_id INTEGER NOT NULL,
+    warnings INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    duration_minutes INTEGER,
+    PRIMARY KEY (guild_id, warnings)
+);
+CREATE TABLE IF NOT EXISTS escalation_settings (
+    guild_id INTEGER PRIMARY KEY,
+    expiry_days INTEGER,
+    custom_ladder INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+ACTIONS = ("timeout", "kick", "ban")
+
+
+class EscalationStep(NamedTuple):
+    action: str
+    duration_minutes: Optional[int] = None
+
+
+# Used by every guild that hasn't configured its own ladder: warnings alone never
+# punish anyone until a server adds steps with /escalation set
+DEFAULT_LADDER = {}
+DEFAULT_EXPIRY_DAYS = 30
+
+
+class EscalationPolicy:
+    """
+    Per-guild escalation ladders ("N active warnings -> action") and warning expiry.
+
+    Everything is loaded into memory once at startup and written through to
+    SQLite on change, so lookups on the /warn path are plain dict reads.
+    """
+    def __init__(self, db: Database):
+        self.db = db
+        # {guild_id: {warning_count: EscalationStep}} for guilds with a custom ladder
+        self.ladders = {}
+        # {guild_id: days} for guilds with a custom expiry (0 = never expire)
+        self.expiry_days = {}
+
+    async def start(self):
+        await self.db.executescript(SCHEMA)
+        for guild_id, expiry_days, custom_ladder in await self.db.fetchall(
+            "SELECT guild_id, expiry_days, custom_ladder FROM escalation_settings"
+        ):
+            if expiry_days is not None:
+                self.expiry_days[guild_id] = expiry_days
+            if custom_ladder:
+                # A custom ladder may have had all of its steps removed
+                self.ladders[guild_id] = {}
+        for guild_id, warnings, action, duration in await self.db.fetchall(
+            "SELECT guild_id, warnings, action, duration_minutes FROM escalation_steps"
+        ):
+            if guild_id in self.ladders:
+                self.ladders[guild_id][warnings] = EscalationStep(action, duration)
+
+    # --- Lookups ---
+    def ladder(self, guild_id: int):
+        return self.ladders.get(guild_id, DEFAULT_LADDER)
+
+    def step_for(self, guild_id: int, warning_count: int) -> Optional[EscalationStep]:
+        """Returns the step triggered by reaching exactly `warning_count` warnings, if any."""
+        return self.ladder(guild_id).get(warning_count)
+
+    def expires_at(self, guild_id: int, now: float) -> Optional[float]:
+        """Returns when a warning issued at `now` expires, or None if warnings never expire."""
+        days = self.expiry_days.get(guild_id, DEFAULT_EXPIRY_DAYS)
+        return now + days * 86400 if days else None
+
+    # --- Changes ---
+    async def _customize(self, guild_id: int):
+        """Gives a guild its own copy of the default ladder before its first change."""
+        ladder = self.ladders.get(guild_id)
+        if ladder is not None:
+            return ladder
+        ladder = self.ladders[guild_id] = dict(DEFAULT_LADDER)
+        await self.db.execute(
+            "INSERT INTO escalation_settings (guild_id, custom_ladder) VALUES (?, 1) "
+            "ON CONFLICT (guild_id) DO UPDATE SET custom_ladder = 1",
+            (guild_id,)
+        )
+        await self.db.executemany(
+            "INSERT OR REPLACE INTO escalation_steps (guild_id, warnings, action, duration_minutes) VALUES (?, ?, ?, ?)",
+            [(guild_id, count, step.action, step.duration_minutes) for count, step in ladder.items()]
+        )
+        return ladder
+
+    async def set_step(self, guild_id: int, warnings: int, step: EscalationStep):
+        ladder = await self._customize(guild_id)
+        ladder[warnings] = step
+        await self.db.execute(
+            "INSERT OR REPLACE INTO escalation_steps (guild_id, warnings, action, duration_minutes) VALUES (?, ?, ?, ?)",
+            (guild_id, warnings, step.action, step.duration_minutes)
+        )
+
+    async def remove_step(self, guild_id: int, warnings: int) -> bool:
+        ladder = await self._customize(guild_id)
+        if warnings not in ladder:
+            return False
+        del ladder[warnings]
+        await self.db.execute("DELETE FROM escalation_steps WHERE guild_id = ? AND warnings = ?", (guild_id, warnings))
+        return True
+
+    async def set_expiry(self, guild_id: int, days: int):
+        self.expiry_days[guild_id] = days
+        await self.db.execute(
+            "INSERT INTO escalation_settings (guild_id, expiry_days) VALUES (?, ?) "
+            "ON CONFLICT (guild_id) DO UPDATE SET expiry_days = excluded.expiry_days",
+            (guild_id, days)
+        )
@@ -0,0 +1,242 @@
+import asyncio
+import inspect
+import json
+import time
+from collections import OrderedDict
+
+import discord
+
+from utils.database import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (guild_id, key)
+) WITHOUT ROWID;
+"""
+
+# Pseudo guild ID for bot-wide settings (status interval, invite permissions)
+GLOBAL = 0
+
+# Separator for list settings entered through a single slash-command option
+LIST_SEPARATOR = "|"
+
+
+class Setting:
+    """
+    A typed, registered configuration key.
+
+    `kind` is one of "str", "int", "bool", "list" (of strings) or
+    "permissions"; it decides how values are parsed from user input, stored
+    and displayed. `choices` restricts a "str" setting to a fixed set of
+    values. Global settings are stored under GLOBAL and apply to the whole bot.
+    """
+    KINDS = ("str", "int", "bool", "list", "permissions")
+    TRUE = ("on", "true", "yes", "enable", "enabled", "1")
+    FALSE = ("off", "false", "no", "disable", "disabled", "0")
+
+    def __init__(self, key: str, kind: str, default, description: str, scope: str = "guild",
+                 minimum: int = None, maximum: int = None, choices=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown setting kind: {kind}")
+        self.key = key
+        self.kind = kind
+        self.default = default
+        self.description = description
+        self.scope = scope
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+
+    def __repr__(self):
+        return f"<Setting {self.key} ({self.kind})>"
+
+    def parse(self, text: str):
+        """Converts user input into a value of this setting's type (raises ValueError)."""
+        text = text.strip()
+        if self.kind == "str":
+            if not text:
+                raise ValueError("The value can't be empty.")
+            if self.choices is not None and text.lower() not in self.choices:
+                raise ValueError(f"The value must be one of: {', '.join(self.choices)}.")
+            return text.lower() if self.choices is not None else text
+        if self.kind == "int":
+            value = int(text)
+            if self.minimum is not None and value < self.minimum:
+                raise ValueError(f"The value must be at least {self.minimum}.")
+            if self.maximum is not None and value > self.maximum:
+                raise ValueError(f"The value must be at most {self.maximum}.")
+            return value
+        if self.kind == "bool":
+            if text.lower() in self.TRUE:
+                return True
+            if text.lower() in self.FALSE:
+                return False
+            raise ValueError("The value must be `on` or `off`.")
+        if self.kind == "list":
+            items = [item.strip() for item in text.split(LIST_SEPARATOR) if item.strip()]
+            if not items:
+                raise ValueError(f"Give at least one entry (separate entries with `{LIST_SEPARATOR}`).")
+            return items
+        # Permissions: a raw integer value or comma-separated permission names
+        if text.isdigit():
+            return discord.Permissions(int(text))
+        names = [name.strip().lower().replace(" ", "_") for name in text.split(",") if name.strip()]
+        unknown = [name for name in names if name not in discord.Permissions.VALID_FLAGS]
+        if unknown:
+            raise ValueError(f"Unknown permissions: {', '.join(unknown)}")
+        return discord.Permissions(**{name: True for name in names})
+
+    def encode(self, value) -> str:
+        return json.dumps(value.value if self.kind == "permissions" else value)
+
+    def decode(self, raw: str):
+        value = json.loads(raw)
+        return discord.Permissions(value) if self.kind == "permissions" else value
+
+    def format(self, value) -> str:
+        if self.kind == "bool":
+            return "on" if value else "off"
+        if self.kind == "list":
+            return f" {LIST_SEPARATOR} ".join(value)
+        if self.kind == "permissions":
+            names = [name for name, enabled in value if enabled]
+            return ", ".join(names) or "none"
+        return str(value)
+
+
+class GuildConfig:
+    """
+    Per-guild settings with a read-through cache.
+
+    Each guild's overrides are loaded with one query the first time they're
+    needed, then served from memory for `ttl` seconds, so reads on hot paths
+    are a couple of dict lookups. Guilds without overrides are cached too (as
+    an empty dict), and unset keys fall back to the setting's default.
+
+    Writes go straight to the database, invalidate the guild's cache entry and
+    notify subscribers. The TTL bounds how stale a value can get when another
+    process (cluster mode) changes it.
+    """
+    def __init__(self, db: Database, ttl: float = 300.0, max_guilds: int = 50000, clock=time.monotonic):
+        self.db = db
+        self.ttl = ttl
+        self.max_guilds = max_guilds
+        self.clock = clock
+        # {key: Setting} for every registered setting
+        self.settings = {}
+        # {guild_id: (expires_at, {key: value})}, least recently used first
+        self._cache = OrderedDict()
+        # {guild_id: Future} for loads in flight, so concurrent misses share one query
+        self._loading = {}
+        # {key: [callback(guild_id, value)]}
+        self._subscribers = {}
+
+    async def start(self):
+        await self.db.executescript(SCHEMA)
+
+    def register(self, *settings: Setting):
+        for setting in settings:
+            self.settings[setting.key] = setting
+
+    # --- Reads ---
+    async def get(self, guild_id: int, setting: Setting):
+        """Returns a guild's value for `setting`, loading the guild's overrides on a cache miss."""
+        entry = self._cache.get(guild_id)
+        if entry is None or entry[0] <= self.clock():
+            values = await self._load(guild_id)
+        else:
+            # Keeps eviction least-recently-used rather than oldest-loaded
+            self._cache.move_to_end(guild_id)
+            values = entry[1]
+        return values.get(setting.key, setting.default)
+
+    def get_cached(self, guild_id: int, setting: Setting):
+        """Like get(), but never touches the database (falls back to the default on a miss)."""
+        entry = self._cache.get(guild_id)
+        if entry is None:
+            return setting.default
+        self._cache.move_to_end(guild_id)
+        return entry[1].get(setting.key, setting.default)
+
+    async def overrides(self, guild_id: int):
+        """Returns `{key: value}` for the settings a guild has changed."""
+        entry = self._cache.get(guild_id)
+        if entry is None or entry[0] <= self.clock():
+            return dict(await self._load(guild_id))
+        return dict(entry[1])
+
+    async def _load(self, guild_id: int):
+        pending = self._loading.get(guild_id)
+        if pending is not None:
+            return await pending
+
+        future = self._loading[guild_id] = asyncio.get_running_loop().create_future()
+        try:
+            rows = await self.db.fetchall("SELECT key, value FROM guild_settings WHERE guild_id = ?", (guild_id,))
+            values = {}
+            for key, raw in rows:
+                setting = self.settings.get(key)
+                # Keys nobody has registered (e.g. a removed cog) are ignored
+                if setting is not None:
+                    values[key] = setting.decode(raw)
+            self._store(guild_id, values)
+            future.set_result(values)
+            return values
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it here so waiters see the error without an "unretrieved" warning
+            future.exception()
+            raise
+        finally:
+            del self._loading[guild_id]
+
+    def _store(self, guild_id: int, values):
+        self._cache.pop(guild_id, None)
+        self._cache[guild_id] = (self.clock() + self.ttl, values)
+        while len(self._cache) > self.max_guilds:
+            self._cache.popitem(last=False)
+
+    # --- Writes ---
+    async def set(self, guild_id: int, setting: Setting, value):
+        await self.db.execute(
+            "INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)",
+            (guild_id, setting.key, setting.encode(value))
+        )
+        self.invalidate(guild_id)
+        await self._notify(guild_id, setting, value)
+
+    async def reset(self, guild_id: int, setting: Setting):
+        """Removes a guild's override, going back to the default."""
+        await self.db.execute(
+            "DELETE FROM guild_settings WHERE guild_id = ? AND key = ?", (guild_id, setting.key)
+        )
+        self.invalidate(guild_id)
+        await self._notify(guild_id, setting, setting.default)
+
+    def invalidate(self, guild_id: int = None):
+        """Drops one guild's cached settings (or all of them), so the next read reloads."""
+        if guild_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(guild_id, None)
+
+    # --- Change Notifications ---
+    def subscribe(self, setting: Setting, callback):
+        """Calls `callback(guild_id, value)` (sync or async) whenever `setting` changes."""
+        self._subscribers.setdefault(setting.key, []).append(callback)
+
+    async def _notify(self, guild_id: int, setting: Setting, value):
+        for callback in self._subscribers.get(setting.key, ()):
+            try:
+                result = callback(guild_id, value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"⚠ Error in {setting.key} change callback: {e}")
+
+    # --- Listeners ---
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.invalidate(guild.id)
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import time
+from typing import NamedTuple, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.tree_sync import sync_if_changed
+
+
+class ReloadResult(NamedTuple):
+    extension: str
+    # Phase name -> seconds ("handoff out", "reload", "handoff in", "tree sync")
+    timings: dict
+    # Names of the cogs whose state was carried over
+    handed_off: list
+    # Number of commands synced, or None if the tree's signatures didn't change
+    synced: Optional[int]
+    error: Optional[Exception] = None
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+
+class CogReloader:
+    """
+    Reloads extensions in place, keeping the gateway connection and caches.
+
+    Cogs opt in to keeping in-memory state across a reload by defining
+    `export_state()` (called on the old instance, before it's unloaded) and
+    `import_state(state)` (called on the new one, after `cog_load`). Anything
+    persisted to the database already survives, since cogs flush on unload
+    and reload on load. Only the extension's own module is re-imported;
+    changes to `utils/` still need a restart.
+
+    The command tree is re-synced only when the reload changed what Discord
+    would receive (the same hash `sync_if_changed` keeps), so editing a
+    command's body costs no sync at all.
+    """
+    def __init__(self, bot: commands.Bot, tree_hash_path: str, directory: str = "cogs",
+                 poll_interval: float = 1.0, can_sync: bool = True):
+        self.bot = bot
+        self.tree_hash_path = tree_hash_path
+        self.directory = directory
+        self.poll_interval = poll_interval
+        # In cluster mode only the worker holding shard 0 syncs
+        self.can_sync = can_sync
+        # Reloads run one at a time; a watcher event during a manual reload waits its turn
+        self._lock = asyncio.Lock()
+        self._watch_task = None
+        self.history = []
+
+    async def reload(self, extension: str) -> ReloadResult:
+        async with self._lock:
+            return await self._reload(extension)
+
+    async def _reload(self, extension: str) -> ReloadResult:
+        timings = {}
+        started = time.perf_counter()
+        states = {}
+        for cog in list(self.bot.cogs.values()):
+            if type(cog).__module__ == extension and hasattr(cog, "export_state"):
+                states[cog.qualified_name] = cog.export_state()
+        timings["handoff out"] = time.perf_counter() - started
+
+        error = None
+        started = time.perf_counter()
+        try:
+            await self.bot.reload_extension(extension)
+        except commands.ExtensionError as e:
+            # discord.py rolls back to the previous module, whose new instances still take the state
+            error = e
+        timings["reload"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        handed_off = []
+        for name, state in states.items():
+            cog = self.bot.get_cog(name)
+            if cog is not None and hasattr(cog, "import_state"):
+                try:
+                    cog.import_state(state)
+                    handed_off.append(name)
+                except Exception as e:
+                    print(f"⚠ {name} could not take over its previous state: {e}")
+        timings["handoff in"] = time.perf_counter() - started
+
+        synced = None
+        if error is None and self.can_sync:
+            started = time.perf_counter()
+            try:
+                result = await sync_if_changed(self.bot.tree, self.tree_hash_path)
+                synced = len(result) if result is not None else None
+            except discord.HTTPException as e:
+                error = e
+            timings["tree sync"] = time.perf_counter() - started
+
+        result = ReloadResult(extension, timings, handed_off, synced, error)
+        self.history = (self.history + [result])[-20:]
+        phases = ", ".join(f"{phase}: {seconds * 1000:.1f}ms" for phase, seconds in timings.items())
+        status = f"failed ({error})" if error else "done"
+        print(f"♻️ Reload of {extension} {status} in {result.total * 1000:.1f}ms ({phases})")
+        return result
+
+    # --- File Watcher ---
+    def watch(self):
+        """Starts reloading loaded extensions from `directory` whenever their file changes."""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def _modified_times(self):
+        """`{extension: mtime}` for the loaded extensions that live in `directory`."""
+        prefix = self.directory.replace(os.sep, ".") + "."
+        times = {}
+        for extension in self.bot.extensions:
+            if not extension.startswith(prefix):
+                continue
+            path = os.path.join(self.directory, *extension[len(prefix):].split(".")) + ".py"
+            try:
+                times[extension] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return times
+
+    async def _watch(self):
+        known = self._modified_times()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = self._modified_times()
+            for extension, mtime in current.items():
+                if extension in known and known[extension] != mtime:
+                    # Editors often write in several steps; give the save a moment to finish
+                    await asyncio.sleep(self.poll_interval / 2)
+                    try:
+                        await self.reload(extension)
+                    except Exception as e:
+                        print(f"⚠ Automatic reload of {extension} failed: {e}")
+            known = self._modified_times()
@@ -0,0 +1,143 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+import aiohttp
+
+
+class ImageSource:
+    """
+    A pluggable image API. `fetch(session)` returns a list of image URLs.
+
+    The default sources below only differ by endpoint and response parsing,
+    so tests can point one at a local stub server by passing a different URL.
+    An `{offset}` placeholder in the URL is filled with a random number per request.
+    """
+    def __init__(self, name: str, url: str, parse, batch: int = 1):
+        self.name = name
+        self.url = url
+        self.parse = parse
+        # How many requests to make per refill (for APIs that return one image per call)
+        self.batch = batch
+
+    async def fetch(self, session: aiohttp.ClientSession):
+        urls = []
+        for _ in range(self.batch):
+            async with session.get(self.url.format(offset=random.randint(0, 1000))) as response:
+                response.raise_for_status()
+                urls.extend(self.parse(await response.json(content_type=None)))
+        return urls
+
+
+def cat_source(url: str = "https://cataas.com/api/cats?limit=10&skip={offset}"):
+    # cataas lists cats by ID; the random offset keeps the pool varied across refills
+    def parse(data):
+        ids = (cat.get("id") or cat.get("_id") for cat in data)
+        return [f"https://cataas.com/cat/{cat_id}" for cat_id in ids if cat_id]
+    return ImageSource("cat", url, parse)
+
+
+def dog_source(url: str = "https://random.dog/woof.json?filter=mp4,webm"):
+    def parse(data):
+        return [data["url"]] if data.get("url") else []
+    return ImageSource("dog", url, parse, batch=5)
+
+
+def meme_source(url: str = "https://meme-api.com/gimme/10"):
+    def parse(data):
+        return [meme["url"] for meme in data.get("memes", []) if not meme.get("nsfw")]
+    return ImageSource("meme", url, parse)
+
+
+class ImagePool:
+    """
+    Keeps a bounded ring buffer of fresh, unique image URLs per source.
+
+    A background task refills each buffer over a pooled aiohttp session, so
+    commands take an image instantly instead of waiting on a third-party API.
+    Entries expire after `ttl` seconds, and URLs seen recently (the last
+    `size * 5` per source) are skipped, so users don't get repeats.
+    """
+    def __init__(self, sources, size: int = 20, ttl: float = 3600.0, refill_interval: float = 10.0):
+        self.sources = {source.name: source for source in sources}
+        self.size = size
+        self.ttl = ttl
+        self.refill_interval = refill_interval
+        # {source_name: deque([(url, fetched_at), ...])}
+        self.buffers = {name: deque(maxlen=size) for name in self.sources}
+        # Recently seen URLs per source, oldest first (a dict doubles as an ordered set)
+        self._seen = {name: {} for name in self.sources}
+        self._session = None
+        self._task = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+        if self._task is None:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def take(self, name: str):
+        """Returns a fresh image URL for `name`, or None if the pool is empty."""
+        buffer = self.buffers[name]
+        self._evict_expired(name)
+        if not buffer:
+            return None
+        url, _ = buffer.popleft()
+        # Top the buffer back up early once it runs low
+        if len(buffer) < self.size // 2:
+            self._wakeup.set()
+        return url
+
+    def _evict_expired(self, name: str):
+        buffer = self.buffers[name]
+        cutoff = time.monotonic() - self.ttl
+        while buffer and buffer[0][1] < cutoff:
+            buffer.popleft()
+
+    def _add(self, name: str, urls):
+        buffer = self.buffers[name]
+        seen = self._seen[name]
+        now = time.monotonic()
+        for url in urls:
+            if url in seen or len(buffer) >= self.size:
+                continue
+            buffer.append((url, now))
+            seen[url] = None
+            if len(seen) > self.size * 5:
+                del seen[next(iter(seen))]
+
+    async def refill(self, name: str):
+        self._evict_expired(name)
+        if len(self.buffers[name]) >= self.size:
+            return
+        try:
+            self._add(name, await self.sources[name].fetch(self._session))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠ Could not refill {name} image pool: {e}")
+        except Exception as e:
+            # A third-party API changing its response shape must not end the refill loop
+            print(f"⚠ Unexpected response while refilling {name} image pool: {e!r}")
+
+    async def _refill_loop(self):
+        while True:
+            await asyncio.gather(*(self.refill(name) for name in self.sources))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from typing import NamedTuple
+
+from utils.bulk_actions import RouteLimiter
+from utils.database import Database
+from utils.scheduler import HeapScheduler
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    data TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_run_at ON scheduled_jobs (run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_member ON scheduled_jobs (kind, guild_id, user_id);
+"""
+
+COLUMNS = "id, kind, guild_id, user_id, run_at, data, attempts"
+
+
+class RetryLater(Exception):
+    """
+    Raised by a handler when its job can't run yet (e.g. the guild is unavailable).
+    The job is retried after `retry_delay` without using up one of its attempts.
+    """
+
+
+class Job(NamedTuple):
+    id: int
+    kind: str
+    guild_id: int
+    user_id: int
+    run_at: float
+    data: dict
+    attempts: int = 0
+
+    @classmethod
+    def from_row(cls, row):
+        id, kind, guild_id, user_id, run_at, data, attempts = row
+        return cls(id, kind, guild_id, user_id, run_at, json.loads(data) if data else {}, attempts)
+
+
+class JobScheduler:
+    """
+    Durable one-shot jobs ("unban this user at T") on top of a HeapScheduler.
+
+    The scheduled_jobs table is the source of truth; only jobs due within
+    `horizon` seconds are held in the heap, and a periodic refresh pulls in the
+    next window. On startup everything already overdue is loaded too, so jobs
+    missed while the bot was offline run straight away (catch-up).
+
+    Due jobs are executed in batches by `concurrency` workers, each waiting on a
+    per-(kind, guild) token bucket first. `handlers[kind](job)` finishing
+    normally completes the job; raising retries it after `retry_delay` seconds,
+    up to `max_attempts` times. RetryLater is retried without counting as an
+    attempt, for jobs waiting on something outside their control.
+
+    Several processes can share one table (cluster mode): `owns(guild_id)`
+    says whether a guild is on this process's shards, and only those jobs are
+    loaded here, so each job is run by the one worker able to carry it out.
+    """
+    def __init__(self, db: Database, handlers, clock=time.time, horizon: float = 3600.0, rates=None,
+                 concurrency: int = 4, retry_delay: float = 60.0, max_attempts: int = 5, owns=None):
+        self.db = db
+        self.handlers = handlers
+        self.owns = owns or (lambda guild_id: True)
+        self.clock = clock
+        self.horizon = horizon
+        self.limiter = RouteLimiter(rates)
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.scheduler = HeapScheduler(self._run_batch, clock=clock)
+        # {job_id: Job} for jobs currently in the heap; cancelled jobs are dropped
+        # from here and skipped when their heap entry comes due
+        self._jobs = {}
+        self._refresh_task = None
+
+    async def start(self):
+        """Creates the schema, loads pending jobs (including overdue ones) and starts running them."""
+        await self.db.executescript(SCHEMA)
+        await self.load()
+        self.scheduler.start()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        await self.scheduler.close()
+
+    async def load(self) -> int:
+        """Schedules every stored job due within the horizon. Returns how many were new."""
+        rows = await self.db.fetchall(
+            f"SELECT {COLUMNS} FROM scheduled_jobs WHERE run_at <= ? ORDER BY run_at",
+            (self.clock() + self.horizon,)
+        )
+        loaded = 0
+        for row in rows:
+            job = Job.from_row(row)
+            if job.id not in self._jobs and self.owns(job.guild_id):
+                self._schedule(job)
+                loaded += 1
+        return loaded
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.horizon / 2)
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"⚠ Error loading scheduled jobs: {e}")
+
+    def _schedule(self, job: Job):
+        self._jobs[job.id] = job
+        self.scheduler.schedule(job.run_at, job.id)
+
+    # --- Jobs ---
+    async def add(self, kind: str, guild_id: int, user_id: int, run_at: float, data: dict = None) -> Job:
+        """Stores a job, replacing any pending job of the same kind for the same member."""
+        await self.cancel(kind, guild_id, user_id)
+        payload = json.dumps(data) if data else None
+        job_id = await self.db.execute(
+            "INSERT INTO scheduled_jobs (kind, guild_id, user_id, run_at, data) VALUES (?, ?, ?, ?, ?)",
+            (kind, guild_id, user_id, run_at, payload)
+        )
+        job = Job(job_id, kind, guild_id, user_id, run_at, data or {})
+        if run_at <= self.clock() + self.horizon and self.owns(guild_id):
+            self._schedule(job)
+        return job
+
+    async def cancel(self, kind: str, guild_id: int, user_id: int) -> int:
+        """Removes pending jobs of `kind` for a member. Returns how many there were."""
+        def _delete(conn):
+            with conn:
+                return conn.execute(
+                    "DELETE FROM scheduled_jobs WHERE kind = ? AND guild_id = ? AND user_id = ?",
+                    (kind, guild_id, user_id)
+                ).rowcount
+        deleted = await self.db.run(_delete)
+        for job_id, job in list(self._jobs.items()):
+            if job.kind == kind and job.guild_id == guild_id and job.user_id == user_id:
+                del self._jobs[job_id]
+        return deleted
+
+    async def run_due(self) -> int:
+        """Runs every job that is due by `clock()`. Mainly for tests driving a fake clock."""
+        return await self.scheduler.run_due()
+
+    # --- Execution ---
+    async def _run_batch(self, job_ids):
+        jobs = [self._jobs.pop(job_id) for job_id in job_ids if job_id in self._jobs]
+        if not jobs:
+            return
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        done, retry = [], []
+
+        async def worker():
+            while not queue.empty():
+                job = queue.get_nowait()
+                await self.limiter.acquire(job.kind, job.guild_id)
+                try:
+                    await self.handlers[job.kind](job)
+                    done.append(job)
+                except RetryLater:
+                    retry.append(job._replace(run_at=self.clock() + self.retry_delay))
+                except Exception as e:
+                    if job.attempts + 1 >= self.max_attempts:
+                        print(f"⚠ Giving up on {job.kind} job {job.id} after {job.attempts + 1} attempts: {e}")
+                        done.append(job)
+                    else:
+                        retry.append(job._replace(run_at=self.clock() + self.retry_delay, attempts=job.attempts + 1))
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(jobs)))))
+
+        # One transaction for the whole batch, whatever its size
+        if done:
+            await self.db.executemany("DELETE FROM scheduled_jobs WHERE id = ?", [(job.id,) for job in done])
+        if retry:
+            await self.db.executemany(
+                "UPDATE scheduled_jobs SET run_at = ?, attempts = ? WHERE id = ?",
+                [(job.run_at, job.attempts, job.id) for job in retry]
+            )
+            for job in retry:
+                self._schedule(job)
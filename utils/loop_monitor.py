@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from utils.metrics import Histogram
+
+# Bucket upper bounds in seconds for how late the loop wakes up
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LoopLagMonitor:
+    """
+    Watches for the event loop being blocked.
+
+    A task sleeps for `interval` and records how late it wakes up; that delay
+    is time every other coroutine (including the gateway heartbeats) waited
+    too. A watchdog thread notices a block while it is still happening and
+    captures the loop thread's stack, so the warning names the code that was
+    running instead of just the duration. Warnings are printed at most once
+    per `alert_interval`.
+    """
+    def __init__(self, interval: float = 0.25, threshold: float = 0.5, alert_interval: float = 60.0):
+        self.interval = interval
+        self.threshold = threshold
+        self.alert_interval = alert_interval
+        self.lag = Histogram(LAG_BUCKETS)
+        self.blocked = 0
+        self.worst = 0.0
+        self._last_tick = time.monotonic()
+        self._last_alert = 0.0
+        # Formatted stack of the loop thread, captured by the watchdog during a block
+        self._blocked_stack = None
+        self._task = None
+        self._watchdog = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        self._last_tick = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        self._stopping.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(threading.get_ident(),), name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._last_tick = time.monotonic()
+            self.lag.observe(lag)
+            self.worst = max(self.worst, lag)
+            if lag >= self.threshold:
+                self.blocked += 1
+                self._alert(lag)
+            self._blocked_stack = None
+
+    def _alert(self, lag: float):
+        now = time.monotonic()
+        if now - self._last_alert < self.alert_interval:
+            return
+        self._last_alert = now
+        print(f"⚠ Event loop was blocked for {lag * 1000:.0f}ms.")
+        if self._blocked_stack:
+            print("  While blocked, it was running:\n" + self._blocked_stack)
+
+    def _watch(self, loop_thread_id: int):
+        # Only reads timestamps and frames, so it never needs the loop itself
+        while not self._stopping.wait(self.threshold / 2):
+            stalled = time.monotonic() - self._last_tick - self.interval
+            if stalled < self.threshold or self._blocked_stack is not None:
+                continue
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is not None:
+                # The innermost frames say what is blocking; the outer ones are asyncio plumbing
+                self._blocked_stack = "".join(traceback.format_stack(frame)[-6:]).rstrip()
@@ -0,0 +1,58 @@
+import asyncio
+
+import discord
+
+# MEMBER_CACHE modes:
+#   full - every member of every guild, chunked at startup (discord.py's default)
+#   lean - only members who join while the bot is running; guilds are chunked on first need
+#   none - no member cache at all; members are fetched (or a guild chunked) on demand
+MODES = ("full", "lean", "none")
+
+
+class MemberCachePolicy:
+    """
+    How much of each guild's member list the bot keeps in memory.
+
+    The member cache is the bot's largest memory consumer at scale, while most
+    commands only need the members Discord already sends with the interaction.
+    Code that does need a member or a full member list goes through
+    `get_member()` and `ensure_chunked()`, which work the same in every mode.
+    """
+    def __init__(self, mode: str = "full"):
+        if mode not in MODES:
+            raise ValueError(f"MEMBER_CACHE must be one of {', '.join(MODES)} (got {mode!r})")
+        self.mode = mode
+        # {guild_id: Task} for chunk requests in flight, so concurrent callers share one
+        self._chunking = {}
+
+    def client_options(self, intents: discord.Intents):
+        """Keyword arguments for the bot's constructor."""
+        if self.mode == "full":
+            flags = discord.MemberCacheFlags.from_intents(intents)
+        elif self.mode == "lean":
+            # Recent joiners are what raid handling and /bulk's joined_within act on
+            flags = discord.MemberCacheFlags.none()
+            flags.joined = True
+        else:
+            flags = discord.MemberCacheFlags.none()
+        return {"member_cache_flags": flags, "chunk_guilds_at_startup": self.mode == "full"}
+
+    async def ensure_chunked(self, guild: discord.Guild):
+        """Makes sure `guild.members` is complete, requesting the member list once if it isn't."""
+        if guild.chunked:
+            return
+        task = self._chunking.get(guild.id)
+        if task is None:
+            task = self._chunking[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+            task.add_done_callback(lambda _: self._chunking.pop(guild.id, None))
+        await asyncio.shield(task)
+
+    async def get_member(self, guild: discord.Guild, user_id: int):
+        """Returns a member from the cache, falling back to the API. None if they aren't in the guild."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
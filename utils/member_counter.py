@@ -0,0 +1,46 @@
+import discord
+
+
+class MemberCounter:
+    """
+    Keeps a running total of members across all guilds.
+
+    The total is updated from guild and member join/remove events, so reading
+    it is O(1). `reconcile()` recomputes it from scratch to correct any drift
+    (e.g. events missed during a reconnect).
+    """
+    def __init__(self):
+        # {guild_id: member_count}
+        self.counts = {}
+        self.total = 0
+
+    def reconcile(self, guilds):
+        """Rebuilds the counts with a full scan of `guilds`. Returns the drift that was corrected."""
+        counts = {g.id: g.member_count or 0 for g in guilds}
+        total = sum(counts.values())
+        drift = total - self.total
+        self.counts = counts
+        self.total = total
+        return drift
+
+    def _adjust(self, guild_id: int, delta: int):
+        # Member events for a guild we haven't seen yet are ignored; the next reconcile picks it up
+        if guild_id in self.counts:
+            self.counts[guild_id] += delta
+            self.total += delta
+
+    # --- Event Listeners (registered with bot.add_listener) ---
+    async def on_guild_join(self, guild: discord.Guild):
+        self.total -= self.counts.get(guild.id, 0)
+        self.counts[guild.id] = guild.member_count or 0
+        self.total += self.counts[guild.id]
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.total -= self.counts.pop(guild.id, 0)
+
+    async def on_member_join(self, member: discord.Member):
+        self._adjust(member.guild.id, 1)
+
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        # The raw event fires even when the member wasn't in the cache
+        self._adjust(payload.guild_id, -1)
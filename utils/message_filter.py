@@ -0,0 +1,140 @@
+import re
+import time
+
+
+def trie_regex(words) -> str:
+    """
+    Builds a regex alternation shaped like a trie of `words`.
+
+    Python's regex engine tries each branch of a flat `a|b|c` alternation in
+    turn; sharing prefixes means each position of the message is only matched
+    against the characters that can actually continue a word (Aho-Corasick-like).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Optional continuation; the whole-word guards pick the right length
+            body = f"(?:{body})?"
+        return body
+    return build(trie)
+
+
+class UserState:
+    """Per-(guild, user) filter state, kept small since there is one per active chatter."""
+    __slots__ = ("tokens", "updated", "hashes", "strikes", "last_escalation")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+        # (content_hash, sent_at) of the user's latest messages
+        self.hashes = []
+        self.strikes = []
+        self.last_escalation = 0.0
+
+
+class MessageFilter:
+    """
+    The per-message spam and content checks.
+
+    Each check is O(1) in the number of users (dict lookups, a token bucket,
+    a short list of recent hashes), plus one pass of a single combined regex
+    per guild for the banned-word list.
+    """
+    def __init__(self, rate: float = 1.0, burst: int = 5, duplicate_window: float = 30.0,
+                 max_duplicates: int = 3, max_mentions: int = 5, strike_window: float = 600.0,
+                 escalation_cooldown: float = 30.0, idle_timeout: float = 600.0):
+        self.rate = rate
+        self.burst = burst
+        self.duplicate_window = duplicate_window
+        self.max_duplicates = max_duplicates
+        self.max_mentions = max_mentions
+        self.strike_window = strike_window
+        self.escalation_cooldown = escalation_cooldown
+        self.idle_timeout = idle_timeout
+        # {(guild_id, user_id): UserState}
+        self.users = {}
+        # {guild_id: compiled pattern} for guilds with banned words
+        self.patterns = {}
+
+    # --- Word Lists ---
+    def set_words(self, guild_id: int, words):
+        """Compiles a guild's banned words into one case-insensitive, whole-word pattern."""
+        words = {w.strip().lower() for w in words if w.strip()}
+        if not words:
+            self.patterns.pop(guild_id, None)
+            return
+        self.patterns[guild_id] = re.compile(rf"(?<!\w)(?:{trie_regex(words)})(?!\w)", re.IGNORECASE)
+
+    # --- Checks ---
+    def check(self, guild_id: int, user_id: int, content: str, mentions: int, now: float = None):
+        """Returns the kind of violation ("word", "mentions", "rate", "duplicate") or None."""
+        now = time.monotonic() if now is None else now
+
+        pattern = self.patterns.get(guild_id)
+        if pattern is not None and content and pattern.search(content):
+            return "word"
+        if mentions > self.max_mentions:
+            return "mentions"
+
+        key = (guild_id, user_id)
+        state = self.users.get(key)
+        if state is None:
+            state = self.users[key] = UserState(self.burst, now)
+
+        # Token bucket, refilled lazily from the time since the last message
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+        if state.tokens < 1:
+            return "rate"
+        state.tokens -= 1
+
+        if content:
+            content_hash = hash(content.casefold().strip())
+            cutoff = now - self.duplicate_window
+            hashes = [(h, t) for h, t in state.hashes if t >= cutoff]
+            hashes.append((content_hash, now))
+            # Never keep more than needed to spot a duplicate run
+            state.hashes = hashes[-(self.max_duplicates * 2):]
+            if sum(1 for h, _ in state.hashes if h == content_hash) > self.max_duplicates:
+                return "duplicate"
+        return None
+
+    def strike(self, guild_id: int, user_id: int, now: float = None):
+        """
+        Records a violation. Returns `(strike_count, should_escalate)`; escalation
+        happens at most once per `escalation_cooldown` so a flood isn't punished per message.
+        """
+        now = time.monotonic() if now is None else now
+        state = self.users.get((guild_id, user_id))
+        if state is None:
+            state = self.users[(guild_id, user_id)] = UserState(self.burst, now)
+        # Only the most recent strikes matter for escalation, so the list stays short during a flood
+        state.strikes = ([t for t in state.strikes if now - t < self.strike_window] + [now])[-20:]
+        if now - state.last_escalation < self.escalation_cooldown:
+            return len(state.strikes), False
+        state.last_escalation = now
+        return len(state.strikes), True
+
+    def prune(self, now: float = None) -> int:
+        """Drops state for users who have been quiet for `idle_timeout`. Returns how many."""
+        now = time.monotonic() if now is None else now
+        idle = [
+            key for key, state in self.users.items()
+            # Keep users with recent strikes around so their escalation history isn't lost
+            if now - state.updated > self.idle_timeout
+            and (not state.strikes or now - state.strikes[-1] > self.strike_window)
+        ]
+        for key in idle:
+            del self.users[key]
+        return len(idle)
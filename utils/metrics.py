@@ -0,0 +1,154 @@
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+# Bucket upper bounds in seconds, from 5ms up to Discord's 15 minute interaction lifetime
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 900.0)
+
+# https://discord.com/api/v10/interactions/<id>/<token>/callback
+CALLBACK_PATH = re.compile(r"/interactions/(\d+)/[^/]+/callback")
+
+
+class Histogram:
+    """A fixed-bucket histogram (cumulative on export, like Prometheus)."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One extra slot for values above the last bucket (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Approximates a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class CommandMetrics:
+    """
+    Per-command latency, time to first response, errors and rate-limit waits.
+
+    Interactions are stamped when the command tree accepts them, completed from
+    `on_app_command_completion` / the tree's error handler, and their first
+    response is detected from the HTTP trace of the interaction callback request.
+    """
+    def __init__(self):
+        self.latency = {}
+        self.first_response = {}
+        self.errors = Counter()
+        self.ratelimit_waits = Histogram()
+        # {interaction_id: (command_name, started_at)} for interactions still running
+        self._inflight = {}
+        # Interactions whose first response has not been seen yet
+        self._awaiting_response = {}
+
+    def _histogram(self, table, name):
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = Histogram()
+        return histogram
+
+    # --- Hooks ---
+    def start(self, interaction):
+        if interaction.command is None:
+            return
+        entry = (interaction.command.qualified_name, time.perf_counter())
+        self._inflight[interaction.id] = entry
+        self._awaiting_response[interaction.id] = entry
+
+    def finish(self, interaction, error: Exception = None):
+        entry = self._inflight.pop(interaction.id, None)
+        # A command that never responded has no first response to wait for anymore
+        self._awaiting_response.pop(interaction.id, None)
+        if entry is None:
+            return
+        name, started_at = entry
+        self._histogram(self.latency, name).observe(time.perf_counter() - started_at)
+        if error is not None:
+            # Unwrap CommandInvokeError so the real exception type is counted
+            original = getattr(error, "original", error)
+            self.errors[(name, type(original).__name__)] += 1
+
+    def responded(self, interaction_id: int):
+        entry = self._awaiting_response.pop(interaction_id, None)
+        if entry is not None:
+            name, started_at = entry
+            self._histogram(self.first_response, name).observe(time.perf_counter() - started_at)
+
+    async def on_app_command_completion(self, interaction, command):
+        self.finish(interaction)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """An aiohttp trace config for discord.py's HTTP client (`http_trace=`)."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params):
+            status = params.response.status
+            if status == 429:
+                self.ratelimit_waits.observe(float(params.response.headers.get("Retry-After", 0)))
+            elif status < 400:
+                match = CALLBACK_PATH.search(params.url.path)
+                if match:
+                    self.responded(int(match.group(1)))
+
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    # --- Export ---
+    def render_prometheus(self) -> str:
+        lines = []
+        self._render_histograms(lines, "tesseract_command_latency_seconds", "Time from dispatch to command completion.", self.latency)
+        self._render_histograms(lines, "tesseract_command_first_response_seconds", "Time from dispatch to the first response or defer.", self.first_response)
+
+        lines.append("# HELP tesseract_command_errors_total Command errors by exception type.")
+        lines.append("# TYPE tesseract_command_errors_total counter")
+        for (name, error), count in sorted(self.errors.items()):
+            lines.append(f'tesseract_command_errors_total{{command="{name}",error="{error}"}} {count}')
+
+        self._render_histograms(lines, "tesseract_ratelimit_wait_seconds", "Retry-After of 429 responses from Discord.", {None: self.ratelimit_waits})
+        return "\n".join(lines) + "\n"
+
+    def _render_histograms(self, lines, metric, help_text, histograms):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, histogram in sorted(histograms.items(), key=lambda item: str(item[0])):
+            label = f'command="{name}",' if name is not None else ""
+            running = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                running += count
+                lines.append(f'{metric}_bucket{{{label}le="{bound}"}} {running}')
+            lines.append(f'{metric}_bucket{{{label}le="+Inf"}} {histogram.count}')
+            suffix = f"{{{label.rstrip(',')}}}" if label else ""
+            lines.append(f"{metric}_sum{suffix} {histogram.sum}")
+            lines.append(f"{metric}_count{suffix} {histogram.count}")
+
+
+async def start_metrics_server(metrics: CommandMetrics, host: str, port: int) -> web.AppRunner:
+    """Serves `/metrics` in the Prometheus text format. Returns the runner to clean up later."""
+    async def handle(request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,179 @@
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+
+# Discord only bulk-deletes messages younger than 14 days; keep a small margin
+# so a message doesn't age out between being fetched and being deleted.
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+BULK_DELETE_CHUNK = 100
+# Messages per history request, and so per batch checked against a purge's pattern
+HISTORY_PAGE = 100
+# Seconds a user-supplied pattern gets to match one page before the purge gives up on it
+PATTERN_TIMEOUT = 2.0
+
+
+def search_many(pattern: str, flags: int, texts) -> list:
+    """Which of `texts` match `pattern` (module-level so it can run in a worker process)."""
+    compiled = re.compile(pattern, flags)
+    return [compiled.search(text) is not None for text in texts]
+
+
+class PurgeFilter:
+    """
+    Decides which messages a purge should delete.
+
+    The pattern is user-supplied, so a slow one is run over each page of
+    history in a worker process (when `workers` is given) instead of on the
+    event loop, and a page taking longer than PATTERN_TIMEOUT (catastrophic
+    backtracking) stops the purge instead of tying up the worker.
+    """
+    def __init__(self, author=None, pattern=None, attachments: bool = False, bots: bool = False, workers=None):
+        self.author_id = author.id if author else None
+        self.pattern = pattern
+        self.attachments = attachments
+        self.bots = bots
+        self.workers = workers
+
+    def __call__(self, message: discord.Message) -> bool:
+        if not self.matches_metadata(message):
+            return False
+        if self.pattern is not None and not self.pattern.search(message.content):
+            return False
+        return True
+
+    def matches_metadata(self, message: discord.Message) -> bool:
+        """Every check except the pattern (all cheap attribute lookups)."""
+        if message.pinned:
+            return False
+        if self.author_id is not None and message.author.id != self.author_id:
+            return False
+        if self.bots and not message.author.bot:
+            return False
+        if self.attachments and not message.attachments:
+            return False
+        return True
+
+    async def select(self, messages):
+        """Returns the matching messages of a history page, in order."""
+        if self.pattern is None or self.workers is None:
+            return [message for message in messages if self(message)]
+        candidates = [message for message in messages if self.matches_metadata(message)]
+        if not candidates:
+            return []
+        try:
+            matched = await self.workers.run_cpu(
+                search_many, self.pattern.pattern, self.pattern.flags, [message.content for message in candidates],
+                timeout=PATTERN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise ValueError("the pattern takes too long to match; try a simpler one") from None
+        return [message for message, is_match in zip(candidates, matched) if is_match]
+
+
+async def history_pages(channel, scan_limit: int = None):
+    """Yields a channel's history as lists of up to HISTORY_PAGE messages, newest first."""
+    page = []
+    async for message in channel.history(limit=scan_limit):
+        page.append(message)
+        if len(page) == HISTORY_PAGE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+async def matching_messages(channel, check, amount: int, scan_limit: int = None):
+    """Yields up to `amount` messages matching `check`, newest first, one history page at a time."""
+    found = 0
+    async for page in history_pages(channel, scan_limit):
+        for message in await filter_page(check, page):
+            yield message
+            found += 1
+            if found >= amount:
+                return
+
+
+async def filter_page(check, messages):
+    """Applies `check` to a page: PurgeFilter pages are batched, plain callables go one by one."""
+    if isinstance(check, PurgeFilter):
+        return await check.select(messages)
+    return [message for message in messages if check(message)]
+
+
+async def stream_purge(channel, check, amount: int, scan_limit: int = None, progress=None,
+                       progress_interval: float = 3.0, single_delete_delay: float = 1.0):
+    """
+    Deletes up to `amount` matching messages without loading them all into memory.
+
+    Recent messages are bulk-deleted in chunks of 100 as they stream in. Messages
+    older than 14 days can't be bulk-deleted, so they go through a bounded queue
+    that a single worker drains one delete at a time. `progress(deleted, scanned_matches)`
+    is awaited at most every `progress_interval` seconds. Returns the number deleted.
+    """
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    state = {"deleted": 0, "matched": 0, "last_report": time.monotonic(), "error": None}
+    # The bounded queue applies backpressure: history paging waits if old deletes fall behind
+    old_messages = asyncio.Queue(maxsize=BULK_DELETE_CHUNK)
+
+    async def report(force: bool = False):
+        now = time.monotonic()
+        if progress is None or (not force and now - state["last_report"] < progress_interval):
+            return
+        state["last_report"] = now
+        try:
+            await progress(state["deleted"], state["matched"])
+        except discord.HTTPException:
+            pass # A failed status edit shouldn't stop the purge
+
+    async def delete_old():
+        while True:
+            message = await old_messages.get()
+            try:
+                # After a hard failure, keep draining the queue so the purge can finish and re-raise
+                if state["error"] is not None:
+                    continue
+                await message.delete()
+                state["deleted"] += 1
+            except discord.NotFound:
+                pass # Already gone
+            except discord.HTTPException as e:
+                state["error"] = e
+            finally:
+                old_messages.task_done()
+            await report()
+            await asyncio.sleep(single_delete_delay)
+
+    async def flush(chunk):
+        if len(chunk) == 1:
+            # The bulk endpoint needs at least two messages
+            await chunk[0].delete()
+        else:
+            await channel.delete_messages(chunk)
+        state["deleted"] += len(chunk)
+        await report()
+
+    worker = asyncio.create_task(delete_old())
+    try:
+        chunk = []
+        async for message in matching_messages(channel, check, amount, scan_limit):
+            state["matched"] += 1
+            if message.created_at < cutoff:
+                await old_messages.put(message)
+                continue
+            chunk.append(message)
+            if len(chunk) == BULK_DELETE_CHUNK:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+        await old_messages.join()
+        if state["error"] is not None:
+            raise state["error"]
+    finally:
+        worker.cancel()
+
+    await report(force=True)
+    return state["deleted"]
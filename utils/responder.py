@@ -0,0 +1,216 @@
+import asyncio
+import datetime
+
+import discord
+from discord import app_commands
+
+# Discord drops an interaction that isn't acknowledged within 3 seconds of being created
+DEFAULT_BUDGET = 2.0
+# Followups and edits through an interaction's webhook token stop working after this
+TOKEN_LIFETIME = datetime.timedelta(minutes=15)
+
+
+def response_policy(ephemeral: bool = True, budget: float = None):
+    """
+    Declares how the responder defers an app command that runs past its
+    latency budget: whether the "thinking..." placeholder is ephemeral (match
+    the command's usual reply) and, optionally, a budget other than the default.
+    Works above or below `@app_commands.command`.
+    """
+    policy = {"ephemeral": ephemeral, "budget": budget}
+
+    def decorator(func):
+        if isinstance(func, (app_commands.Command, app_commands.ContextMenu)):
+            func.extras["response_policy"] = policy
+        else:
+            func.__response_policy__ = policy
+        return func
+    return decorator
+
+
+class PendingInteraction:
+    """Responder state for an app command that is still running."""
+    __slots__ = ("lock", "timer", "ephemeral", "deferred")
+
+    def __init__(self, ephemeral: bool):
+        # Serializes the deadline defer with the handler's own first response
+        self.lock = asyncio.Lock()
+        self.timer = None
+        self.ephemeral = ephemeral
+        # True while a defer's placeholder is waiting to be replaced by the real reply
+        self.deferred = False
+
+
+class ChannelSlot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class Responder:
+    """
+    The one place interactions are answered from.
+
+    - `send()` picks the right call for the interaction's state: the initial
+      response, replacing a deferred placeholder, or a followup.
+    - App commands are armed by the command tree; if a handler hasn't
+      answered within its budget, the responder defers on its behalf so slow
+      paths (database, member fetches, busy REST buckets) don't fail outright.
+    - Followups and message edits go through a FIFO per channel, so a burst
+      of progress updates in one channel is sent in order instead of all at
+      once into the same rate limit.
+    - Transient failures (5xx, 429 after discord.py's own retries) of
+      followups and edits are retried with exponential backoff. The initial
+      response is not: an interaction can only be acknowledged once, within 3
+      seconds, and a callback that failed on our end may still have gone
+      through on Discord's.
+    """
+    def __init__(self, budget: float = DEFAULT_BUDGET, attempts: int = 3, backoff: float = 0.5):
+        self.budget = budget
+        self.attempts = attempts
+        self.backoff = backoff
+        # {interaction_id: PendingInteraction} for armed app commands
+        self._pending = {}
+        # {channel_id: ChannelSlot} for channels with followups or edits in flight
+        self._channels = {}
+        # Deadline defers in flight; the event loop only keeps weak references to tasks
+        self._tasks = set()
+        self.auto_deferred = 0
+        self.retries = 0
+
+    # --- Lifecycle (driven by the command tree) ---
+    def arm(self, interaction: discord.Interaction):
+        """Starts the deadline for an app command's first response."""
+        command = interaction.command
+        policy = {}
+        if command is not None:
+            policy = command.extras.get("response_policy") or getattr(command.callback, "__response_policy__", {})
+        state = self._pending[interaction.id] = PendingInteraction(policy.get("ephemeral", True))
+        budget = policy.get("budget") or self.budget
+        state.timer = asyncio.get_running_loop().call_later(budget, self._start_deadline_defer, interaction)
+
+    def release(self, interaction: discord.Interaction):
+        """Forgets a finished app command (later calls on it are plain followups)."""
+        state = self._pending.pop(interaction.id, None)
+        if state is not None and state.timer is not None:
+            state.timer.cancel()
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.release(interaction)
+
+    def _start_deadline_defer(self, interaction: discord.Interaction):
+        task = asyncio.create_task(self._defer_on_deadline(interaction))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _defer_on_deadline(self, interaction: discord.Interaction):
+        state = self._pending.get(interaction.id)
+        if state is None:
+            return
+        async with state.lock:
+            state.timer = None
+            if interaction.response.is_done():
+                return
+            try:
+                await interaction.response.defer(ephemeral=state.ephemeral, thinking=True)
+            except discord.HTTPException as e:
+                print(f"⚠ Could not defer /{interaction.command.qualified_name if interaction.command else '?'}: {e}")
+                return
+            state.deferred = True
+            self.auto_deferred += 1
+
+    # --- Responding ---
+    async def send(self, interaction: discord.Interaction, content: str = None, *, ephemeral: bool = False,
+                   wait: bool = False, **kwargs):
+        """
+        Answers an interaction, whatever state it's in. Takes the keyword
+        arguments of `send_message` (embed, embeds, view, allowed_mentions...).
+        With `wait=True`, returns the sent message so it can be edited later.
+        """
+        state = self._pending.get(interaction.id)
+        if state is None:
+            return await self._send(interaction, None, content, ephemeral, wait, kwargs)
+        async with state.lock:
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            return await self._send(interaction, state, content, ephemeral, wait, kwargs)
+
+    async def _send(self, interaction, state, content, ephemeral, wait, kwargs):
+        if not interaction.response.is_done():
+            await interaction.response.send_message(content, ephemeral=ephemeral, **kwargs)
+            return await interaction.original_response() if wait else None
+
+        if state is not None and state.deferred:
+            state.deferred = False
+            if ephemeral == state.ephemeral:
+                # Replace the "thinking..." placeholder with the reply
+                if content is not None:
+                    kwargs["content"] = content
+                return await self._retry(lambda: interaction.edit_original_response(**kwargs))
+            # The placeholder's visibility can't change, so swap it for a new message
+            await self._retry(interaction.delete_original_response)
+
+        return await self._in_channel(
+            interaction.channel_id,
+            lambda: interaction.followup.send(content, ephemeral=ephemeral, wait=wait, **kwargs)
+        )
+
+    async def defer(self, interaction: discord.Interaction, ephemeral: bool = False):
+        """Acknowledges now, to reply later with `send()`. Does nothing if already acknowledged."""
+        state = self._pending.get(interaction.id)
+        if state is None:
+            if not interaction.response.is_done():
+                await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+            return
+        async with state.lock:
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            if interaction.response.is_done():
+                return
+            await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+            state.ephemeral = ephemeral
+            state.deferred = True
+
+    async def edit(self, interaction: discord.Interaction, **kwargs):
+        """Edits the message a component belongs to (or the interaction's original response once answered)."""
+        if not interaction.response.is_done():
+            return await interaction.response.edit_message(**kwargs)
+        return await self._in_channel(interaction.channel_id, lambda: interaction.edit_original_response(**kwargs))
+
+    def token_valid(self, interaction: discord.Interaction, margin: float = 60.0) -> bool:
+        """Whether followups and edits through `interaction` will still work for at least `margin` seconds."""
+        expires = interaction.created_at + TOKEN_LIFETIME - datetime.timedelta(seconds=margin)
+        return discord.utils.utcnow() < expires
+
+    async def edit_message(self, message: discord.Message, **kwargs):
+        """Edits a sent message (e.g. a progress status) through its channel's queue."""
+        return await self._in_channel(message.channel.id, lambda: message.edit(**kwargs))
+
+    # --- Delivery ---
+    async def _in_channel(self, channel_id: int, call):
+        slot = self._channels.get(channel_id)
+        if slot is None:
+            slot = self._channels[channel_id] = ChannelSlot()
+        slot.users += 1
+        try:
+            async with slot.lock:
+                return await self._retry(call)
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._channels[channel_id]
+
+    async def _retry(self, call):
+        """Runs `call()` (a coroutine factory), retrying server errors and rate limits with backoff."""
+        for attempt in range(self.attempts):
+            try:
+                return await call()
+            except discord.HTTPException as e:
+                if (e.status < 500 and e.status != 429) or attempt == self.attempts - 1:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
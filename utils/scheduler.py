@@ -0,0 +1,87 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class HeapScheduler:
+    """
+    A single-task timer scheduler backed by a binary heap.
+
+    Scheduling is O(log n) no matter how many timers are pending, and there is
+    exactly one asyncio task sleeping until the earliest deadline instead of
+    one task per timer. Due payloads are handed to `handler(payloads)` in
+    batches of up to `max_batch`, oldest first.
+
+    `clock` returns the current time in the same unit as the deadlines (UNIX
+    seconds by default), so tests can drive the scheduler with a fake clock
+    and `run_due()` instead of waiting in real time.
+    """
+    def __init__(self, handler, clock=time.time, max_batch: int = 500):
+        self.handler = handler
+        self.clock = clock
+        self.max_batch = max_batch
+        self._heap = []
+        # Tie-breaker so payloads themselves never need to be comparable
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, when: float, payload):
+        """Schedules `payload` to be handled at `when`."""
+        entry = (when, next(self._counter), payload)
+        heapq.heappush(self._heap, entry)
+        # Only an earlier deadline changes how long the runner should sleep
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def next_deadline(self):
+        return self._heap[0][0] if self._heap else None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def pop_due(self):
+        """Removes and returns up to `max_batch` payloads whose deadline has passed."""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.max_batch:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    async def run_due(self) -> int:
+        """Handles everything that is due right now. Returns how many payloads ran."""
+        handled = 0
+        while True:
+            due = self.pop_due()
+            if not due:
+                return handled
+            try:
+                await self.handler(due)
+            except Exception as e:
+                print(f"⚠ Scheduled job batch failed: {e}")
+            handled += len(due)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            await self.run_due()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,241 @@
+import asyncio
+import sys
+import time
+from array import array
+from collections import Counter
+
+from utils.database import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_stats (
+    guild_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+# (name, seconds per bucket, buckets kept)
+RESOLUTIONS = (
+    ("minute", 60, 60),         # the last hour
+    ("hour", 3600, 168),        # the last week
+    ("day", 86400, 90),         # the last quarter
+)
+# Values stored per bucket; members is a gauge (latest sample), the others are counts
+SERIES = ("members", "messages", "commands")
+MEMBERS, MESSAGES, COMMANDS = range(len(SERIES))
+
+# Where each resolution's ring starts in a guild's array
+OFFSETS = []
+_offset = 0
+for _, _, _slots in RESOLUTIONS:
+    OFFSETS.append(_offset)
+    _offset += _slots * len(SERIES)
+ARRAY_LENGTH = _offset
+
+
+class GuildSeries:
+    """
+    One guild's time series: a ring of buckets per resolution, all in a
+    single flat array of unsigned 32-bit ints (about 3.7KB per guild).
+
+    `heads[r]` is the absolute number (time // bucket seconds) of the newest
+    bucket in ring `r`; a slot holds bucket `n` at index `n % slots`.
+    """
+    __slots__ = ("heads", "data", "members", "dirty")
+
+    def __init__(self, heads=None, data=None):
+        self.heads = heads if heads is not None else array("q", [0] * len(RESOLUTIONS))
+        self.data = data if data is not None else array("I", bytes(ARRAY_LENGTH * 4))
+        # Latest member count written, so unchanged samples cost nothing
+        self.members = 0
+        self.dirty = False
+
+    @classmethod
+    def from_blob(cls, blob: bytes):
+        heads = array("q")
+        heads.frombytes(blob[:len(RESOLUTIONS) * 8])
+        data = array("I")
+        data.frombytes(blob[len(RESOLUTIONS) * 8:])
+        if len(data) != ARRAY_LENGTH:
+            # Written with a different layout; start over rather than misread it
+            return cls()
+        series = cls(heads, data)
+        series.members = series.latest(MEMBERS)
+        return series
+
+    def to_blob(self) -> bytes:
+        return self.heads.tobytes() + self.data.tobytes()
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.heads) + sys.getsizeof(self.data)
+
+    def _slot(self, resolution: int, bucket: int) -> int:
+        """Index of `bucket`'s first value, advancing (and clearing) the ring if it's newer than the head."""
+        _, _, slots = RESOLUTIONS[resolution]
+        head = self.heads[resolution]
+        if bucket > head:
+            width = len(SERIES)
+            # Clear the slots skipped since the last write (at most the whole ring)
+            for skipped in range(max(head + 1, bucket - slots + 1), bucket + 1):
+                start = OFFSETS[resolution] + (skipped % slots) * width
+                self.data[start:start + width] = array("I", bytes(width * 4))
+            self.heads[resolution] = bucket
+        elif bucket <= head - slots:
+            return -1  # Older than the ring holds
+        return OFFSETS[resolution] + (bucket % slots) * len(SERIES)
+
+    def add(self, now: float, members: int, messages: int, commands: int):
+        """Writes a sample into the current bucket of every resolution (the roll-up happens here)."""
+        for resolution, (_, seconds, _) in enumerate(RESOLUTIONS):
+            index = self._slot(resolution, int(now // seconds))
+            if index < 0:
+                continue
+            self.data[index + MEMBERS] = members
+            self.data[index + MESSAGES] = min(self.data[index + MESSAGES] + messages, 0xFFFFFFFF)
+            self.data[index + COMMANDS] = min(self.data[index + COMMANDS] + commands, 0xFFFFFFFF)
+        self.members = members
+        self.dirty = True
+
+    def latest(self, series: int) -> int:
+        _, _, slots = RESOLUTIONS[0]
+        return self.data[OFFSETS[0] + (self.heads[0] % slots) * len(SERIES) + series]
+
+    def buckets(self, resolution: int, count: int, now: float):
+        """
+        The last `count` buckets up to `now`, oldest first, as
+        `(start_time, members, messages, commands)`. Member counts are carried
+        forward over buckets without a sample; before the first one they're None.
+        """
+        _, seconds, slots = RESOLUTIONS[resolution]
+        count = min(count, slots)
+        current = int(now // seconds)
+        head = self.heads[resolution]
+        width = len(SERIES)
+        rows = []
+        members = None
+        # Walk the whole ring so the window starts with the last known member count
+        for bucket in range(current - slots + 1, current + 1):
+            if head - slots < bucket <= head:
+                start = OFFSETS[resolution] + (bucket % slots) * width
+                sample, messages, commands = self.data[start:start + width]
+            else:
+                sample = messages = commands = 0
+            if sample:
+                members = sample
+            if bucket > current - count:
+                rows.append((bucket * seconds, members, messages, commands))
+        return rows
+
+
+class ServerStats:
+    """
+    Per-guild activity history for /serverstats.
+
+    Messages and commands are tallied in plain counters as they happen;
+    `sample()` runs once per collector interval and folds those tallies,
+    plus each guild's member count, into the guild's minute, hour and day
+    rings at once. A range query reads one ring directly, never raw events.
+
+    Storage per guild is fixed by RESOLUTIONS, whatever the guild's size or
+    activity. Changed guilds are written back as one BLOB each, in a single
+    transaction every `flush_interval` seconds (and on close).
+    """
+    def __init__(self, db: Database, flush_interval: float = 300.0, clock=time.time):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.clock = clock
+        # {guild_id: GuildSeries}
+        self.guilds = {}
+        self._messages = Counter()
+        self._commands = Counter()
+        self._flush_task = None
+
+    async def start(self):
+        await self.db.executescript(SCHEMA)
+        rows = await self.db.fetchall("SELECT guild_id, data FROM guild_stats")
+        for guild_id, blob in rows:
+            self.guilds[guild_id] = GuildSeries.from_blob(blob)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the background flusher and writes out every changed guild."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # --- Collection ---
+    def count_message(self, guild_id: int):
+        self._messages[guild_id] += 1
+
+    def count_command(self, guild_id: int):
+        self._commands[guild_id] += 1
+
+    async def sample(self, guilds):
+        """Folds the tallies since the last call and the current member counts into the rings."""
+        now = self.clock()
+        messages, self._messages = self._messages, Counter()
+        commands, self._commands = self._commands, Counter()
+        for index, guild in enumerate(guilds):
+            series = self.guilds.get(guild.id)
+            if series is None:
+                series = self.guilds[guild.id] = GuildSeries()
+            members = guild.member_count or series.members
+            sent = messages.pop(guild.id, 0)
+            used = commands.pop(guild.id, 0)
+            # Quiet guilds with an unchanged member count are skipped entirely
+            if sent or used or members != series.members:
+                series.add(now, members, sent, used)
+            if index % 1000 == 999:
+                await asyncio.sleep(0)
+
+    def history(self, guild_id: int, resolution: str, count: int):
+        """The last `count` buckets at `resolution` ("minute", "hour" or "day"), oldest first."""
+        series = self.guilds.get(guild_id)
+        if series is None:
+            return []
+        index = [name for name, _, _ in RESOLUTIONS].index(resolution)
+        return series.buckets(index, count, self.clock())
+
+    def forget(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+        self._messages.pop(guild_id, None)
+        self._commands.pop(guild_id, None)
+
+    async def delete(self, guild_id: int):
+        """Drops a guild's history from memory and disk (the bot left it)."""
+        self.forget(guild_id)
+        await self.db.execute("DELETE FROM guild_stats WHERE guild_id = ?", (guild_id,))
+
+    # --- Memory ---
+    def memory_usage(self, guild_id: int = None) -> int:
+        """Bytes held for one guild's history, or for every guild's (including the index dict)."""
+        if guild_id is not None:
+            series = self.guilds.get(guild_id)
+            return series.nbytes() if series is not None else 0
+        return sys.getsizeof(self.guilds) + sum(series.nbytes() for series in self.guilds.values())
+
+    # --- Persistence ---
+    async def flush(self):
+        dirty = [(guild_id, series) for guild_id, series in self.guilds.items() if series.dirty]
+        if not dirty:
+            return
+        rows = []
+        for guild_id, series in dirty:
+            series.dirty = False
+            rows.append((guild_id, series.to_blob()))
+        try:
+            await self.db.executemany("INSERT OR REPLACE INTO guild_stats (guild_id, data) VALUES (?, ?)", rows)
+        except Exception as e:
+            for _, series in dirty:
+                series.dirty = True
+            print(f"⚠ Failed to save server stats: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
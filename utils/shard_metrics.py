@@ -0,0 +1,61 @@
+import time
+from collections import Counter
+
+import discord
+
+
+class ShardMetrics:
+    """
+    Per-shard gateway latency and event throughput.
+
+    Events are counted by the shard of the guild they came from. `sample()` is
+    called periodically and turns the counters into events/second figures for
+    the last interval.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.events = Counter()
+        self.rates = {}
+        self._last_events = Counter()
+        self._last_sample = time.monotonic()
+
+    def record(self, guild):
+        # DMs have no guild; they arrive on shard 0
+        self.events[guild.shard_id if guild else 0] += 1
+
+    def sample(self):
+        """Updates the events/second rate of every shard since the previous sample."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_sample, 1e-9)
+        self.rates = {
+            shard_id: (count - self._last_events[shard_id]) / elapsed
+            for shard_id, count in self.events.items()
+        }
+        self._last_events = self.events.copy()
+        self._last_sample = now
+
+    def latencies(self):
+        """Returns `[(shard_id, latency_seconds), ...]` for the shards this process runs."""
+        if isinstance(self.bot, discord.AutoShardedClient):
+            return self.bot.latencies
+        return [(self.bot.shard_id or 0, self.bot.latency)]
+
+    def snapshot(self):
+        """Returns `[(shard_id, latency_ms, events_per_second, total_events), ...]`."""
+        return [
+            (shard_id, round(latency * 1000), self.rates.get(shard_id, 0.0), self.events[shard_id])
+            for shard_id, latency in self.latencies()
+        ]
+
+    # --- Event Listeners (registered with bot.add_listener) ---
+    async def on_message(self, message: discord.Message):
+        self.record(message.guild)
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        self.record(interaction.guild)
+
+    async def on_member_join(self, member: discord.Member):
+        self.record(member.guild)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.record(after.guild)
@@ -0,0 +1,39 @@
+import hashlib
+import json
+import os
+
+
+def command_tree_hash(tree) -> str:
+    """Hashes the payload Discord would receive for a global sync of `tree`."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda data: (data.get("type", 1), data["name"])
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+async def sync_if_changed(tree, path: str):
+    """
+    Syncs the global command tree only if it changed since the last sync.
+
+    The hash of the last synced tree is kept in `path`, so restarts and
+    reconnects with the same commands skip the sync entirely. Returns the list
+    of synced commands, or None if the sync was skipped.
+    """
+    current = command_tree_hash(tree)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            previous = f.read().strip()
+    except FileNotFoundError:
+        previous = None
+
+    if current == previous:
+        return None
+
+    synced = await tree.sync()
+    # Write atomically so a crash mid-write can't leave a hash that matches nothing
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(current)
+    os.replace(temp_path, path)
+    return synced
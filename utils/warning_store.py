@@ -0,0 +1,228 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from utils.database import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    moderator_id INTEGER,
+    reason TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_member
+    ON warnings (guild_id, user_id, created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Created after the migration below, since older databases lack the column
+EXPIRY_INDEX = "CREATE INDEX IF NOT EXISTS idx_warnings_expiry ON warnings (expires_at) WHERE expires_at IS NOT NULL"
+
+COLUMNS = "guild_id, user_id, moderator_id, reason, created_at, expires_at"
+
+
+class Warning(NamedTuple):
+    guild_id: int
+    user_id: int
+    moderator_id: Optional[int]
+    reason: str
+    created_at: float
+    expires_at: Optional[float] = None
+
+    def is_active(self, now: float) -> bool:
+        return self.expires_at is None or self.expires_at > now
+
+
+class WarningStore:
+    """
+    Persistent warning storage with write-behind batching and an LRU read cache.
+
+    New warnings are visible to readers immediately through the cache, but are
+    only written to SQLite in batches, so a burst of /warn commands results in
+    a handful of transactions instead of one commit per command.
+    """
+    def __init__(self, db: Database, cache_size: int = 2048, flush_interval: float = 1.0, batch_size: int = 500):
+        self.db = db
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # {(guild_id, user_id): [Warning, ...]} ordered from least to most recently used
+        self._cache = OrderedDict()
+        self._pending = []
+        # Held while a member is loaded from disk and while a batch is written, so a
+        # load never misses warnings that have left `_pending` but aren't committed yet
+        self._io_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._flush_task = None
+
+    async def start(self, legacy_json: str = None):
+        """Creates the schema, imports the legacy JSON file once and starts the flusher."""
+        await self.db.executescript(SCHEMA)
+        await self._migrate()
+        if legacy_json:
+            await self._import_legacy_json(legacy_json)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the background flusher and writes out anything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _migrate(self):
+        columns = {row["name"] for row in await self.db.fetchall("PRAGMA table_info(warnings)")}
+        if "expires_at" not in columns:
+            await self.db.execute("ALTER TABLE warnings ADD COLUMN expires_at REAL")
+        await self.db.execute(EXPIRY_INDEX)
+
+    # --- Reads ---
+    async def get(self, guild_id: int, user_id: int):
+        """Returns every active (unexpired) warning for a member, oldest first."""
+        key = (guild_id, user_id)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = await self._load(key)
+        else:
+            self._cache.move_to_end(key)
+        # Filter here too, so a lagging expiry job never shows stale warnings
+        now = time.time()
+        return [w for w in cached if w.is_active(now)]
+
+    async def _load(self, key):
+        async with self._io_lock:
+            # Another caller may have loaded this member while we waited
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            rows = await self.db.fetchall(
+                f"SELECT {COLUMNS} FROM warnings WHERE guild_id = ? AND user_id = ? ORDER BY created_at",
+                key
+            )
+            cached = [Warning(*row) for row in rows]
+            # Warnings that are still waiting for the next flush aren't in the database yet
+            cached.extend(w for w in self._pending if (w.guild_id, w.user_id) == key)
+            self._remember(key, cached)
+            return cached
+
+    async def count(self, guild_id: int, user_id: int) -> int:
+        return len(await self.get(guild_id, user_id))
+
+    # --- Writes ---
+    async def add(self, guild_id: int, user_id: int, reason: str, moderator_id: int = None, expires_at: float = None) -> int:
+        """Records a warning and returns the member's new (active) warning count."""
+        warnings = await self.get(guild_id, user_id)
+        warning = Warning(guild_id, user_id, moderator_id, reason, time.time(), expires_at)
+        warnings.append(warning)
+        self._remember((guild_id, user_id), warnings)
+
+        self._pending.append(warning)
+        if len(self._pending) >= self.batch_size:
+            self._flush_event.set()
+        return len(warnings)
+
+    async def flush(self):
+        """Writes all pending warnings to the database in a single transaction."""
+        if not self._pending:
+            return
+        async with self._io_lock:
+            batch, self._pending = self._pending, []
+            try:
+                await self.db.executemany(
+                    f"INSERT INTO warnings ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    batch
+                )
+            except Exception:
+                # Put the batch back so the next flush retries it
+                self._pending = batch + self._pending
+                raise
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠ Error flushing warnings: {e}")
+
+    # --- Expiry ---
+    async def upcoming_expiries(self, until: float):
+        """Returns `(guild_id, user_id, expires_at)` for warnings expiring before `until`."""
+        await self.flush()
+        return await self.db.fetchall(
+            "SELECT guild_id, user_id, expires_at FROM warnings WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (until,)
+        )
+
+    async def expire(self, members, now: float = None) -> int:
+        """Deletes every warning that has expired and drops `members` from the cache. Returns rows deleted."""
+        now = time.time() if now is None else now
+        # Pending warnings are written first so an expired one can't be re-inserted later
+        await self.flush()
+
+        def _delete(conn):
+            with conn:
+                return conn.execute(
+                    "DELETE FROM warnings WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                ).rowcount
+        deleted = await self.db.run(_delete)
+        for key in members:
+            self._cache.pop(key, None)
+        return deleted
+
+    def _remember(self, key, warnings):
+        self._cache[key] = warnings
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # --- Legacy Import ---
+    async def _import_legacy_json(self, path: str):
+        """Imports `{guild_id: {user_id: [reason, ...]}}` from the old JSON file exactly once."""
+        marker = await self.db.fetchone("SELECT value FROM meta WHERE key = 'legacy_json_imported'")
+        if marker is not None or not os.path.exists(path):
+            return
+
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                print(f"⚠ Could not import {path}: {e}")
+                return
+
+        now = time.time()
+        rows = [
+            (int(guild_id), int(user_id), None, str(reason), now)
+            for guild_id, members in data.items()
+            for user_id, reasons in members.items()
+            for reason in reasons
+        ]
+        if rows:
+            await self.db.executemany(
+                "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        await self.db.execute(
+            "INSERT INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+            (str(len(rows)),)
+        )
+        print(f"📥 Imported {len(rows)} warnings from {path}")
@@ -0,0 +1,119 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class WorkerPools:
+    """
+    Somewhere other than the event loop to run heavy work.
+
+    - `run_cpu()` sends a function to a process pool, for CPU-bound work that
+      would otherwise hold the GIL (and the gateway heartbeats) hostage. The
+      function and its arguments must be picklable, so use module-level
+      functions and plain data.
+    - `run_io()` runs a blocking function on a thread pool (file I/O,
+      synchronous libraries). The database has its own dedicated thread.
+
+    The thread pool admits at most `max_pending` jobs at a time and the process
+    pool one job per worker; further callers wait for a slot, so a burst of
+    commands queues up here instead of growing the executors' unbounded
+    internal queues. With `processes=0` CPU work runs on the thread pool
+    instead (for hosts that don't allow subprocesses).
+
+    A CPU job given a `timeout` that runs past it has its worker processes
+    killed and the pool replaced, so one runaway job (a pathological regex)
+    can't hold a worker forever. A job only reaches the executor once a worker
+    is free, so the timeout covers running time, not time spent queued. Threads
+    can't be killed, so without a process pool the caller still gets the
+    timeout but the job runs on.
+    """
+    def __init__(self, processes: int = 2, threads: int = 8, max_pending: int = None):
+        self.processes = processes
+        self.threads = threads
+        self.max_pending = max_pending or 4 * max(processes, threads)
+        self._process_pool = None
+        self._thread_pool = None
+        # CPU jobs only reach the executor when a worker is free to start them
+        self._cpu_slots = asyncio.Semaphore(processes or self.max_pending)
+        self._io_slots = asyncio.Semaphore(self.max_pending)
+        # Jobs running or waiting for a slot, by pool
+        self.pending = {"cpu": 0, "io": 0}
+        self.completed = {"cpu": 0, "io": 0}
+
+    def start(self):
+        self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="worker")
+        if self.processes:
+            self._process_pool = self._new_process_pool()
+
+    def _new_process_pool(self):
+        # "spawn" starts clean interpreters: forking a process that already runs
+        # threads (the database, aiohttp's resolver) can deadlock the child
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    async def close(self):
+        for pool in (self._process_pool, self._thread_pool):
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        self._process_pool = self._thread_pool = None
+
+    # --- Submission ---
+    async def run_cpu(self, func, *args, timeout: float = None, **kwargs):
+        """
+        Runs `func(*args, **kwargs)` in a worker process and returns its result.
+        Raises asyncio.TimeoutError if it runs for longer than `timeout` seconds.
+        """
+        return await self._submit("cpu", self._cpu_slots, functools.partial(self._run_cpu, func, args, kwargs, timeout))
+
+    async def _run_cpu(self, func, args, kwargs, timeout):
+        if self._process_pool is None:
+            return await asyncio.wait_for(self._execute(self._thread_pool, func, args, kwargs), timeout)
+        # One retry, for jobs caught in a pool that was recycled because of another job's timeout
+        for attempt in range(2):
+            # Looked up once the job holds a worker slot, since the pool may have been replaced meanwhile
+            pool = self._process_pool
+            try:
+                return await asyncio.wait_for(self._execute(pool, func, args, kwargs), timeout)
+            except asyncio.TimeoutError:
+                if self._process_pool is pool:
+                    print(f"⚠ A worker job ran over its {timeout}s limit; restarting the process pool.")
+                    self._recycle(pool)
+                raise
+            except BrokenProcessPool:
+                if self._process_pool is pool:
+                    # A worker died (killed, out of memory); replace the pool so later jobs still run
+                    print("⚠ A worker process died; restarting the process pool.")
+                    self._recycle(pool)
+                    raise
+                if attempt:
+                    raise
+
+    def _recycle(self, pool):
+        """Replaces the process pool, killing its workers (a running job can't be cancelled otherwise)."""
+        self._process_pool = self._new_process_pool()
+        # The executor has no public way to stop a running job; its process handles are the only way in
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run_io(self, func, *args, **kwargs):
+        """Runs a blocking `func(*args, **kwargs)` on a worker thread and returns its result."""
+        return await self._submit("io", self._io_slots, functools.partial(self._execute, self._thread_pool, func, args, kwargs))
+
+    async def _submit(self, kind: str, slots: asyncio.Semaphore, run):
+        self.pending[kind] += 1
+        try:
+            async with slots:
+                result = await run()
+            self.completed[kind] += 1
+            return result
+        finally:
+            self.pending[kind] -= 1
+
+    async def _execute(self, pool, func, args, kwargs):
+        if pool is None:
+            raise RuntimeError("WorkerPools.start() has not been called.")
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)